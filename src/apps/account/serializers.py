@@ -172,8 +172,11 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
 
 class UserProfileListResponseSerializer(serializers.Serializer):
-    message = serializers.CharField()
-    results = UserProfileSerializer(many=True)
+    message = serializers.SerializerMethodField()
+    results = UserProfileSerializer(many=True, source='data')
+
+    def get_message(self, obj):
+        return text.success_profile_list
 
 
 class UserProfileDetailSerializer(serializers.ModelSerializer):
@@ -0,0 +1,50 @@
+import pytest
+from unittest import mock
+from rest_framework.test import APIClient
+from django.urls import reverse
+from apps.account.tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+@mock.patch("apps.account.views.dispatch_sms_notification")
+class TestLoginOTPRoundTrips:
+
+    def setup_method(self):
+        self.client = APIClient()
+        # factory phone numbers are only valid for sequence values 10..99
+        self.user = UserFactory(phone_number="+989121234567")
+        self.phone = str(self.user.phone_number)
+        self.url = reverse("apps.account:token_obtain_pair_otp")
+
+    @mock.patch("apps.account.views.redis_utils.set_value_expire")
+    @mock.patch("apps.account.views.redis_utils.get_value")
+    @mock.patch("apps.account.views.redis_utils.get_and_set_if_absent", return_value=None)
+    def test_send_code_uses_single_redis_call(self, mock_get_set, mock_get, mock_set, _):
+        response = self.client.get(self.url, {"phone_number": self.phone})
+
+        assert response.status_code == 200
+        mock_get_set.assert_called_once()
+        mock_get.assert_not_called()
+        mock_set.assert_not_called()
+
+    @mock.patch("apps.account.views.redis_utils.get_and_set_if_absent", return_value="123456")
+    def test_send_code_twice_fails(self, mock_get_set, _):
+        response = self.client.get(self.url, {"phone_number": self.phone})
+
+        assert response.status_code == 409
+
+    @mock.patch("apps.account.views.redis_utils.remove_key")
+    @mock.patch("apps.account.views.redis_utils.delete_if_equal", return_value=True)
+    def test_verify_code_uses_single_redis_call(self, mock_delete, mock_remove, _):
+        response = self.client.post(self.url, {"phone_number": self.phone, "code": "123456"}, format="json")
+
+        assert response.status_code == 200
+        assert "access" in response.data
+        mock_delete.assert_called_once()
+        mock_remove.assert_not_called()
+
+    @mock.patch("apps.account.views.redis_utils.delete_if_equal", return_value=False)
+    def test_verify_wrong_code_fails(self, mock_delete, _):
+        response = self.client.post(self.url, {"phone_number": self.phone, "code": "000000"}, format="json")
+
+        assert response.status_code == 409
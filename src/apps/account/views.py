@@ -22,6 +22,7 @@ from apps.core.views import mixins
 from apps.core.swagger import mixins as ms
 from apps.core import utils, redis_utils
 from apps.core.exceptions import ValidationError, OperationHasAlreadyBeenDoneError
+from apps.core.serializers import ListParamsSerializer
 from apps.core import text
 from apps.notification.utils import create_notify
 from apps.notification.enums import NotificationType
@@ -95,11 +96,9 @@ class LoginOTP(APIView):
         conf = settings.LOGIN_OTP_CONFIG
         user_key = conf['STORE_BY'].format(phone_number)
 
-        if redis_utils.get_value(user_key):
-            raise exceptions.CodeHasAlreadyBeenSent()
-
         otp_code = utils.random_num(conf['CODE_LENGTH'])
-        redis_utils.set_value_expire(user_key, otp_code, conf['TIMEOUT'])
+        if redis_utils.get_and_set_if_absent(user_key, otp_code, conf['TIMEOUT']):
+            raise exceptions.CodeHasAlreadyBeenSent()
 
         notification = create_notify(
             to_user=user,
@@ -140,12 +139,10 @@ class LoginOTP(APIView):
         conf = settings.LOGIN_OTP_CONFIG
         user_key = conf['STORE_BY'].format(phone_number)
 
-        code = redis_utils.get_value(user_key)
-        if not code or code != user_code:
+        # check and clear code
+        if not redis_utils.delete_if_equal(user_key, user_code):
             raise exceptions.CodeIsWrong()
 
-        redis_utils.remove_key(user_key)
-
         notification = create_notify(
             to_user=user,
             title=_("Login Successful"),
@@ -266,15 +263,12 @@ class ResetPassword(ms.SwaggerViewMixin, APIView):
         conf = settings.RESET_PASSWORD_CONFIG
         user_key = conf['STORE_BY'].format(phone_number)
 
-        # check user request(if have previous request)
-        if redis_utils.get_value(user_key):
+        # generate and set code on redis(if have not previous request)
+        reset_code = utils.random_num(conf['CODE_LENGTH'])
+        if redis_utils.get_and_set_if_absent(user_key, reset_code, conf['TIMEOUT']):
             # reset code has already been sent
             raise exceptions.CodeHasAlreadyBeenSent()
 
-        # generate and set code on redis
-        reset_code = utils.random_num(conf['CODE_LENGTH'])
-        redis_utils.set_value_expire(user_key, reset_code, conf['TIMEOUT'])
-
         notification = create_notify(
             to_user=user,
             title=_("Reset Password Code Sent"),
@@ -318,18 +312,11 @@ class ResetPasswordCheckAndSet(ms.SwaggerViewMixin, APIView):
         conf = settings.RESET_PASSWORD_CONFIG
         user_key = conf['STORE_BY'].format(phone_number)
 
-        # check reset code
-        code = redis_utils.get_value(user_key)
-        if not code:
+        # check reset code and clear key
+        if not redis_utils.delete_if_equal(user_key, user_code):
             # reset code not match(is wrong)
             raise exceptions.CodeIsWrong()
 
-        if not code == user_code:
-            # reset code not match(is wrong)
-            raise exceptions.CodeIsWrong()
-
-        # clear key
-        redis_utils.remove_key(user_key)
         # set password user
         password = ser.validated_data['password']
         user.set_password(password)
@@ -372,15 +359,12 @@ class ConfirmPhoneNumber(APIView):
         conf = settings.CONFIRM_PHONENUMBER_CONFIG
         user_key = conf['STORE_BY'].format(phone_number)
 
-        # check code request(if have previous request)
-        if redis_utils.get_value(user_key):
+        # set code(if have not previous request)
+        code = utils.random_num(conf['CODE_LENGTH'])
+        if redis_utils.get_and_set_if_absent(user_key, code, conf['TIMEOUT']):
             # confirm code has already been sent
             raise exceptions.CodeHasAlreadyBeenSent()
 
-        code = utils.random_num(conf['CODE_LENGTH'])
-
-        redis_utils.set_value_expire(user_key, code, conf['TIMEOUT'])
-
         notification = create_notify(
             to_user=user,
             title=_("Confirmation Code Sent"),
@@ -413,20 +397,11 @@ class ConfirmPhoneNumber(APIView):
         conf = settings.CONFIRM_PHONENUMBER_CONFIG
         user_key = conf['STORE_BY'].format(phone_number)
 
-        # check code
-        code = redis_utils.get_value(user_key)
-
-        if not code:
-            # confirm code is not exists
-            raise exceptions.CodeIsWrong()
-
-        if not code == user_code:
-            # confirm code is not match(is wrong)
+        # check code and clear key
+        if not redis_utils.delete_if_equal(user_key, user_code):
+            # confirm code is not exists or not match(is wrong)
             raise exceptions.CodeIsWrong()
 
-        # clear key
-        redis_utils.remove_key(user_key)
-
         # phone_number confirmed
         user.is_phone_number_confirmed = True
         user.save(update_fields=['is_phone_number_confirmed'])
@@ -473,13 +448,10 @@ class UserSendOTP(ms.SwaggerViewMixin, APIView):
         conf = settings.USER_OTP_CONFIG
         user_key = conf['STORE_BY'].format(phone_number)
 
-        # check key(code)
-        if redis_utils.get_value(user_key):
-            raise exceptions.CodeHasAlreadyBeenSent()
-
-        # generate and set code on redis
+        # generate and set code on redis(if key is not exists)
         otp_code = utils.random_num(conf['CODE_LENGTH'])
-        redis_utils.set_value_expire(user_key, otp_code, conf['TIMEOUT'])
+        if redis_utils.get_and_set_if_absent(user_key, otp_code, conf['TIMEOUT']):
+            raise exceptions.CodeHasAlreadyBeenSent()
 
         notification = create_notify(
             to_user=user,
@@ -521,12 +493,10 @@ class UserCreate(ms.SwaggerViewMixin, APIView):
         conf = settings.USER_OTP_CONFIG
         user_phone_number = validated_data['phone_number']
         user_key = conf['STORE_BY'].format(user_phone_number)
-        if not redis_utils.get_value(user_key) == otp_code:
+        # check otp code and clear key
+        if not redis_utils.delete_if_equal(user_key, otp_code):
             raise exceptions.CodeIsWrong()
 
-        # clear otp key
-        redis_utils.remove_key(user_key)
-
         # create user
         user = ser.save()
 
@@ -634,20 +604,15 @@ class ProfileListView(ms.SwaggerViewMixin, mixins.ListViewMixin, APIView):
     permission_classes = (base_permissions.AllowAny,)
     swagger_tags = ['Profile']
     swagger_title = 'ListProfiles'
-    serializer = serializers.UserProfileSerializer
+    serializer = ListParamsSerializer
     serializer_response = serializers.UserProfileListResponseSerializer
+    cursor_pagination = mixins.CURSOR_OPT_IN
 
     def get_queryset(self):
-        return models.UserProfileModel.objects.all()
+        return models.UserProfileModel.objects.order_by('-created_at', '-id')
 
     def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        ser = self.serializer(queryset, many=True, context={'request': request})
-        response_data = {
-            "message": text.success_profile_list,
-            "results": ser.data
-        }
-        return Response(response_data, status=200)
+        return self.list(request)
 
 
 class ProfileDetailView(ms.SwaggerViewMixin, mixins.DetailViewMixin, APIView):
@@ -6,3 +6,6 @@ class BoardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.board'
     verbose_name = _('Board')
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from .services.realtime import get_board_group, has_board_access, merge_change
+
+
+class BoardConsumer(AsyncWebsocketConsumer):
+    """
+        push only: changes of the board's task lists and tasks (services.realtime).
+        changes arriving within COALESCE_WINDOW are merged per task / list and sent as one message,
+        clients load the board once from the snapshot endpoint after connecting
+    """
+    access_revoked_code = 4403
+
+    async def connect(self):
+        self.board_id = self.scope['url_route']['kwargs']['board_id']
+        self.user = self.scope['user']
+        self.group_name = None
+        self.pending = {}
+        self.flush_task = None
+        self.revalidate_task = None
+
+        if not await database_sync_to_async(has_board_access)(self.board_id, self.user):
+            await self.close()
+            return
+
+        self.group_name = get_board_group(self.board_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        self.revalidate_task = asyncio.create_task(self.revalidate_access())
+
+    async def disconnect(self, close_code):
+        for task in (self.flush_task, self.revalidate_task):
+            if task:
+                task.cancel()
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def revalidate_access(self):
+        """ close the socket of a user removed from the board's team """
+        interval = settings.BOARD_REALTIME_CONFIG['ACCESS_RECHECK_INTERVAL']
+        while True:
+            await asyncio.sleep(interval)
+            if not await database_sync_to_async(has_board_access)(self.board_id, self.user):
+                await self.close(code=self.access_revoked_code)
+                return
+
+    async def board_changes(self, event):
+        for change in event['changes']:
+            merge_change(self.pending, change)
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(settings.BOARD_REALTIME_CONFIG['COALESCE_WINDOW'])
+        changes, self.pending, self.flush_task = list(self.pending.values()), {}, None
+        if changes:
+            await self.send(text_data=json.dumps({'changes': changes}))
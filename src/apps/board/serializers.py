@@ -5,6 +5,7 @@ from apps.core import text
 
 from . import exceptions
 from .models import BoardModel
+from apps.task.models import TaskListModel, TaskModel
 
 
 class CreateBoardSerializer(serializers.ModelSerializer):
@@ -111,3 +112,56 @@ class BoardUpdateSerializersResponse(serializers.Serializer):
     message = serializers.CharField()
     update_date = BoardUpdateSerializers()
 
+
+class SnapshotTaskSerializer(serializers.ModelSerializer):
+    """
+        task of a board snapshot
+    """
+    assignee = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TaskModel
+        fields = ['id', 'title', 'description', 'is_done', 'deadline', 'completed_at', 'priority', 'order', 'assignee']
+
+    def get_assignee(self, obj):
+        if not obj.assignee:
+            return None
+        return {"id": obj.assignee.id, "name": obj.assignee.full_name()}
+
+
+class SnapshotTaskListSerializer(serializers.ModelSerializer):
+    """
+        task list of a board snapshot, with its tasks
+    """
+    tasks = SnapshotTaskSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = TaskListModel
+        fields = ['id', 'title', 'description', 'order', 'tasks']
+
+
+class SnapshotBoardSerializer(DetailBoardSerializers):
+    """
+        board with its ordered task lists and their tasks
+    """
+    task_lists = SnapshotTaskListSerializer(source='snapshot_task_lists', many=True, read_only=True)
+
+    class Meta:
+        model = BoardModel
+        fields = ['id', 'title', 'description', 'team', 'created_by', 'is_archived', 'task_lists']
+
+    def get_created_by(self, obj):
+        return {
+            "name": obj.created_by.full_name() if obj.created_by else None,
+        }
+
+
+class BoardCacheStatsSerializer(serializers.Serializer):
+    """
+        counters of the board snapshot cache
+    """
+    hits = serializers.IntegerField(read_only=True)
+    misses = serializers.IntegerField(read_only=True)
+    hit_ratio = serializers.FloatField(read_only=True, allow_null=True)
+    rebuilds = serializers.IntegerField(read_only=True)
+    avg_rebuild_ms = serializers.FloatField(read_only=True, allow_null=True)
@@ -0,0 +1,111 @@
+"""
+    versioned cache of board snapshots (SnapshotBoardView).
+    every board has a version counter in redis, bumped once the transaction that changed the board,
+    one of its task lists or one of their tasks commits (changes.py). payloads are stored under
+    board:<id>:v<version>, so a bump is the whole invalidation: readers move to a key that does not exist yet
+    and the old payload expires by TIMEOUT.
+
+    a reader reads (or creates) the version before reading the database, so a payload built from data
+    that a commit changed meanwhile is stored under the version that commit bumps, never read again.
+    a missing version is created from the clock instead of 0, so it never repeats an earlier one.
+    hits, misses and rebuild times are counted in a redis hash, see get_stats.
+"""
+import logging
+import time
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from apps.core import redis_utils
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'board:{}:version'
+PAYLOAD_KEY = 'board:{}:v{}'
+STATS_KEY = 'board_cache_stats'
+
+
+def is_enabled():
+    return settings.BOARD_CACHE_CONFIG['ENABLED']
+
+
+def get_version(board_id):
+    key = VERSION_KEY.format(board_id)
+    version = redis_utils.get_counter(key)
+    if version is None:
+        redis_utils.set_counter_if_absent(key, time.time_ns() // 1000, None)
+        version = redis_utils.get_counter(key)
+    return version
+
+
+def get_etag(version):
+    return f'W/"v{version}"'
+
+
+def get_snapshot(board_id, build):
+    """
+        (payload, etag) of a board, build() returns the payload from the database on a miss.
+        None when the cache is disabled or redis is down, the caller reads the database itself
+    """
+    if not is_enabled():
+        return None
+
+    try:
+        version = get_version(board_id)
+        payload = redis_utils.get_value(PAYLOAD_KEY.format(board_id, version))
+    except RedisError as e:
+        logger.warning(f"Board cache unavailable: {e}")
+        return None
+
+    if payload is not None:
+        record({'hits': 1})
+        return payload, get_etag(version)
+
+    start = time.perf_counter()
+    payload = build()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    record({'misses': 1, 'rebuilds': 1, 'rebuild_ms': round(elapsed)})
+    try:
+        redis_utils.set_value_expire(PAYLOAD_KEY.format(board_id, version), payload,
+                                     settings.BOARD_CACHE_CONFIG['TIMEOUT'])
+    except RedisError as e:
+        logger.warning(f"Board {board_id} snapshot was not cached: {e}")
+    return payload, get_etag(version)
+
+
+def bump_versions(board_ids):
+    """
+        move boards to a new version, called once the transaction that changed them commits (changes.py).
+        a missing version is left missing, the next reader creates a newer one
+    """
+    if not board_ids:
+        return
+    try:
+        redis_utils.incr_existing({VERSION_KEY.format(board_id): 1 for board_id in board_ids})
+    except RedisError as e:
+        logger.warning(f"Board versions were not bumped, cached boards may be stale until TIMEOUT: {e}")
+
+
+def record(amounts):
+    try:
+        redis_utils.incr_hash(STATS_KEY, amounts)
+    except RedisError:
+        pass
+
+
+def get_stats():
+    stats = redis_utils.get_hash_counters(STATS_KEY)
+    hits, misses = stats.get('hits', 0), stats.get('misses', 0)
+    rebuilds = stats.get('rebuilds', 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+        'rebuilds': rebuilds,
+        'avg_rebuild_ms': round(stats.get('rebuild_ms', 0) / rebuilds, 2) if rebuilds else None,
+    }
+
+
+def reset_stats():
+    redis_utils.remove_key(STATS_KEY)
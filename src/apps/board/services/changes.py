@@ -0,0 +1,109 @@
+"""
+    changes of boards, their task lists and tasks, collected during a transaction by signals.py
+    (and by task.services.bulk for rows written without signals) and handled once it commits:
+    task lists are resolved to their boards with one query, then every changed board moves to a new
+    cache version (cache.py) and its open sockets get the diffs (realtime.py).
+
+    the changes of a transaction are one PendingChanges, registered as on_commit callback with every
+    change and run once, so a transaction touching many rows handles each board once.
+    the connection keeps it until it runs; a rolled back transaction drops its callbacks, its PendingChanges
+    is replaced by the first change made outside a transaction. the changes of a rolled back savepoint
+    may still be pushed with the rest of the transaction.
+"""
+from django.db import transaction
+
+from . import cache, realtime
+
+PENDING_ATTR = '_board_changes_pending'
+
+
+class PendingChanges:
+
+    def __init__(self):
+        self.board_ids = set()
+        self.task_list_ids = set()
+        self.events = []  # (event, board ids, task list ids)
+        self.done = False
+
+    def __call__(self):
+        if self.done:
+            return
+        self.done = True
+        handle(self)
+
+
+def get_pending(connection):
+    """
+        the PendingChanges registered in the current transaction, tracked with our own attribute on the
+        connection. one that did not run is stale once no transaction is open anymore (rolled back)
+    """
+    pending = getattr(connection, PENDING_ATTR, None)
+    if pending is None or pending.done or not connection.in_atomic_block:
+        pending = PendingChanges()
+        setattr(connection, PENDING_ATTR, pending)
+    return pending
+
+
+def record(board_ids=(), task_list_ids=(), event=None):
+    """
+        a change of the given boards (task lists are resolved on commit), event is pushed to their sockets
+    """
+    if not (cache.is_enabled() or realtime.is_enabled()):
+        return
+    board_ids = {pk for pk in board_ids if pk}
+    task_list_ids = {pk for pk in task_list_ids if pk}
+    if not (board_ids or task_list_ids):
+        return
+
+    pending = get_pending(transaction.get_connection())
+    pending.board_ids.update(board_ids)
+    pending.task_list_ids.update(task_list_ids)
+    if event is not None:
+        pending.events.append((event, board_ids, task_list_ids))
+    transaction.on_commit(pending)
+
+
+def record_task_list(instance, created=False, deleted=False):
+    event = None
+    previous_board_id = None
+    if realtime.is_enabled():
+        event = realtime.make_change(instance, 'task_list', realtime.TASK_LIST_FIELDS, created, deleted)
+        previous_board_id = getattr(instance, realtime.TRACKED_ATTR, {}).get('board_id')
+        realtime.track(instance, realtime.TASK_LIST_FIELDS)
+    # a list moved to another board leaves the old one
+    record(board_ids=[instance.board_id, previous_board_id], event=event)
+
+
+def record_task(instance, created=False, deleted=False):
+    """ no queries here, the lists of a transaction are resolved to boards together on commit """
+    event = None
+    previous_task_list_id = None
+    if realtime.is_enabled():
+        event = realtime.make_change(instance, 'task', realtime.TASK_FIELDS, created, deleted)
+        previous_task_list_id = getattr(instance, realtime.TRACKED_ATTR, {}).get('task_list_id')
+        realtime.track(instance, realtime.TASK_FIELDS)
+    # a task moved to a list of another board leaves the old one
+    record(task_list_ids=[instance.task_list_id, previous_task_list_id], event=event)
+
+
+def handle(pending):
+    board_ids = set(pending.board_ids)
+    list_boards = {}
+    if pending.task_list_ids:
+        from apps.task.models import TaskListModel
+
+        list_boards = dict(
+            TaskListModel.objects.filter(pk__in=pending.task_list_ids, board__isnull=False)
+            .values_list('id', 'board_id')
+        )
+        board_ids.update(list_boards.values())
+
+    if cache.is_enabled():
+        cache.bump_versions(board_ids)
+
+    changes = {}
+    for event, event_boards, event_lists in pending.events:
+        targets = event_boards | {list_boards[pk] for pk in event_lists if pk in list_boards}
+        for board_id in targets:
+            changes.setdefault(board_id, []).append(event)
+    realtime.publish(changes)
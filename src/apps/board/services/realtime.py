@@ -0,0 +1,138 @@
+"""
+    live board: changes of task lists and tasks go to the websocket group of their board
+    (consumers.BoardConsumer) as compact diffs, so open boards never poll.
+    a change is {'kind': 'task' | 'task_list', 'op', 'id', 'fields'} where fields holds only what changed
+    (everything on create, nothing on delete) and op is created, updated, moved, done or deleted.
+    signals.py remembers the loaded values of every instance to diff against, changes.py pushes on commit.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.exceptions import PermissionDenied
+
+from apps.core.services.access_control import is_team_member, reset_user_team_ids
+from apps.board.models import BoardModel
+
+logger = logging.getLogger(__name__)
+
+BOARD_GROUP = 'board_{}'
+TRACKED_ATTR = '_board_tracked'
+
+TASK_FIELDS = ('task_list_id', 'order', 'assignee_id', 'title', 'description', 'is_done', 'deadline',
+               'completed_at', 'priority')
+TASK_LIST_FIELDS = ('board_id', 'title', 'description', 'order')
+
+CREATED, UPDATED, MOVED, DONE, DELETED = 'created', 'updated', 'moved', 'done', 'deleted'
+
+_encoder = DjangoJSONEncoder()
+
+
+def is_enabled():
+    return settings.BOARD_REALTIME_CONFIG['ENABLED']
+
+
+def get_board_group(board_id):
+    return BOARD_GROUP.format(board_id)
+
+
+def to_primitive(value):
+    # the redis channel layer packs messages with plain msgpack
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return _encoder.default(value)
+
+
+def get_values(instance, fields):
+    # deferred fields are left out, they are never diffed
+    return {field: instance.__dict__[field] for field in fields if field in instance.__dict__}
+
+
+def track(instance, fields):
+    setattr(instance, TRACKED_ATTR, get_values(instance, fields))
+
+
+def get_op(kind, fields):
+    if 'order' in fields or (kind == 'task' and 'task_list' in fields):
+        return MOVED
+    if fields.get('is_done') is True:
+        return DONE
+    return UPDATED
+
+
+def make_change(instance, kind, fields, created=False, deleted=False):
+    """
+        diff of instance against its tracked values, None when nothing changed
+    """
+    values = {} if deleted else get_values(instance, fields)
+    if not (created or deleted):
+        tracked = getattr(instance, TRACKED_ATTR, {})
+        values = {field: value for field, value in values.items() if tracked.get(field, value) != value}
+        if not values:
+            return None
+    diff = {field.removesuffix('_id'): to_primitive(value) for field, value in values.items()}
+    op = CREATED if created else DELETED if deleted else get_op(kind, diff)
+    return {'kind': kind, 'op': op, 'id': str(instance.pk), 'fields': diff}
+
+
+def merge_change(pending, change):
+    """
+        fold change into the changes waiting for one socket ({(kind, id): change}), in place
+    """
+    key = (change['kind'], change['id'])
+    current = pending.get(key)
+    if current is None:
+        pending[key] = change
+    elif change['op'] == DELETED:
+        if current['op'] == CREATED:
+            # never seen by the client
+            del pending[key]
+        else:
+            pending[key] = change
+    elif current['op'] != DELETED:
+        fields = {**current['fields'], **change['fields']}
+        op = CREATED if current['op'] == CREATED else get_op(change['kind'], fields)
+        pending[key] = {**change, 'op': op, 'fields': fields}
+
+
+def has_board_access(board_id, user):
+    if not user.is_authenticated:
+        return False
+    try:
+        team_id = BoardModel.objects.filter(id=board_id).values_list('team_id', flat=True).first()
+    except ValidationError:
+        # board id from the url is not a uuid
+        return False
+    if team_id is None:
+        return False
+
+    # the user of a socket lives for hours, its cached team ids must not
+    reset_user_team_ids(user)
+    try:
+        return is_team_member(user, team_id)
+    except PermissionDenied:
+        return False
+
+
+async def _group_send(messages):
+    channel_layer = get_channel_layer()
+    for group, message in messages:
+        await channel_layer.group_send(group, message)
+
+
+def publish(changes):
+    """
+        {board_id: [change]} to the boards' sockets, a push failure never fails the caller
+    """
+    if not changes or not is_enabled():
+        return
+    try:
+        async_to_sync(_group_send)([
+            (get_board_group(board_id), {'type': 'board.changes', 'changes': board_changes})
+            for board_id, board_changes in changes.items()
+        ])
+    except Exception as e:
+        logger.warning(f"Board push failed: {e}")
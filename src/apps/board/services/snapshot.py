@@ -0,0 +1,57 @@
+"""
+    the whole board in one response (SnapshotBoardView) with a fixed number of queries whatever its size:
+    the board with its team and creator, then its task lists and then all their tasks with their assignees.
+    the ETag is a fingerprint of the board, the counts and the latest updated_at of its lists and tasks,
+    so If-None-Match is answered by one aggregate query instead of loading the board.
+"""
+import hashlib
+
+from django.db.models import Count, Max, Prefetch
+
+from apps.task.models import TaskListModel, TaskModel
+
+
+def get_snapshot_queryset(board_queryset):
+    return board_queryset.select_related('team', 'created_by').prefetch_related(
+        Prefetch(
+            'tasklistmodel_set',
+            queryset=TaskListModel.objects.order_by('order', 'created_at').prefetch_related(
+                Prefetch('tasks', queryset=TaskModel.objects.select_related('assignee').order_by('order', 'id')),
+            ),
+            to_attr='snapshot_task_lists',
+        ),
+    )
+
+
+def make_etag(board, lists_count, lists_updated, tasks_count, tasks_updated):
+    # weak: the same state gives the same tag, not necessarily the same bytes (e.g. a renamed assignee)
+    state = f'{board.updated_at}|{board.is_archived}|{lists_count}|{lists_updated}|{tasks_count}|{tasks_updated}'
+    return f'W/"{hashlib.md5(state.encode()).hexdigest()}"'
+
+
+def get_etag(board):
+    """
+        ETag of a board from the database, one query
+    """
+    state = TaskListModel.objects.filter(board=board).aggregate(
+        lists_count=Count('id', distinct=True),
+        lists_updated=Max('updated_at'),
+        tasks_count=Count('tasks'),
+        tasks_updated=Max('tasks__updated_at'),
+    )
+    return make_etag(board, **state)
+
+
+def get_loaded_etag(board):
+    """
+        same ETag as get_etag, from a board loaded by get_snapshot_queryset
+    """
+    task_lists = board.snapshot_task_lists
+    tasks = [task for task_list in task_lists for task in task_list.tasks.all()]
+    return make_etag(
+        board,
+        len(task_lists),
+        max((task_list.updated_at for task_list in task_lists), default=None),
+        len(tasks),
+        max((task.updated_at for task in tasks), default=None),
+    )
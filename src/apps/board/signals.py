@@ -0,0 +1,37 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_init, post_save, post_delete
+
+from apps.task.models import TaskListModel, TaskModel
+
+from .services import changes, realtime
+from . import models
+
+
+@receiver(post_save, sender=models.BoardModel)
+@receiver(post_delete, sender=models.BoardModel)
+def record_board_change(sender, instance, **kwargs):
+    changes.record(board_ids=[instance.pk])
+
+
+@receiver(post_init, sender=TaskListModel)
+def track_task_list(sender, instance, **kwargs):
+    if realtime.is_enabled():
+        realtime.track(instance, realtime.TASK_LIST_FIELDS)
+
+
+@receiver(post_init, sender=TaskModel)
+def track_task(sender, instance, **kwargs):
+    if realtime.is_enabled():
+        realtime.track(instance, realtime.TASK_FIELDS)
+
+
+@receiver(post_save, sender=TaskListModel)
+@receiver(post_delete, sender=TaskListModel)
+def record_task_list_change(sender, instance, created=False, **kwargs):
+    changes.record_task_list(instance, created, deleted=kwargs['signal'] is post_delete)
+
+
+@receiver(post_save, sender=TaskModel)
+@receiver(post_delete, sender=TaskModel)
+def record_task_change(sender, instance, created=False, **kwargs):
+    changes.record_task(instance, created, deleted=kwargs['signal'] is post_delete)
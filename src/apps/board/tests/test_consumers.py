@@ -0,0 +1,120 @@
+import pytest
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+
+from config.asgi import application
+from apps.account.tests.factories import UserFactory
+from apps.account.enums import UserRoleEnum as Role
+from apps.team.tests.factories import TeamFactory, TeamMembershipFactory
+from apps.board.tests.factories import BoardFactory
+from apps.board.services import realtime
+from apps.task.models import TaskModel
+from apps.task.tests.factories import TaskListFactory, TaskFactory
+
+
+@pytest.fixture
+def board_realtime(settings, in_memory_layer):
+    settings.BOARD_CACHE_CONFIG = {**settings.BOARD_CACHE_CONFIG, "ENABLED": False}
+    settings.BOARD_REALTIME_CONFIG = {**settings.BOARD_REALTIME_CONFIG, "ENABLED": True, "COALESCE_WINDOW": 0.5}
+
+
+@database_sync_to_async
+def make_board():
+    user = UserFactory(is_active=True, role=Role.PROJECT_MEMBER)
+    team = TeamFactory()
+    TeamMembershipFactory(user=user, team=team)
+    board = BoardFactory(team=team)
+    task_list = TaskListFactory(board=board)
+    task = TaskFactory(task_list=task_list, is_done=False, completed_at=None)
+    return user, board, task_list, task
+
+
+@database_sync_to_async
+def update_task(task_id, **fields):
+    task = TaskModel.objects.get(id=task_id)
+    for field, value in fields.items():
+        setattr(task, field, value)
+    task.save()
+    return task
+
+
+async def connect(user, board):
+    communicator = WebsocketCommunicator(application=application, path=f"/ws/board/{board.id}/")
+    communicator.scope["user"] = user
+    connected, _ = await communicator.connect()
+    return communicator, connected
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_task_update_is_pushed_as_diff(board_realtime):
+    user, board, task_list, task = await make_board()
+    communicator, connected = await connect(user, board)
+    assert connected is True
+
+    await update_task(task.id, title="Renamed")
+
+    assert await communicator.receive_json_from(timeout=2) == {"changes": [
+        {"kind": "task", "op": "updated", "id": str(task.id), "fields": {"title": "Renamed"}},
+    ]}
+    await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_rapid_changes_are_coalesced(board_realtime):
+    user, board, task_list, task = await make_board()
+    other_list = await database_sync_to_async(TaskListFactory)(board=board)
+    communicator, _ = await connect(user, board)
+
+    await update_task(task.id, title="Renamed")
+    await update_task(task.id, task_list_id=other_list.id)
+    created = await database_sync_to_async(TaskFactory)(task_list=task_list)
+    await database_sync_to_async(created.delete)()
+
+    response = await communicator.receive_json_from(timeout=2)
+    assert response["changes"] == [{
+        "kind": "task", "op": "moved", "id": str(task.id),
+        "fields": {"title": "Renamed", "task_list": str(other_list.id)},
+    }]
+    assert await communicator.receive_nothing()
+    await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_other_boards_are_not_pushed(board_realtime):
+    user, board, task_list, task = await make_board()
+    other_task = await database_sync_to_async(TaskFactory)()
+    communicator, _ = await connect(user, board)
+
+    await update_task(other_task.id, is_done=True)
+
+    assert await communicator.receive_nothing()
+    await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_non_team_user_is_rejected(board_realtime):
+    _, board, _, _ = await make_board()
+    outsider = await database_sync_to_async(UserFactory)(is_active=True, role=Role.PROJECT_MEMBER)
+
+    _, connected = await connect(outsider, board)
+
+    assert connected is False
+
+
+def test_merge_change():
+    pending = {}
+    realtime.merge_change(pending, {"kind": "task", "op": "created", "id": "1", "fields": {"title": "a"}})
+    realtime.merge_change(pending, {"kind": "task", "op": "done", "id": "1", "fields": {"is_done": True}})
+    realtime.merge_change(pending, {"kind": "task", "op": "updated", "id": "2", "fields": {"title": "b"}})
+    realtime.merge_change(pending, {"kind": "task", "op": "done", "id": "2", "fields": {"is_done": True}})
+
+    assert pending[("task", "1")] == {"kind": "task", "op": "created", "id": "1",
+                                      "fields": {"title": "a", "is_done": True}}
+    assert pending[("task", "2")]["op"] == "done"
+
+    realtime.merge_change(pending, {"kind": "task", "op": "deleted", "id": "1", "fields": {}})
+    assert ("task", "1") not in pending
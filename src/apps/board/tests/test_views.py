@@ -1,12 +1,17 @@
 import pytest
+from unittest import mock
+from redis.exceptions import ConnectionError as RedisConnectionError
 from rest_framework import status
 from django.urls import reverse
 from rest_framework.test import APIClient
 from apps.board.models import BoardModel
 from apps.account.tests.factories import UserFactory
 from apps.account.enums import UserRoleEnum as Role
-from apps.team.tests.factories import TeamFactory
+from apps.team.tests.factories import TeamFactory, TeamMembershipFactory
+from apps.notification.models import Notification
 from apps.board.tests.factories import BoardFactory
+from apps.board.services import cache
+from apps.task.tests.factories import TaskListFactory, TaskFactory
 
 
 @pytest.mark.django_db
@@ -161,9 +166,221 @@ class TestBoardUpdateView:
         response = self.client.put(url, {"title": "New Title"})
         assert response.status_code == 404
 
+    def test_archive_notifies_team_members(self, django_capture_on_commit_callbacks):
+        BoardModel.objects.filter(pk=self.board.pk).update(is_archived=False)
+        members = TeamMembershipFactory.create_batch(2, team=self.board.team)
+        self.client.force_authenticate(user=self.admin)
+
+        with mock.patch("apps.notification.tasks.send_queued_emails.delay"), \
+                mock.patch("apps.notification.tasks.send_sms_notifications.delay"), \
+                django_capture_on_commit_callbacks(execute=True):
+            response = self.client.put(self.url, {"is_archived": True})
+
+        assert response.status_code == 200
+        notified = Notification.objects.filter(kwargs__contains="BOARD_ARCHIVED").values_list("to_user", flat=True)
+        assert set(notified) == {member.user_id for member in members}
+
+
+
+
+
+
+
+
+
+@pytest.mark.django_db
+class TestSnapshotBoardView:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings):
+        settings.BOARD_CACHE_CONFIG = {**settings.BOARD_CACHE_CONFIG, "ENABLED": False}
+        self.client = APIClient()
+        self.user = UserFactory(is_active=True, role=Role.PROJECT_MEMBER)
+        self.team = TeamFactory()
+        TeamMembershipFactory(user=self.user, team=self.team)
+        self.board = BoardFactory(team=self.team)
+        self.url = reverse("board:board-snapshot", kwargs={"board_id": str(self.board.id)})
+
+    def fresh(self, user=None):
+        # a new instance per request like real ones, nothing cached on it
+        user = user or self.user
+        return type(user).objects.get(pk=user.pk)
+
+    def get(self, user=None, **headers):
+        self.client.force_authenticate(user=user or self.fresh())
+        return self.client.get(self.url, **headers)
+
+    def fill(self, lists, tasks_per_list):
+        task_lists = [TaskListFactory(board=self.board) for _ in range(lists)]
+        for task_list in task_lists:
+            TaskFactory.create_batch(tasks_per_list, task_list=task_list)
+        return task_lists
+
+    def test_snapshot_content(self):
+        second, first = TaskListFactory(board=self.board, order=2), TaskListFactory(board=self.board, order=1)
+        task = TaskFactory(task_list=first)
+        TaskFactory(task_list=first, assignee=None)
+
+        response = self.get()
+
+        assert response.status_code == 200
+        assert response.data["title"] == self.board.title
+        assert [task_list["id"] for task_list in response.data["task_lists"]] == [str(first.id), str(second.id)]
+        tasks = response.data["task_lists"][0]["tasks"]
+        assert tasks[0]["assignee"] == {"id": task.assignee.id, "name": task.assignee.full_name()}
+        assert tasks[1]["assignee"] is None
+        assert response.data["task_lists"][1]["tasks"] == []
+
+    def test_query_count_does_not_grow(self, django_assert_num_queries):
+        self.fill(1, 1)
+        # user block check, board, membership, task lists, tasks
+        user = self.fresh()
+        with django_assert_num_queries(5):
+            self.get(user)
+
+        self.fill(5, 10)
+        user = self.fresh()
+        with django_assert_num_queries(5):
+            response = self.get(user)
+        assert len(response.data["task_lists"]) == 6
+
+    def test_unchanged_board_returns_304(self, django_assert_num_queries):
+        task_list, = self.fill(1, 2)
+        etag = self.get()["ETag"]
+
+        # user block check, board, membership, fingerprint
+        user = self.fresh()
+        with django_assert_num_queries(4):
+            response = self.get(user, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+        task = task_list.tasks.first()
+        task.title = "Changed"
+        task.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert self.get(HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
 
+    def test_deleted_task_changes_etag(self):
+        task_list, = self.fill(1, 2)
+        etag = self.get()["ETag"]
 
+        task_list.tasks.first().delete()
 
+        assert self.get(HTTP_IF_NONE_MATCH=etag).status_code == 200
 
+    def test_forbidden_for_non_team_user(self):
+        etag = self.get()["ETag"]
+        outsider = UserFactory(is_active=True, role=Role.PROJECT_MEMBER)
 
+        assert self.get(outsider).status_code == status.HTTP_403_FORBIDDEN
+        assert self.get(outsider, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_403_FORBIDDEN
 
+    def test_not_found(self):
+        self.url = reverse("board:board-snapshot", kwargs={"board_id": "00000000-0000-0000-0000-000000000000"})
+
+        assert self.get().status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestSnapshotBoardCache:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, fake_redis, in_memory_layer):
+        settings.BOARD_CACHE_CONFIG = {**settings.BOARD_CACHE_CONFIG, "ENABLED": True}
+        self.client = APIClient()
+        self.user = UserFactory(is_active=True, role=Role.PROJECT_MEMBER)
+        self.team = TeamFactory()
+        TeamMembershipFactory(user=self.user, team=self.team)
+        self.board = BoardFactory(team=self.team)
+        self.task_list = TaskListFactory(board=self.board)
+        self.tasks = TaskFactory.create_batch(3, task_list=self.task_list)
+        self.url = reverse("board:board-snapshot", kwargs={"board_id": str(self.board.id)})
+
+    def get(self, **headers):
+        self.client.force_authenticate(user=type(self.user).objects.get(pk=self.user.pk))
+        return self.client.get(self.url, **headers)
+
+    def test_hit_needs_no_board_queries(self, django_assert_num_queries):
+        first = self.get()
+        user = type(self.user).objects.get(pk=self.user.pk)
+        self.client.force_authenticate(user=user)
+
+        # user block check, membership
+        with django_assert_num_queries(2):
+            second = self.client.get(self.url)
+
+        assert second.json() == first.json()
+        assert second["ETag"] == first["ETag"]
+        assert cache.get_stats()["hit_ratio"] == 0.5
+
+    def test_commit_moves_to_a_new_version(self, django_capture_on_commit_callbacks):
+        etag = self.get()["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.tasks[0].title = "Changed"
+            self.tasks[0].save()
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert "Changed" in [task["title"] for task in response.data["task_lists"][0]["tasks"]]
+        assert self.get(HTTP_IF_NONE_MATCH=response["ETag"]).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_transaction_bumps_each_board_once(self, django_capture_on_commit_callbacks,
+                                               django_assert_num_queries):
+        self.get()
+        version = cache.get_version(self.board.id)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            for task in self.tasks:
+                task.save()
+            self.task_list.save()
+        # task lists resolved to boards
+        with django_assert_num_queries(1):
+            for callback in callbacks:
+                callback()
+
+        assert cache.get_version(self.board.id) == version + 1
+
+    def test_uncommitted_change_is_not_seen(self):
+        self.get()
+
+        self.tasks[0].title = "Changed"
+        self.tasks[0].save()
+
+        # still in the test transaction, the version moves on commit only
+        assert "Changed" not in [task["title"] for task in self.get().data["task_lists"][0]["tasks"]]
+
+    def test_redis_down_reads_the_database(self):
+        with mock.patch.object(cache.redis_utils, "get_counter", side_effect=RedisConnectionError("down")):
+            response = self.get()
+
+        assert response.status_code == 200
+        assert len(response.data["task_lists"][0]["tasks"]) == 3
+
+    def test_forbidden_for_non_team_user(self):
+        self.get()
+        outsider = UserFactory(is_active=True, role=Role.PROJECT_MEMBER)
+        self.client.force_authenticate(user=outsider)
+
+        assert self.client.get(self.url).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_stats_for_admin_only(self):
+        self.get()
+        self.get()
+        admin = UserFactory(is_active=True, role=Role.ADMIN)
+        self.client.force_authenticate(user=admin)
+
+        response = self.client.get(reverse("board:board-cache-stats"))
+
+        assert response.status_code == 200
+        assert response.data["hits"] == 1
+        assert response.data["misses"] == 1
+        assert response.data["rebuilds"] == 1
+        assert response.data["avg_rebuild_ms"] is not None
+
+        self.client.force_authenticate(user=self.user)
+        assert self.client.get(reverse("board:board-cache-stats")).status_code == status.HTTP_403_FORBIDDEN
@@ -9,6 +9,8 @@ urlpatterns = [
     path('create/', views.CreateBoardView.as_view(), name='board-create'),
     path('list-boards/', views.BoardsTeamsView.as_view(), name='boards_teams'),
     path('<uuid:board_id>/detail/', views.DetailBoardView.as_view(), name='board-detail'),
+    path('<uuid:board_id>/snapshot/', views.SnapshotBoardView.as_view(), name='board-snapshot'),
+    path('cache-stats/', views.BoardCacheStatsView.as_view(), name='board-cache-stats'),
     path("delete/", views.DeleteBoardView.as_view(), name="board-delete"),
     path('<uuid:board_id>/update/', views.BoardUpdateViews.as_view(), name='board-update'),
 ]
@@ -1,3 +1,5 @@
+from django.utils.http import parse_etags
+from django.utils.translation import gettext_lazy as _
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -7,9 +9,10 @@ from apps.core.swagger import mixins as ms
 from apps.core.services.access_control import is_team_member
 from apps.core import text
 from apps.account.auth import permissions as per
-from apps.team.models import TeamModel
+from apps.notification.utils import create_notify_team
 
 from . import models, exceptions, serializers
+from .services import snapshot, cache as board_cache
 
 
 class CreateBoardView(ms.SwaggerViewMixin, mixins.CreateViewMixin, APIView):
@@ -25,9 +28,8 @@ class CreateBoardView(ms.SwaggerViewMixin, mixins.CreateViewMixin, APIView):
 
     def post(self, request, *args, **kwargs):
         team_id = request.data.get("team_id")
-        team = TeamModel.objects.filter(id=team_id).first()
 
-        is_team_member(request.user, team)
+        is_team_member(request.user, team_id)
 
         response_data = self.create(request, response=False, *args, **kwargs)
         return Response(response_data, status=status.HTTP_201_CREATED)
@@ -75,10 +77,83 @@ class DetailBoardView(ms.SwaggerViewMixin, mixins.DetailViewMixin, APIView):
         board = models.BoardModel.objects.filter(id=board_id).first()
         if not board:
             raise exceptions.NotFoundTeam()
-        is_team_member(self.request.user, board.team)
+        is_team_member(self.request.user, board.team_id)
         return board
 
 
+class SnapshotBoardView(ms.SwaggerViewMixin, APIView):
+    """
+        the board with its ordered task lists and all their tasks, in a fixed number of queries
+        (none while it is cached, see board.services.cache).
+        send the ETag back in If-None-Match to get 304 while the board did not change
+    """
+
+    swagger_title = "Board Snapshot"
+    swagger_tags = ["Board"]
+    serializer_response = serializers.SnapshotBoardSerializer
+    permission_classes = (per.IsTeamUser,)
+
+    def get(self, request, *args, **kwargs):
+        board_id = self.kwargs.get('board_id')
+        if_none_match = request.headers.get('If-None-Match')
+
+        cached = board_cache.get_snapshot(board_id, lambda: self.build(board_id))
+        if cached is None:
+            return self.get_uncached(request, board_id, if_none_match)
+
+        payload, etag = cached
+        is_team_member(request.user, payload['team_id'])
+        if if_none_match and self.etag_matches(if_none_match, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(payload['board'], status=status.HTTP_200_OK, headers={'ETag': etag})
+
+    def get_board(self, board_id):
+        board = snapshot.get_snapshot_queryset(models.BoardModel.objects.filter(id=board_id)).first()
+        if not board:
+            raise exceptions.NotFoundBoard()
+        return board
+
+    def build(self, board_id):
+        board = self.get_board(board_id)
+        return {'team_id': str(board.team_id), 'board': self.serializer_response(board).data}
+
+    def get_uncached(self, request, board_id, if_none_match):
+        if if_none_match:
+            board = models.BoardModel.objects.filter(id=board_id).first()
+            if not board:
+                raise exceptions.NotFoundBoard()
+            is_team_member(request.user, board.team_id)
+            etag = snapshot.get_etag(board)
+            if self.etag_matches(if_none_match, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        board = self.get_board(board_id)
+        is_team_member(request.user, board.team_id)
+
+        data = self.serializer_response(board).data
+        return Response(data, status=status.HTTP_200_OK, headers={'ETag': snapshot.get_loaded_etag(board)})
+
+    @staticmethod
+    def etag_matches(if_none_match, etag):
+        # weak comparison, as If-None-Match asks for
+        tags = parse_etags(if_none_match)
+        return '*' in tags or etag.removeprefix('W/') in [tag.removeprefix('W/') for tag in tags]
+
+
+class BoardCacheStatsView(ms.SwaggerViewMixin, APIView):
+    """
+        hit ratio and rebuild time of the board snapshot cache
+    """
+
+    swagger_title = "Board Cache Stats"
+    swagger_tags = ["Board"]
+    serializer_response = serializers.BoardCacheStatsSerializer
+    permission_classes = (per.IsAdmin,)
+
+    def get(self, request, *args, **kwargs):
+        return Response(self.serializer_response(board_cache.get_stats()).data, status=status.HTTP_200_OK)
+
+
 class DeleteBoardView(ms.SwaggerViewMixin, mixins.DeleteViewMixin, APIView):
     """
         delete board view
@@ -98,7 +173,7 @@ class DeleteBoardView(ms.SwaggerViewMixin, mixins.DeleteViewMixin, APIView):
         serializer.is_valid(raise_exception=True)
         self.validated_data = serializer.validated_data
         board = self.validated_data["board"]
-        is_team_member(self.request.user, board.team)
+        is_team_member(self.request.user, board.team_id)
 
         return board
 
@@ -116,17 +191,35 @@ class BoardUpdateViews(ms.SwaggerViewMixin, mixins.UpdateViewMixin, APIView):
 
     def get_instance(self):
         board_id = self.kwargs.get('board_id')
-        board = models.BoardModel.objects.filter(id=board_id).first()
+        board = models.BoardModel.objects.select_related('team').filter(id=board_id).first()
         if not board:
             raise exceptions.NotFoundBoard()
-        is_team_member(self.request.user, board.team)
+        is_team_member(self.request.user, board.team_id)
         return board
 
     def put(self, request, *args, **kwargs):
         instance = self.get_instance()
+        was_archived = instance.is_archived
         ser = self.serializer(instance, data=request.data, partial=True, context={'request': request})
         ser.is_valid(raise_exception=True)
-        ser.save()
+        board = ser.save()
+
+        if board.is_archived and not was_archived:
+            create_notify_team(
+                board.team_id,
+                title=_("Board Archived"),
+                description=_("Board '{board}' of team '{team}' has been archived by {admin}.").format(
+                    board=board.title,
+                    team=board.team.name,
+                    admin=request.user.full_name()
+                ),
+                kwargs={
+                    'board_title': board.title,
+                    'team_name': board.team.name,
+                    'type': 'BOARD_ARCHIVED'
+                },
+                exclude=request.user
+            )
 
         return Response({
             'message': text.success_update,
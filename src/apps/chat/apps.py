@@ -6,3 +6,6 @@ class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.chat'
     verbose_name = _('Chat')
+
+    def ready(self):
+        from . import signals
@@ -1,29 +1,74 @@
+import asyncio
 import json
+import uuid
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+from apps.core.pagination import CursorPaginator, NEXT
+
 from . import models
+from .services import write_behind
+from .services.room_access import ahas_room_access
+from .services.room_state import record_message
+
+
+def message_event(msg):
+    return {
+        'id': str(msg.id),
+        'message': msg.content,
+        'sender': msg.sender.full_name(),
+        'timestamp': msg.created_at.strftime('%Y-%m-%d %H:%M'),
+    }
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
+    # reconnecting clients pass `?since=<last message id>` and get the missed messages
+    # in batches before live traffic, more than backfill_max_messages must be loaded over REST
+    backfill_batch_size = 100
+    backfill_max_messages = 1000
+    access_revoked_code = 4403
 
     async def connect(self):
         self.room_id = self.scope['url_route']['kwargs']['room_name']
         self.user = self.scope['user']
         self.room_group_name = f'chat_{self.room_id}'
 
-        self.room = await self.get_room()
-        if not self.room:
+        self.revalidate_task = None
+
+        if not await ahas_room_access(self.room_id, self.user):
             await self.close()
             return
+        # only the id is needed to store and read messages
+        self.room = models.ChatRoomModel(id=self.room_id)
 
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
+        self.revalidate_task = asyncio.create_task(self.revalidate_access())
+
+        since = parse_qs(self.scope.get('query_string', b'').decode()).get('since')
+        if since:
+            # joined the group first, so a message saved meanwhile may arrive twice (clients dedupe by id)
+            await self.send_backfill(since[0])
 
     async def disconnect(self, close_code):
+        if self.revalidate_task:
+            self.revalidate_task.cancel()
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
+    async def revalidate_access(self):
+        """ close the socket of a user removed from the room """
+        interval = settings.CHAT_CONFIG['ACCESS_RECHECK_INTERVAL']
+        while True:
+            await asyncio.sleep(interval)
+            if not await ahas_room_access(self.room_id, self.user):
+                await self.close(code=self.access_revoked_code)
+                return
+
     async def receive(self, text_data):
         data = json.loads(text_data)
         content = data.get('message')
@@ -31,13 +76,17 @@ class ChatConsumer(AsyncWebsocketConsumer):
         if not content:
             return
 
-        message = await self.save_message(content)
+        if settings.CHAT_CONFIG['WRITE_BEHIND']:
+            message = await self.buffer_message(content)
+        else:
+            message = await self.save_message(content)
 
         await self.channel_layer.group_send(
             self.room_group_name,
             {
                 'type': 'chat_message',
-                'message': message['content'],
+                'id': message['id'],
+                'message': message['message'],
                 'sender': message['sender'],
                 'timestamp': message['timestamp']
             }
@@ -45,32 +94,53 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def chat_message(self, event):
         await self.send(text_data=json.dumps({
+            'id': event.get('id'),
             'message': event['message'],
             'sender': event['sender'],
             'timestamp': event['timestamp'],
         }))
 
+    async def send_backfill(self, since):
+        cursor = await self.get_backfill_cursor(since)
+        sent = 0
+        while cursor and sent < self.backfill_max_messages:
+            messages, cursor = await self.get_backfill_batch(cursor)
+            sent += len(messages)
+            await self.send(text_data=json.dumps({
+                'backfill': messages,
+                'has_more': bool(cursor),
+            }))
+
+    def get_backfill_paginator(self):
+        queryset = models.MessageModel.objects.filter(room=self.room).select_related('sender')
+        return CursorPaginator(queryset, self.backfill_batch_size, ordering=('created_at', 'id'))
+
     @database_sync_to_async
-    def get_room(self):
+    def get_backfill_cursor(self, since):
         try:
-            room = models.ChatRoomModel.objects.prefetch_related('participants').get(id=self.room_id)
-            if self.user in room.participants.all():
-                return room
-            return None
-        except models.ChatRoomModel.DoesNotExist:
+            last_seen = models.MessageModel.objects.get(room=self.room, id=since)
+        except (models.MessageModel.DoesNotExist, ValidationError):
             return None
+        return self.get_backfill_paginator().encode_cursor(NEXT, last_seen)
 
     @database_sync_to_async
-    def save_message(self, content):
-        msg = models.MessageModel.objects.create(
-            room=self.room,
-            sender=self.user,
-            content=content,
-            is_read=False
-        )
-        return {
-            'content': msg.content,
-            'sender': self.user.full_name(),
-            'timestamp': msg.created_at.strftime('%Y-%m-%d %H:%M')
+    def get_backfill_batch(self, cursor):
+        page = self.get_backfill_paginator().get_page(cursor)
+        return [message_event(msg) for msg in page], page.next_cursor
 
-        }
+    async def buffer_message(self, content):
+        msg = models.MessageModel(id=uuid.uuid4(), room=self.room, sender=self.user, content=content,
+                                  created_at=timezone.now())
+        await write_behind.get_buffer().add({
+            'id': str(msg.id),
+            'room_id': str(self.room.id),
+            'sender_id': str(self.user.id),
+            'content': content,
+            'created_at': msg.created_at,
+        })
+        return message_event(msg)
+
+    @database_sync_to_async
+    def save_message(self, content):
+        msg = record_message(self.room, self.user, content)
+        return message_event(msg)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.chat.models import ChatRoomModel
+from apps.chat.services.room_state import rebuild_room_state
+
+
+class Command(BaseCommand):
+    help = 'Rebuild last message pointers and unread counters of chat rooms from message history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--room', action='append', dest='rooms', help='room id, can be repeated')
+
+    def handle(self, *args, **options):
+        rooms = None
+        if options['rooms']:
+            rooms = ChatRoomModel.objects.filter(id__in=options['rooms'])
+
+        rebuilt = rebuild_room_state(rooms)
+        self.stdout.write(self.style.SUCCESS(f'{rebuilt} chat rooms rebuilt'))
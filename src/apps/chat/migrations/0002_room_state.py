@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:08
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroommodel',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.messagemodel', verbose_name='Last message'),
+        ),
+        migrations.CreateModel(
+            name='ChatUnreadCounterModel',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_counters', to='chat.chatroommodel', verbose_name='Room')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_unread_counters', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Unread counter',
+                'verbose_name_plural': 'Unread counters',
+                'indexes': [models.Index(fields=['user', 'count'], name='chat_chatun_user_id_fd096b_idx')],
+                'unique_together': {('room', 'user')},
+            },
+        ),
+    ]
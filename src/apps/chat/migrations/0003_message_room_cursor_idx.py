@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_room_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='messagemodel',
+            index=models.Index(fields=['room', '-created_at', '-id'], name='chat_message_room_cursor_idx'),
+        ),
+    ]
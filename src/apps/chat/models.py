@@ -1,13 +1,41 @@
 from django.db import models
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 
 from apps.core.models import BaseModel
 
 
+class ChatRoomQuerySet(models.QuerySet):
+    def for_user(self, user):
+        return self.filter(participants=user)
+
+    def summaries_for(self, user):
+        """
+            rooms of user with last message, unread count and opponent in a fixed number of queries
+        """
+        unread = ChatUnreadCounterModel.objects.filter(room=OuterRef('pk'), user=user).values('count')[:1]
+        opponents = get_user_model().objects.exclude(id=user.id)
+        return self.for_user(user) \
+            .select_related('last_message') \
+            .annotate(unread_count=Coalesce(Subquery(unread), 0)) \
+            .prefetch_related(Prefetch('participants', queryset=opponents, to_attr='opponents')) \
+            .order_by(models.F('last_message__created_at').desc(nulls_last=True), '-created_at')
+
+    def unread_for(self, user):
+        return self.filter(unread_counters__user=user, unread_counters__count__gt=0)
+
+
 class ChatRoomModel(BaseModel):
     participants = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='chat_room',
                                           verbose_name=_('Participants'))
+    # denormalized, kept in sync by services.room_state
+    last_message = models.ForeignKey('MessageModel', related_name='+', on_delete=models.SET_NULL, null=True,
+                                     blank=True, verbose_name=_('Last message'))
+
+    objects = ChatRoomQuerySet.as_manager()
 
     class Meta:
         verbose_name = _('ChatRoom')
@@ -27,3 +55,24 @@ class MessageModel(BaseModel):
         verbose_name = _('Message')
         verbose_name_plural = _('Messages')
         ordering = ("-created_at",)
+        indexes = [
+            # room history pages and websocket backfill
+            models.Index(fields=['room', '-created_at', '-id'], name='chat_message_room_cursor_idx'),
+        ]
+
+
+class ChatUnreadCounterModel(BaseModel):
+    """
+        unread messages of one participant in one room, kept in sync by services.room_state
+    """
+    room = models.ForeignKey(ChatRoomModel, related_name='unread_counters', on_delete=models.CASCADE,
+                             verbose_name=_('Room'))
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='chat_unread_counters',
+                             on_delete=models.CASCADE, verbose_name=_('User'))
+    count = models.PositiveIntegerField(_('Count'), default=0)
+
+    class Meta:
+        unique_together = ('room', 'user')
+        indexes = [models.Index(fields=['user', 'count'])]
+        verbose_name = _('Unread counter')
+        verbose_name_plural = _('Unread counters')
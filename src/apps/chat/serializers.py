@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
 from apps.core import text
+from apps.core.serializers import ListSerializer
 from . import models
 
 User = get_user_model()
@@ -39,8 +40,12 @@ class ChatRoomCreateSerializer(serializers.ModelSerializer):
 
 
 class ChatRoomSummarySerializer(serializers.ModelSerializer):
+    """
+        expects the queryset of ChatRoomModel.objects.summaries_for(user),
+        every field is read from annotations / prefetched rows
+    """
     last_message = serializers.SerializerMethodField()
-    unread_count = serializers.SerializerMethodField()
+    unread_count = serializers.IntegerField(read_only=True)
     opponent = serializers.SerializerMethodField()
 
     class Meta:
@@ -48,8 +53,7 @@ class ChatRoomSummarySerializer(serializers.ModelSerializer):
         fields = ['id', 'opponent', 'last_message', 'unread_count', 'created_at']
 
     def get_opponent(self, obj):
-        request_user = self.context['request'].user
-        opponent = obj.participants.exclude(id=request_user.id).first()
+        opponent = obj.opponents[0] if obj.opponents else None
         if opponent:
             return {
                 'id': str(opponent.id),
@@ -59,7 +63,7 @@ class ChatRoomSummarySerializer(serializers.ModelSerializer):
         return None
 
     def get_last_message(self, obj):
-        msg = obj.messages.order_by('-created_at').first()
+        msg = obj.last_message
         if msg:
             return {
                 'content': msg.content,
@@ -67,6 +71,22 @@ class ChatRoomSummarySerializer(serializers.ModelSerializer):
             }
         return None
 
-    def get_unread_count(self, obj):
-        user = self.context['request'].user
-        return obj.messages.filter(is_read=False).exclude(sender=user).count()
\ No newline at end of file
+
+class ChatRoomSummaryResponseSerializer(ListSerializer):
+    data = ChatRoomSummarySerializer(many=True)
+
+
+class MessageSerializer(serializers.ModelSerializer):
+    sender_name = serializers.CharField(source='sender.full_name', read_only=True)
+
+    class Meta:
+        model = models.MessageModel
+        fields = ['id', 'sender', 'sender_name', 'content', 'is_read', 'created_at']
+
+
+class MessageListResponseSerializer(serializers.Serializer):
+    data = MessageSerializer(many=True)
+
+
+class MarkRoomAsReadSerializer(serializers.Serializer):
+    marked_count = serializers.IntegerField(read_only=True)
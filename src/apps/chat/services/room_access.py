@@ -0,0 +1,102 @@
+"""
+    who may use a chat room.
+    membership is one indexed lookup on the participants table, the answer is cached in redis
+    and invalidated by signals.sync_room_access whenever the participants of a room change.
+"""
+import logging
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from redis.exceptions import RedisError
+
+from apps.core import redis_async, redis_utils
+from apps.chat import models
+
+logger = logging.getLogger(__name__)
+
+ROOM_ACCESS_KEY = 'chat_room_access_{}_{}'  # redis key, room id and user id
+INVALIDATED = -1  # cached value of an invalidated key, read as a miss and never overwritten until it expires
+
+
+def get_access_key(room_id, user_id):
+    return ROOM_ACCESS_KEY.format(room_id, user_id)
+
+
+def is_participant(room_id, user_id):
+    try:
+        return models.ChatRoomModel.participants.through.objects \
+            .filter(chatroommodel_id=room_id, user_id=user_id) \
+            .exists()
+    except ValidationError:
+        # room id from the url is not a uuid
+        return False
+
+
+def get_cached(cached):
+    """ the cached answer, None when there is none (or it was invalidated) """
+    if cached is None or cached == INVALIDATED:
+        return None
+    return bool(cached)
+
+
+def has_room_access(room_id, user):
+    if not user.is_authenticated:
+        return False
+    key = get_access_key(room_id, user.pk)
+    try:
+        cached = redis_utils.get_value(key)
+    except RedisError:
+        logger.warning('Room access cache unavailable, checking the database')
+        return is_participant(room_id, user.pk)
+
+    answer = get_cached(cached)
+    if answer is not None:
+        return answer
+
+    allowed = is_participant(room_id, user.pk)
+    if cached is None:
+        try:
+            # only if still absent: an invalidation since the read left its marker, this answer may be stale
+            redis_utils.get_and_set_if_absent(key, int(allowed), settings.CHAT_CONFIG['ACCESS_CACHE_TIMEOUT'])
+        except RedisError:
+            logger.warning('Room access cache unavailable, answer not cached')
+    return allowed
+
+
+async def ahas_room_access(room_id, user):
+    if not user.is_authenticated:
+        return False
+    key = get_access_key(room_id, user.pk)
+    try:
+        cached = await redis_async.get_value(key)
+    except RedisError:
+        logger.warning('Room access cache unavailable, checking the database')
+        return await database_sync_to_async(is_participant)(room_id, user.pk)
+
+    answer = get_cached(cached)
+    if answer is not None:
+        return answer
+
+    allowed = await database_sync_to_async(is_participant)(room_id, user.pk)
+    if cached is None:
+        try:
+            await redis_async.get_and_set_if_absent(key, int(allowed), settings.CHAT_CONFIG['ACCESS_CACHE_TIMEOUT'])
+        except RedisError:
+            logger.warning('Room access cache unavailable, answer not cached')
+    return allowed
+
+
+def invalidate_room_access(pairs):
+    """
+        pairs: (room_id, user_id) whose cached answer is stale. the keys get a marker instead of being
+        removed, so an answer read from the database before the change can not be cached after it
+    """
+    keys = [get_access_key(room_id, user_id) for room_id, user_id in pairs]
+    if not keys:
+        return
+    try:
+        redis_utils.set_many_expire(dict.fromkeys(keys, INVALIDATED), settings.CHAT_CONFIG['ACCESS_CACHE_TIMEOUT'])
+    except RedisError:
+        # entries expire after ACCESS_CACHE_TIMEOUT
+        logger.exception('Could not invalidate room access cache')
@@ -0,0 +1,153 @@
+"""
+    denormalized room state: ChatRoomModel.last_message and ChatUnreadCounterModel.
+    every write to chat messages goes through these functions so list views never scan history.
+"""
+import datetime
+import uuid
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+
+from apps.chat import models
+
+
+def ensure_counters(room, users):
+    models.ChatUnreadCounterModel.objects.bulk_create(
+        [models.ChatUnreadCounterModel(room=room, user=user) for user in users],
+        ignore_conflicts=True,
+    )
+
+
+@transaction.atomic
+def record_message(room, sender, content):
+    """
+        store a message, move the room's last message pointer and
+        increase the unread counter of every other participant
+    """
+    message = models.MessageModel.objects.create(room=room, sender=sender, content=content, is_read=False)
+
+    # a concurrent send may have stored a newer message already
+    if models.ChatRoomModel.objects \
+            .filter(pk=room.pk) \
+            .filter(Q(last_message__isnull=True) | Q(last_message__created_at__lte=message.created_at)) \
+            .update(last_message=message):
+        room.last_message = message
+
+    counters = models.ChatUnreadCounterModel.objects.filter(room=room).exclude(user=sender)
+    if not counters.update(count=F('count') + 1):
+        # room created before counters existed, or its counters were never rebuilt
+        ensure_counters(room, room.participants.exclude(pk=sender.pk))
+        counters.update(count=F('count') + 1)
+
+    return message
+
+
+@transaction.atomic
+def record_messages(messages):
+    """
+        bulk counterpart of record_message for messages that were already broadcast (write-behind).
+        messages: dicts with id, room_id, sender_id, content and created_at.
+    """
+    if not messages:
+        return []
+    messages = [_normalize(msg) for msg in messages]
+
+    objs = models.MessageModel.objects.bulk_create([
+        models.MessageModel(id=msg['id'], room_id=msg['room_id'], sender_id=msg['sender_id'],
+                            content=msg['content'], is_read=False)
+        for msg in messages
+    ])
+    # auto_now_add overwrote created_at, keep the time clients already saw
+    models.MessageModel.objects.filter(pk__in=[obj.pk for obj in objs]).update(created_at=Case(
+        *[When(pk=msg['id'], then=Value(msg['created_at'])) for msg in messages]
+    ))
+
+    latest = {}
+    senders = defaultdict(Counter)
+    for msg in messages:
+        room_id = msg['room_id']
+        if room_id not in latest or msg['created_at'] > latest[room_id]['created_at']:
+            latest[room_id] = msg
+        senders[room_id][msg['sender_id']] += 1
+
+    for room_id, msg in latest.items():
+        models.ChatRoomModel.objects \
+            .filter(pk=room_id) \
+            .filter(Q(last_message__isnull=True) | Q(last_message__created_at__lte=msg['created_at'])) \
+            .update(last_message_id=msg['id'])
+
+    counters = models.ChatUnreadCounterModel.objects.filter(room_id__in=senders).values_list('pk', 'room_id', 'user_id')
+    rows = list(counters)
+    missing = set(senders) - {room_id for _, room_id, _ in rows}
+    if missing:
+        # rooms created before counters existed, or whose counters were never rebuilt
+        for room in models.ChatRoomModel.objects.filter(pk__in=missing).prefetch_related('participants'):
+            ensure_counters(room, room.participants.all())
+        rows = list(counters)
+
+    increments = {}
+    for pk, room_id, user_id in rows:
+        room_senders = senders[room_id]
+        increment = sum(room_senders.values()) - room_senders.get(user_id, 0)
+        if increment:
+            increments[pk] = increment
+    if increments:
+        models.ChatUnreadCounterModel.objects.filter(pk__in=increments).update(count=F('count') + Case(
+            *[When(pk=pk, then=Value(increment)) for pk, increment in increments.items()]
+        ))
+
+    return objs
+
+
+def _normalize(message):
+    # ids and created_at are strings once the message went through the redis stream
+    created_at = message['created_at']
+    return {
+        **message,
+        'id': uuid.UUID(str(message['id'])),
+        'room_id': uuid.UUID(str(message['room_id'])),
+        'sender_id': uuid.UUID(str(message['sender_id'])),
+        'created_at': datetime.datetime.fromisoformat(created_at) if isinstance(created_at, str) else created_at,
+    }
+
+
+@transaction.atomic
+def mark_room_as_read(room, user):
+    """
+        returns the number of messages marked as read
+    """
+    marked = models.MessageModel.objects \
+        .filter(room=room, is_read=False) \
+        .exclude(sender=user) \
+        .update(is_read=True)
+    models.ChatUnreadCounterModel.objects.filter(room=room, user=user).update(count=0)
+    return marked
+
+
+def rebuild_room_state(rooms=None):
+    """
+        recompute last message pointers and unread counters from message history.
+        every room is rebuilt in its own transaction, returns the number of rooms rebuilt.
+    """
+    rooms = models.ChatRoomModel.objects.all() if rooms is None else rooms
+    rebuilt = 0
+
+    for room in rooms.prefetch_related('participants').iterator(chunk_size=500):
+        with transaction.atomic():
+            _rebuild_room(room)
+        rebuilt += 1
+
+    return rebuilt
+
+
+def _rebuild_room(room):
+    last_message = room.messages.order_by('-created_at').first()
+    models.ChatRoomModel.objects.filter(pk=room.pk).update(last_message=last_message)
+
+    participants = list(room.participants.all())
+    ensure_counters(room, participants)
+    for user in participants:
+        models.ChatUnreadCounterModel.objects.filter(room=room, user=user).update(
+            count=room.messages.filter(is_read=False).exclude(sender=user).count()
+        )
@@ -0,0 +1,101 @@
+"""
+    write-behind storage of chat messages.
+    the consumer gives every message its id and timestamp and broadcasts it at once, the message is
+    appended to a redis stream (survives a crash of this process) and stored with one bulk insert
+    every FLUSH_INTERVAL or FLUSH_BATCH_SIZE messages. tasks.recover_chat_messages stores what a
+    dead process left in the stream. a message whose room or sender was deleted meanwhile is logged and
+    dropped, so it never keeps the rest of its batch in the stream.
+"""
+import asyncio
+import logging
+import weakref
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+
+from apps.chat import models
+from apps.core import redis_async
+
+from . import room_state
+
+logger = logging.getLogger(__name__)
+
+
+class MessageBuffer:
+
+    def __init__(self):
+        self.pending = []
+        self.flush_task = None
+        self.lock = asyncio.Lock()
+
+    async def add(self, message):
+        conf = settings.CHAT_CONFIG
+        entry_id = await redis_async.stream_add(conf['STREAM'], message, conf['STREAM_MAXLEN'])
+        self.pending.append((entry_id, message))
+
+        if len(self.pending) >= conf['FLUSH_BATCH_SIZE']:
+            await self.flush()
+        elif self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self.flush_later(conf['FLUSH_INTERVAL']))
+
+    async def flush_later(self, delay):
+        await asyncio.sleep(delay)
+        await self.flush()
+
+    async def flush(self):
+        async with self.lock:
+            batch, self.pending = self.pending, []
+            if not batch:
+                return 0
+            try:
+                await database_sync_to_async(store_messages)([message for _, message in batch])
+            except Exception:
+                # entries stay in the stream, the recovery task stores them
+                logger.exception('Chat write-behind flush of %s messages failed', len(batch))
+                return 0
+            await redis_async.stream_delete(settings.CHAT_CONFIG['STREAM'], [entry_id for entry_id, _ in batch])
+            return len(batch)
+
+
+def get_existing(model, ids):
+    return {str(pk) for pk in model.objects.filter(pk__in=ids).values_list('pk', flat=True)}
+
+
+def store_messages(messages):
+    """
+        room_state.record_messages for buffered messages, without those of deleted rooms or senders
+    """
+    rooms = get_existing(models.ChatRoomModel, {str(message['room_id']) for message in messages})
+    senders = get_existing(get_user_model(), {str(message['sender_id']) for message in messages})
+    valid = []
+    for message in messages:
+        if str(message['room_id']) in rooms and str(message['sender_id']) in senders:
+            valid.append(message)
+        else:
+            logger.warning('Dropping chat message %s of a deleted room or sender', message['id'])
+
+    try:
+        return room_state.record_messages(valid)
+    except IntegrityError:
+        # a room or sender deleted since the check, store the others one by one
+        stored = []
+        for message in valid:
+            try:
+                stored += room_state.record_messages([message])
+            except IntegrityError:
+                logger.exception('Dropping chat message %s', message['id'])
+        return stored
+
+
+_buffers = weakref.WeakKeyDictionary()
+
+
+def get_buffer():
+    """ one buffer per event loop, like redis_async connections """
+    loop = asyncio.get_running_loop()
+    buffer = _buffers.get(loop)
+    if buffer is None:
+        buffer = _buffers[loop] = MessageBuffer()
+    return buffer
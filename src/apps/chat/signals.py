@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.dispatch import receiver
+from django.db.models.signals import m2m_changed
+from django.contrib.auth import get_user_model
+
+from .services.room_access import invalidate_room_access
+from .services.room_state import ensure_counters
+from . import models
+
+
+@receiver(m2m_changed, sender=models.ChatRoomModel.participants.through)
+def sync_unread_counters(sender, instance, action, reverse, pk_set, **kwargs):
+    """ every participant of a room has an unread counter row """
+    if action == 'post_clear':
+        counters = models.ChatUnreadCounterModel.objects
+        (counters.filter(user=instance) if reverse else counters.filter(room=instance)).delete()
+        return
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+
+    if reverse:
+        pairs = [(room, instance) for room in models.ChatRoomModel.objects.filter(pk__in=pk_set)]
+    else:
+        pairs = [(instance, user) for user in get_user_model().objects.filter(pk__in=pk_set)]
+
+    if action == 'post_add':
+        for room, user in pairs:
+            ensure_counters(room, [user])
+    else:
+        for room, user in pairs:
+            models.ChatUnreadCounterModel.objects.filter(room=room, user=user).delete()
+
+
+@receiver(m2m_changed, sender=models.ChatRoomModel.participants.through)
+def sync_room_access(sender, instance, action, reverse, pk_set, **kwargs):
+    """ drop cached room access of every (room, user) pair that changed """
+    if action in ('post_add', 'post_remove') and pk_set:
+        pairs = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+    elif action == 'pre_clear':
+        if reverse:
+            pairs = [(room_id, instance.pk) for room_id in instance.chat_room.values_list('pk', flat=True)]
+        else:
+            pairs = [(instance.pk, user_id) for user_id in instance.participants.values_list('pk', flat=True)]
+    else:
+        return
+
+    transaction.on_commit(lambda: invalidate_room_access(pairs))
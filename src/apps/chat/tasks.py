@@ -0,0 +1,39 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from apps.core import redis_utils
+
+from . import models
+from .services.write_behind import store_messages
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def recover_chat_messages(batch_size=500):
+    """
+        store write-behind messages left in the stream by a process that died before flushing.
+        only entries older than RECOVER_AFTER are read, younger ones still belong to a live buffer.
+        the cutoff is taken from the clock of the redis server, which issued the entry ids.
+    """
+    conf = settings.CHAT_CONFIG
+    max_id = f"{int((redis_utils.get_time() - conf['RECOVER_AFTER']) * 1000)}-0"
+    recovered = 0
+
+    while True:
+        entries = redis_utils.stream_range(conf['STREAM'], max_id=max_id, count=batch_size)
+        if not entries:
+            break
+        messages = {message['id']: message for _, message in entries}
+        stored = set(
+            str(pk) for pk in models.MessageModel.objects.filter(pk__in=messages).values_list('pk', flat=True)
+        )
+        store_messages([message for pk, message in messages.items() if pk not in stored])
+        redis_utils.stream_delete(conf['STREAM'], [entry_id for entry_id, _ in entries])
+        recovered += len(messages) - len(stored)
+
+    if recovered:
+        logger.warning('Recovered %s chat messages from the write-behind stream', recovered)
+    return recovered
@@ -1,5 +1,7 @@
+import asyncio
 import pytest
 import json
+from unittest import mock
 from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
 from channels.db import database_sync_to_async
@@ -35,4 +37,70 @@ async def test_chat_consumer_send_and_receive():
     assert response["message"] == test_message
     assert response["sender"] == user.full_name()
 
-    await communicator.disconnect()
\ No newline at end of file
+    await communicator.disconnect()
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_chat_consumer_backfill_since(settings):
+    from apps.chat.consumers import ChatConsumer
+    from apps.chat.services.room_state import record_message
+
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    user = await database_sync_to_async(UserFactory)()
+    room = await database_sync_to_async(ChatRoomModel.objects.create)()
+    await database_sync_to_async(room.participants.add)(user)
+    messages = [await database_sync_to_async(record_message)(room, user, f"message {i}") for i in range(7)]
+
+    with mock.patch.object(ChatConsumer, "backfill_batch_size", 3):
+        communicator = WebsocketCommunicator(application=application,
+                                             path=f"/ws/chat/{room.id}/?since={messages[1].id}")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        assert connected is True
+
+        batches = [await communicator.receive_json_from() for _ in range(2)]
+        assert [batch["has_more"] for batch in batches] == [True, False]
+        received = [item["id"] for batch in batches for item in batch["backfill"]]
+        assert received == [str(msg.id) for msg in messages[2:]]
+
+        await communicator.send_json_to({"message": "live"})
+        response = await communicator.receive_json_from()
+        assert response["message"] == "live"
+        assert response["id"]
+        await communicator.disconnect()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_event_loop_latency_under_concurrent_websocket_load(settings):
+    from apps.core import redis_async
+    from apps.core.tests.helpers import SlowRedisStub, measure_loop_lag
+
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    users = [await database_sync_to_async(UserFactory)() for _ in range(10)]
+    communicators = []
+    for user in users:
+        room = await database_sync_to_async(ChatRoomModel.objects.create)()
+        await database_sync_to_async(room.participants.add)(user)
+        communicator = WebsocketCommunicator(application=application, path=f"/ws/chat/{room.id}/")
+        communicator.scope["user"] = user
+        communicators.append(communicator)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(measure_loop_lag(stop))
+
+    async def chat(communicator, index):
+        connected, _ = await communicator.connect()
+        assert connected is True
+        for i in range(5):
+            await redis_async.get_value(f"presence_{index}")
+            await communicator.send_json_to({"message": f"message {i}"})
+            await communicator.receive_json_from(timeout=5)
+        await communicator.disconnect()
+
+    with mock.patch.object(redis_async.redis_manager, "get_conn", return_value=SlowRedisStub()):
+        await asyncio.gather(*(chat(c, i) for i, c in enumerate(communicators)))
+    stop.set()
+
+    assert await probe < 0.25
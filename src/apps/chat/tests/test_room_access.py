@@ -0,0 +1,141 @@
+from unittest import mock
+
+import pytest
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from django.contrib.auth import get_user_model
+
+from config.asgi import application
+from apps.account.tests.factories import UserFactory
+from apps.core import redis_utils
+from apps.chat.models import ChatRoomModel
+from apps.chat.services import room_access
+from apps.chat.tests.factories import ChatRoomFactory
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestRoomAccess:
+
+    @pytest.mark.parametrize("participants", [2, 200])
+    def test_membership_is_one_query(self, participants, django_assert_num_queries):
+        # unusable passwords skip hashing, bulk_create skips per-row inserts
+        users = User.objects.bulk_create(UserFactory.build_batch(participants, password=None))
+        room = ChatRoomFactory(participants=users)
+
+        with django_assert_num_queries(1):
+            assert room_access.is_participant(room.id, users[-1].pk)
+        assert not room_access.is_participant(room.id, UserFactory().pk)
+        assert not room_access.is_participant("not-a-room", users[0].pk)
+
+    @mock.patch("apps.chat.services.room_access.redis_utils.get_and_set_if_absent")
+    @mock.patch("apps.chat.services.room_access.redis_utils.get_value")
+    def test_answer_is_cached(self, mock_get, mock_set, django_assert_num_queries):
+        user = UserFactory()
+        room = ChatRoomFactory(participants=[user, UserFactory()])
+
+        mock_get.return_value = None
+        assert room_access.has_room_access(room.id, user)
+        mock_set.assert_called_once_with(room_access.get_access_key(room.id, user.pk), 1, 300)
+
+        mock_get.return_value = 1
+        with django_assert_num_queries(0):
+            assert room_access.has_room_access(room.id, user)
+
+    @mock.patch("apps.chat.services.room_access.redis_utils.get_value", side_effect=RedisConnectionError)
+    def test_falls_back_to_database(self, _):
+        user = UserFactory()
+        room = ChatRoomFactory(participants=[user, UserFactory()])
+
+        assert room_access.has_room_access(room.id, user)
+        assert not room_access.has_room_access(room.id, UserFactory())
+
+    @mock.patch("apps.chat.services.room_access.redis_utils.set_many_expire")
+    def test_participant_changes_invalidate_cache(self, mock_invalidate, django_capture_on_commit_callbacks):
+        user, opponent = UserFactory(), UserFactory()
+        room = ChatRoomFactory(participants=[user, opponent])
+        mock_invalidate.reset_mock()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            room.participants.remove(user)
+        mock_invalidate.assert_called_once_with({room_access.get_access_key(room.id, user.pk): -1}, 300)
+
+        mock_invalidate.reset_mock()
+        with django_capture_on_commit_callbacks(execute=True):
+            room.participants.clear()
+        mock_invalidate.assert_called_once_with({room_access.get_access_key(room.id, opponent.pk): -1}, 300)
+
+    def test_stale_answer_is_not_cached_after_invalidation(self, fake_redis):
+        user = UserFactory()
+        room = ChatRoomFactory(participants=[user, UserFactory()])
+        is_participant = room_access.is_participant
+
+        def read_then_removed(room_id, user_id):
+            # the membership is removed while the database answer is on its way back
+            allowed = is_participant(room_id, user_id)
+            room_access.invalidate_room_access([(room_id, user_id)])
+            return allowed
+
+        with mock.patch.object(room_access, "is_participant", side_effect=read_then_removed):
+            assert room_access.has_room_access(room.id, user)
+
+        assert redis_utils.get_value(room_access.get_access_key(room.id, user.pk)) == room_access.INVALIDATED
+
+    @mock.patch("apps.chat.services.room_access.redis_utils.get_and_set_if_absent", side_effect=RedisConnectionError)
+    @mock.patch("apps.chat.services.room_access.redis_utils.get_value", return_value=None)
+    def test_cache_write_failure_is_ignored(self, *_):
+        user = UserFactory()
+        room = ChatRoomFactory(participants=[user, UserFactory()])
+
+        assert room_access.has_room_access(room.id, user)
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_removed_participant_is_disconnected(settings):
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    settings.CHAT_CONFIG = {**settings.CHAT_CONFIG, "ACCESS_RECHECK_INTERVAL": 0.05}
+    user = await database_sync_to_async(UserFactory)()
+    room = await database_sync_to_async(ChatRoomModel.objects.create)()
+    await database_sync_to_async(room.participants.add)(user)
+
+    cache = {}
+
+    async def get_value(key):
+        return cache.get(key)
+
+    async def get_and_set_if_absent(key, value, seconds):
+        if key in cache:
+            return cache[key]
+        cache[key] = value
+
+    with mock.patch.object(room_access.redis_async, "get_value", get_value), \
+            mock.patch.object(room_access.redis_async, "get_and_set_if_absent", get_and_set_if_absent), \
+            mock.patch.object(room_access.redis_utils, "set_many_expire", lambda mapping, seconds: cache.update(mapping)):
+        communicator = WebsocketCommunicator(application=application, path=f"/ws/chat/{room.id}/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        assert connected is True
+
+        await database_sync_to_async(room.participants.remove)(user)
+
+        output = await communicator.receive_output(timeout=2)
+        assert output == {"type": "websocket.close", "code": 4403}
+        await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_non_participant_is_rejected():
+    room = await database_sync_to_async(ChatRoomFactory)()
+    user = await database_sync_to_async(UserFactory)()
+
+    with mock.patch.object(room_access.redis_async, "get_value", mock.AsyncMock(return_value=0)):
+        communicator = WebsocketCommunicator(application=application, path=f"/ws/chat/{room.id}/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+
+    assert connected is False
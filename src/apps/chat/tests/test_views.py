@@ -1,8 +1,15 @@
+from datetime import timedelta
+from io import StringIO
+
 import pytest
 from rest_framework.test import APIClient
 from django.urls import reverse
+from django.core.management import call_command
+from django.utils import timezone
 from apps.account.tests.factories import UserFactory
-from apps.chat.models import ChatRoomModel, MessageModel
+from apps.chat.models import ChatRoomModel, MessageModel, ChatUnreadCounterModel
+from apps.chat.services.room_state import record_message, mark_room_as_read, rebuild_room_state
+from apps.chat.tests.factories import ChatRoomFactory, MessageFactory
 
 
 @pytest.mark.django_db
@@ -76,11 +83,12 @@ class TestUnreadRoomListView:
         room1 = ChatRoomModel.objects.create()
         room1.participants.set([user, opponent])
 
-        MessageModel.objects.create(room=room1, sender=opponent, content="سلام", is_read=False)
+        record_message(room1, opponent, "سلام")
 
         room2 = ChatRoomModel.objects.create()
         room2.participants.set([user, other_user])
-        MessageModel.objects.create(room=room2, sender=other_user, content="سلام", is_read=True)
+        record_message(room2, other_user, "سلام")
+        mark_room_as_read(room2, user)
 
         client = APIClient()
         client.force_authenticate(user=user)
@@ -102,11 +110,12 @@ class TestChatRoomSummaryListView:
 
         room1 = ChatRoomModel.objects.create()
         room1.participants.set([user, opponent])
-        MessageModel.objects.create(room=room1, sender=opponent, content="سلام تویی؟", is_read=False)
+        record_message(room1, opponent, "سلام تویی؟")
 
         room2 = ChatRoomModel.objects.create()
         room2.participants.set([user, other_user])
-        MessageModel.objects.create(room=room2, sender=other_user, content="سلام رفیق", is_read=True)
+        record_message(room2, other_user, "سلام رفیق")
+        mark_room_as_read(room2, user)
 
         client = APIClient()
         client.force_authenticate(user=user)
@@ -114,13 +123,186 @@ class TestChatRoomSummaryListView:
 
         response = client.get(url)
         assert response.status_code == 200
-        data = response.data
+        data = response.data["data"]
 
         assert len(data) == 2
+        assert response.data["paginator"]["objects_count"] == 2
 
         room_data = data[0]
         assert "id" in room_data
         assert "opponent" in room_data
         assert "last_message" in room_data
         assert "unread_count" in room_data
-        assert isinstance(room_data["unread_count"], int)
\ No newline at end of file
+        assert isinstance(room_data["unread_count"], int)
+
+    def test_chat_room_summary_list_view_values(self):
+        user = UserFactory(first_name="Ali", last_name="Ahmadi")
+        opponent = UserFactory(first_name="Sara", last_name="Karimi")
+
+        room = ChatRoomModel.objects.create()
+        room.participants.set([user, opponent])
+        record_message(room, opponent, "اول")
+        record_message(room, user, "دوم")
+        record_message(room, opponent, "سوم")
+
+        empty_room = ChatRoomModel.objects.create()
+        empty_room.participants.set([user, UserFactory()])
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.get(reverse("apps.chat:chatroom-summary"))
+
+        assert response.status_code == 200
+        room_data, empty_data = response.data["data"]
+        assert room_data["id"] == str(room.id)
+        assert room_data["opponent"]["id"] == str(opponent.id)
+        assert room_data["last_message"]["content"] == "سوم"
+        assert room_data["unread_count"] == 2
+        assert empty_data["last_message"] is None
+        assert empty_data["unread_count"] == 0
+
+    @pytest.mark.parametrize("rooms", [3, 30])
+    def test_chat_room_summary_query_count_is_constant(self, rooms, django_assert_max_num_queries):
+        user = UserFactory()
+        for _ in range(rooms):
+            opponent = UserFactory()
+            room = ChatRoomModel.objects.create()
+            room.participants.set([user, opponent])
+            record_message(room, opponent, "سلام")
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        # count + page (room, last message and unread counter) + prefetched opponents
+        with django_assert_max_num_queries(3):
+            response = client.get(reverse("apps.chat:chatroom-summary"))
+
+        assert response.status_code == 200
+        assert len(response.data["data"]) == min(rooms, 20)
+        assert response.data["paginator"]["objects_count"] == rooms
+
+
+@pytest.mark.django_db
+class TestMarkRoomAsReadView:
+    def test_mark_room_as_read_resets_counter(self):
+        user = UserFactory()
+        opponent = UserFactory()
+        room = ChatRoomFactory(participants=[user, opponent])
+        record_message(room, opponent, "سلام")
+        record_message(room, opponent, "خوبی؟")
+        record_message(room, user, "ممنون")
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.post(reverse("apps.chat:chatroom-mark-read", kwargs={"room_id": room.id}))
+
+        assert response.status_code == 200
+        assert response.data["marked_count"] == 2
+        assert ChatUnreadCounterModel.objects.get(room=room, user=user).count == 0
+        assert ChatUnreadCounterModel.objects.get(room=room, user=opponent).count == 1
+        assert not MessageModel.objects.filter(room=room, sender=opponent, is_read=False).exists()
+
+    def test_mark_room_as_read_not_participant(self):
+        room = ChatRoomFactory()
+        client = APIClient()
+        client.force_authenticate(user=UserFactory())
+
+        response = client.post(reverse("apps.chat:chatroom-mark-read", kwargs={"room_id": room.id}))
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestRoomState:
+    def test_record_message_updates_pointer_and_counters(self):
+        user = UserFactory()
+        opponent = UserFactory()
+        room = ChatRoomFactory(participants=[user, opponent])
+
+        record_message(room, opponent, "اول")
+        message = record_message(room, opponent, "دوم")
+
+        room.refresh_from_db()
+        assert room.last_message == message
+        assert ChatUnreadCounterModel.objects.get(room=room, user=user).count == 2
+        assert ChatUnreadCounterModel.objects.get(room=room, user=opponent).count == 0
+
+    def test_record_message_keeps_newer_last_message(self):
+        user = UserFactory()
+        room = ChatRoomFactory(participants=[user, UserFactory()])
+        newer = record_message(room, user, "newer")
+        # a concurrent send stored a newer message first
+        MessageModel.objects.filter(pk=newer.pk).update(created_at=timezone.now() + timedelta(minutes=1))
+
+        record_message(room, user, "older")
+
+        room.refresh_from_db()
+        assert room.last_message_id == newer.id
+
+    def test_participants_get_counters(self):
+        user = UserFactory()
+        room = ChatRoomFactory(participants=[user, UserFactory()])
+        assert ChatUnreadCounterModel.objects.filter(room=room).count() == 2
+
+        room.participants.remove(user)
+        assert not ChatUnreadCounterModel.objects.filter(room=room, user=user).exists()
+
+    def test_rebuild_room_state_from_history(self):
+        user = UserFactory()
+        opponent = UserFactory()
+        room = ChatRoomFactory(participants=[user, opponent])
+        MessageFactory(room=room, sender=opponent, is_read=False)
+        MessageFactory(room=room, sender=opponent, is_read=True)
+        last = MessageFactory(room=room, sender=user, is_read=False)
+
+        ChatUnreadCounterModel.objects.filter(room=room).delete()
+
+        assert rebuild_room_state(ChatRoomModel.objects.filter(pk=room.pk)) == 1
+
+        room.refresh_from_db()
+        assert room.last_message == last
+        assert ChatUnreadCounterModel.objects.get(room=room, user=user).count == 1
+        assert ChatUnreadCounterModel.objects.get(room=room, user=opponent).count == 1
+
+    def test_rebuild_chat_state_command(self):
+        user = UserFactory()
+        room = ChatRoomFactory(participants=[user, UserFactory()])
+        MessageFactory(room=room, sender=room.participants.exclude(pk=user.pk).get(), is_read=False)
+        out = StringIO()
+
+        call_command("rebuild_chat_state", "--room", str(room.id), stdout=out)
+
+        assert "1 chat rooms rebuilt" in out.getvalue()
+        assert ChatUnreadCounterModel.objects.get(room=room, user=user).count == 1
+
+
+@pytest.mark.django_db
+class TestRoomMessageListView:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.user = UserFactory()
+        self.opponent = UserFactory()
+        self.room = ChatRoomFactory(participants=[self.user, self.opponent])
+        self.messages = [record_message(self.room, self.opponent, f"message {i}") for i in range(60)]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("apps.chat:chatroom-messages", kwargs={"room_id": self.room.id})
+
+    def test_history_pages(self, django_assert_max_num_queries):
+        with django_assert_max_num_queries(2):
+            response = self.client.get(self.url)
+
+        assert response.status_code == 200
+        first_page = response.data["data"]
+        assert len(first_page) == 50
+        assert first_page[0]["id"] == str(self.messages[-1].id)
+        assert first_page[0]["sender_name"] == self.opponent.full_name()
+
+        response = self.client.get(self.url, {"cursor": response.data["cursor"]["next"]})
+        ids = [item["id"] for item in first_page + response.data["data"]]
+        assert ids == [str(msg.id) for msg in reversed(self.messages)]
+        assert response.data["cursor"]["next"] is None
+
+    def test_history_not_participant(self):
+        self.client.force_authenticate(user=UserFactory())
+        response = self.client.get(self.url)
+        assert response.status_code == 404
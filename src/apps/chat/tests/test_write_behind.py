@@ -0,0 +1,160 @@
+import datetime
+import uuid
+from unittest import mock
+
+import pytest
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+
+from config.asgi import application
+from apps.account.tests.factories import UserFactory
+from apps.chat.models import ChatRoomModel, MessageModel, ChatUnreadCounterModel
+from apps.chat.services import write_behind
+from apps.chat.services.room_state import record_messages
+from apps.chat.tasks import recover_chat_messages
+from apps.chat.tests.factories import ChatRoomFactory
+
+
+def make_message(room, sender, content, created_at):
+    return {
+        'id': str(uuid.uuid4()),
+        'room_id': str(room.id),
+        'sender_id': str(sender.id),
+        'content': content,
+        'created_at': created_at.isoformat(),
+    }
+
+
+@pytest.fixture
+def room_users(db):
+    user, opponent = UserFactory(), UserFactory()
+    return ChatRoomFactory(participants=[user, opponent]), user, opponent
+
+
+@pytest.mark.django_db
+class TestRecordMessages:
+
+    def test_bulk_insert_updates_room_state(self, room_users, django_assert_max_num_queries):
+        room, user, opponent = room_users
+        start = datetime.datetime(2025, 1, 1, 10, 0)
+        messages = [
+            make_message(room, opponent, "one", start),
+            make_message(room, opponent, "two", start + datetime.timedelta(seconds=1)),
+            make_message(room, user, "three", start + datetime.timedelta(seconds=2)),
+        ]
+
+        # insert + created_at + last message + counters + savepoints
+        with django_assert_max_num_queries(8):
+            record_messages(messages)
+
+        room.refresh_from_db()
+        assert str(room.last_message_id) == messages[-1]['id']
+        assert MessageModel.objects.get(id=messages[0]['id']).created_at == start
+        assert ChatUnreadCounterModel.objects.get(room=room, user=user).count == 2
+        assert ChatUnreadCounterModel.objects.get(room=room, user=opponent).count == 1
+
+    def test_older_batch_keeps_newer_last_message(self, room_users):
+        room, user, opponent = room_users
+        now = datetime.datetime(2025, 1, 1, 10, 0)
+        newer = make_message(room, user, "newer", now)
+        older = make_message(room, opponent, "older", now - datetime.timedelta(minutes=1))
+
+        record_messages([newer])
+        record_messages([older])
+
+        room.refresh_from_db()
+        assert str(room.last_message_id) == newer['id']
+
+    def test_missing_counters_are_created(self, room_users):
+        room, user, opponent = room_users
+        ChatUnreadCounterModel.objects.filter(room=room).delete()
+
+        record_messages([make_message(room, opponent, "hi", datetime.datetime(2025, 1, 1, 10, 0))])
+
+        assert ChatUnreadCounterModel.objects.get(room=room, user=user).count == 1
+        assert ChatUnreadCounterModel.objects.get(room=room, user=opponent).count == 0
+
+    def test_clearing_participants_drops_their_counters(self, room_users):
+        room, user, opponent = room_users
+        other_room = ChatRoomFactory(participants=[user, opponent])
+
+        room.participants.clear()
+        assert not ChatUnreadCounterModel.objects.filter(room=room).exists()
+
+        opponent.chat_room.clear()
+        assert list(ChatUnreadCounterModel.objects.values_list('room', 'user')) == [(other_room.pk, user.pk)]
+
+
+@pytest.mark.django_db
+class TestRecoverChatMessages:
+
+    def test_stores_missing_entries_once(self, room_users):
+        room, user, opponent = room_users
+        now = datetime.datetime.now()
+        stored = make_message(room, user, "stored", now)
+        lost = make_message(room, opponent, "lost", now)
+        record_messages([stored])
+
+        entries = [(b"1-0", stored), (b"2-0", lost)]
+        with mock.patch("apps.chat.tasks.redis_utils.get_time", return_value=1700000000.5), \
+                mock.patch("apps.chat.tasks.redis_utils.stream_range", side_effect=[entries, []]) as mock_range, \
+                mock.patch("apps.chat.tasks.redis_utils.stream_delete") as mock_delete:
+            assert recover_chat_messages() == 1
+
+        # the cutoff comes from the redis clock
+        assert mock_range.call_args.kwargs["max_id"] == f"{int((1700000000.5 - 60) * 1000)}-0"
+        mock_delete.assert_called_once_with("chat_write_behind", [b"1-0", b"2-0"])
+        assert MessageModel.objects.filter(room=room).count() == 2
+        assert ChatUnreadCounterModel.objects.get(room=room, user=user).count == 1
+
+    def test_message_of_deleted_room_is_dropped(self, room_users):
+        room, user, opponent = room_users
+        gone = ChatRoomFactory()
+        kept = make_message(room, user, "kept", datetime.datetime.now())
+        dropped = make_message(gone, user, "dropped", datetime.datetime.now())
+        gone.delete()
+
+        entries = [(b"1-0", dropped), (b"2-0", kept)]
+        with mock.patch("apps.chat.tasks.redis_utils.get_time", return_value=1700000000.0), \
+                mock.patch("apps.chat.tasks.redis_utils.stream_range", side_effect=[entries, []]), \
+                mock.patch("apps.chat.tasks.redis_utils.stream_delete") as mock_delete:
+            recover_chat_messages()
+
+        mock_delete.assert_called_once_with("chat_write_behind", [b"1-0", b"2-0"])
+        assert list(MessageModel.objects.values_list("content", flat=True)) == ["kept"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_consumer_write_behind_broadcasts_before_storing(settings):
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    settings.CHAT_CONFIG = {**settings.CHAT_CONFIG, "WRITE_BEHIND": True, "FLUSH_INTERVAL": 60, "FLUSH_BATCH_SIZE": 3}
+    user = await database_sync_to_async(UserFactory)()
+    room = await database_sync_to_async(ChatRoomModel.objects.create)()
+    await database_sync_to_async(room.participants.add)(user)
+
+    stream_add = mock.AsyncMock(side_effect=[f"{i}-0" for i in range(3)])
+    stream_delete = mock.AsyncMock()
+    with mock.patch.object(write_behind.redis_async, "stream_add", stream_add), \
+            mock.patch.object(write_behind.redis_async, "stream_delete", stream_delete):
+        communicator = WebsocketCommunicator(application=application, path=f"/ws/chat/{room.id}/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        assert connected is True
+
+        received = []
+        for i in range(3):
+            await communicator.send_json_to({"message": f"message {i}"})
+            received.append(await communicator.receive_json_from())
+            if i < 2:
+                # broadcast, but still buffered
+                assert not await database_sync_to_async(MessageModel.objects.filter(room=room).exists)()
+
+        await communicator.disconnect()
+
+    # the third message filled the batch and flushed it
+    stored = await database_sync_to_async(
+        lambda: list(MessageModel.objects.filter(room=room).values_list("id", flat=True))
+    )()
+    assert sorted(str(pk) for pk in stored) == sorted(event["id"] for event in received)
+    stream_delete.assert_awaited_once_with("chat_write_behind", ["0-0", "1-0", "2-0"])
@@ -9,4 +9,6 @@ urlpatterns = [
     path('rooms/', views.ChatRoomCreateView.as_view(), name='chatroom-create'),
     path('rooms/unread/', views.UnreadRoomListView.as_view(), name='chatroom-unread'),
     path('rooms/summary/', views.ChatRoomSummaryListView.as_view(), name='chatroom-summary'),
+    path('rooms/<uuid:room_id>/messages/', views.RoomMessageListView.as_view(), name='chatroom-messages'),
+    path('rooms/<uuid:room_id>/read/', views.MarkRoomAsReadView.as_view(), name='chatroom-mark-read'),
 ]
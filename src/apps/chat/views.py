@@ -1,13 +1,16 @@
-from django.db.models import Q, Count
+from django.shortcuts import get_object_or_404
 
-from rest_framework.generics import CreateAPIView, ListAPIView
+from rest_framework.generics import CreateAPIView
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from apps.core.swagger import mixins as ms
+from apps.core.views import mixins
+from apps.core.serializers import ListParamsSerializer
 
 from . import models, serializers
+from .services.room_state import mark_room_as_read
 
 
 class ChatRoomCreateView(ms.SwaggerViewMixin, CreateAPIView):
@@ -35,27 +38,59 @@ class UnreadRoomListView(ms.SwaggerViewMixin, APIView):
     def get(self, request):
         user = request.user
 
-        rooms_with_unread = models.ChatRoomModel.objects \
-            .filter(participants=user) \
-            .annotate(unread_count=Count(
-                'messages',
-                filter=Q(messages__is_read=False) & ~Q(messages__sender=user)
-            )) \
-            .filter(unread_count__gt=0)
+        rooms_with_unread = models.ChatRoomModel.objects.unread_for(user).prefetch_related('participants')
 
         serializer = serializers.ChatRoomCreateSerializer(rooms_with_unread, many=True)
         return Response(serializer.data)
 
 
-class ChatRoomSummaryListView(ListAPIView):
+class ChatRoomSummaryListView(ms.SwaggerViewMixin, mixins.ListViewMixin, APIView):
     """
         summery chat view
     """
     swagger_title = 'Chat summery list'
     swagger_tags = ['Chat']
-    serializer_class = serializers.ChatRoomSummarySerializer
     permission_classes = [IsAuthenticated]
+    serializer = ListParamsSerializer
+    serializer_response = serializers.ChatRoomSummaryResponseSerializer
 
     def get_queryset(self):
-        return models.ChatRoomModel.objects.filter(participants=self.request.user)
+        return models.ChatRoomModel.objects.summaries_for(self.request.user)
 
+    def get(self, request, *args, **kwargs):
+        return self.list(request)
+
+
+class RoomMessageListView(ms.SwaggerViewMixin, mixins.ListViewMixin, APIView):
+    """
+        message history of a room, newest first, paginated with `cursor`
+    """
+    swagger_title = 'Chat message history'
+    swagger_tags = ['Chat']
+    permission_classes = [IsAuthenticated]
+    serializer = ListParamsSerializer
+    serializer_response = serializers.MessageListResponseSerializer
+    page_size = 50
+    cursor_pagination = True
+
+    def get_queryset(self):
+        room = get_object_or_404(models.ChatRoomModel.objects.for_user(self.request.user), pk=self.kwargs['room_id'])
+        return models.MessageModel.objects.filter(room=room).select_related('sender')
+
+    def get(self, request, *args, **kwargs):
+        return self.list(request)
+
+
+class MarkRoomAsReadView(ms.SwaggerViewMixin, APIView):
+    """
+        mark every message of the room sent by the other participant as read
+    """
+    swagger_title = 'Chat mark as read'
+    swagger_tags = ['Chat']
+    permission_classes = [IsAuthenticated]
+    serializer_response = serializers.MarkRoomAsReadSerializer
+
+    def post(self, request, room_id):
+        room = get_object_or_404(models.ChatRoomModel.objects.for_user(request.user), pk=room_id)
+        marked_count = mark_room_as_read(room, request.user)
+        return Response(self.serializer_response({'marked_count': marked_count}).data)
@@ -61,3 +61,8 @@ class AppSectionDisabled(APIException):
 
 
 
+
+class InvalidCursor(APIException):
+    status_code = 400
+    default_code = 'invalid_cursor'
+    message = _("Invalid cursor")
@@ -0,0 +1,30 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.services import archive
+
+
+def parse_date(value):
+    try:
+        date = datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'invalid date {value}, use YYYY-MM-DD')
+    value = datetime.datetime.combine(date, datetime.time())
+    return timezone.make_aware(value) if settings.USE_TZ else value
+
+
+class Command(BaseCommand):
+    help = 'Put archived rows of a retention policy back into their table, e.g. for an audit'
+
+    def add_arguments(self, parser):
+        parser.add_argument('policy', choices=list(settings.RETENTION_CONFIG['POLICIES']))
+        parser.add_argument('--from', dest='start', type=parse_date, help='first day (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end', type=parse_date, help='day after the last one (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        policy = archive.Policy.get(options['policy'])
+        restored = archive.restore(policy, options['start'], options['end'])
+        self.stdout.write(self.style.SUCCESS(f'{restored} rows restored'))
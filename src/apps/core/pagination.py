@@ -0,0 +1,105 @@
+"""
+    keyset (cursor) pagination, the opt-in alternative to django's Paginator in ListViewMixin.
+    pages are read with `WHERE (created_at, id) < (cursor)` on an index instead of COUNT + OFFSET,
+    so the cost of a page does not grow with its depth.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from .exceptions import InvalidCursor
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class CursorPaginator:
+    """
+        ordering: fields of a unique key, the last one must be unique on its own (default `-created_at, -id`).
+        cursors are opaque url-safe strings, clients pass them back unchanged.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id'), with_count=False):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.with_count = with_count
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    @property
+    def count(self):
+        """ only computed when asked for, that COUNT(*) is what cursor pages avoid """
+        return self.queryset.count() if self.with_count else None
+
+    def get_page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor) if cursor else (NEXT, None)
+        ordering = self.ordering if direction == NEXT else self._reverse(self.ordering)
+
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(ordering, values))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == NEXT:
+            next_cursor = self.encode_cursor(NEXT, rows[-1]) if has_more else None
+            previous_cursor = self.encode_cursor(PREVIOUS, rows[0]) if values is not None and rows else None
+        else:
+            rows.reverse()
+            next_cursor = self.encode_cursor(NEXT, rows[-1]) if rows else None
+            previous_cursor = self.encode_cursor(PREVIOUS, rows[0]) if has_more else None
+
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+    def encode_cursor(self, direction, obj):
+        values = [str(getattr(obj, field)) for field in self.fields]
+        data = json.dumps([direction, values], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(data)
+            if direction not in (NEXT, PREVIOUS) or len(values) != len(self.fields):
+                raise ValueError
+            model_meta = self.queryset.model._meta
+            values = [model_meta.get_field(field).to_python(value) for field, value in zip(self.fields, values)]
+        except (ValueError, TypeError, ValidationError):
+            raise InvalidCursor()
+        return direction, values
+
+    @staticmethod
+    def _reverse(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    @staticmethod
+    def _keyset_filter(ordering, values):
+        """
+            rows strictly after `values` in `ordering`:
+            (a > x) OR (a = x AND b > y) ... with `<` for descending fields
+        """
+        query = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            query |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return query
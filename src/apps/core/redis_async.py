@@ -0,0 +1,164 @@
+"""
+    asyncio counterpart of redis_utils for channels consumers and async views.
+    same key helpers and codec, so both sides read each other's values.
+"""
+import asyncio
+import pickle
+import weakref
+
+from functools import wraps
+from redis import asyncio as aioredis
+from django.conf import settings
+
+from . import redis_codecs
+from .redis_utils import pack_data, unpack_data, _DELETE_IF_EQUAL_SCRIPT
+
+
+class AsyncRedisManager:
+    """
+        one pool per running event loop.
+        asyncio connections are bound to the loop that opened them, so a pool
+        can not be shared between loops (daphne, tests, async_to_sync threads).
+    """
+
+    def __init__(self):
+        self.clients = weakref.WeakKeyDictionary()
+
+    def _create_client(self):
+        conf = settings.REDIS_CONFIG
+        pool = aioredis.BlockingConnectionPool(
+            host=conf['HOST'],
+            port=conf['PORT'],
+            db=conf['DB'],
+            max_connections=conf['MAX_CONNECTIONS'],
+            timeout=conf['POOL_TIMEOUT'],
+            socket_timeout=conf['SOCKET_TIMEOUT'],
+            socket_connect_timeout=conf['SOCKET_TIMEOUT'],
+            health_check_interval=conf['HEALTH_CHECK_INTERVAL'],
+            retry_on_timeout=True,
+        )
+        return aioredis.Redis(connection_pool=pool)
+
+    def get_conn(self):
+        loop = asyncio.get_running_loop()
+        client = self.clients.get(loop)
+        if client is None:
+            client = self.clients[loop] = self._create_client()
+        return client
+
+    async def close(self):
+        client = self.clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+            await client.connection_pool.disconnect()
+
+
+redis_manager = AsyncRedisManager()
+
+
+def decorator_command(func):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        redis_conn = redis_manager.get_conn()
+        return await func(redis_conn, *args, **kwargs)
+
+    return wrapper
+
+
+@decorator_command
+async def test_conn(redis_conn):
+    try:
+        await redis_conn.ping()
+        return True
+    except aioredis.ConnectionError as e:
+        print(f"Redis Connection Error: {e}")
+        return False
+
+
+def pipeline(transaction=True):
+    """
+        usage: async with redis_async.pipeline() as pipe: ...
+    """
+    return redis_manager.get_conn().pipeline(transaction=transaction)
+
+
+@decorator_command
+async def set_value(redis_conn, key, value):
+    await redis_conn.set(key, pack_data(value))
+    return True
+
+
+@decorator_command
+async def set_value_expire(redis_conn, key, value, seconds):
+    await redis_conn.set(key, pack_data(value), ex=seconds)
+    return True
+
+
+@decorator_command
+async def get_value(redis_conn, key):
+    val = await redis_conn.get(key)
+    return unpack_data(val) if val else None
+
+
+@decorator_command
+async def get_many(redis_conn, keys):
+    keys = list(keys)
+    if not keys:
+        return {}
+    values = await redis_conn.mget(keys)
+    return {key: unpack_data(val) if val else None for key, val in zip(keys, values)}
+
+
+@decorator_command
+async def set_many_expire(redis_conn, mapping, seconds):
+    if not mapping:
+        return True
+    async with redis_conn.pipeline(transaction=False) as pipe:
+        for key, value in mapping.items():
+            pipe.set(key, pack_data(value), ex=seconds)
+        await pipe.execute()
+    return True
+
+
+@decorator_command
+async def get_and_set_if_absent(redis_conn, key, value, seconds):
+    async with redis_conn.pipeline(transaction=True) as pipe:
+        pipe.set(key, pack_data(value), ex=seconds, nx=True)
+        pipe.get(key)
+        is_set, current = await pipe.execute()
+    if is_set:
+        return None
+    if current and redis_codecs.is_unreadable_legacy(current):
+        await redis_conn.set(key, pack_data(value), ex=seconds)
+        return None
+    return unpack_data(current) if current else None
+
+
+@decorator_command
+async def delete_if_equal(redis_conn, key, value):
+    expected = [pack_data(value)]
+    if settings.REDIS_CONFIG['ALLOW_PICKLE_READ']:
+        expected.append(pickle.dumps(value))
+    script = redis_conn.register_script(_DELETE_IF_EQUAL_SCRIPT)
+    return bool(await script(keys=[key], args=expected))
+
+
+@decorator_command
+async def stream_add(redis_conn, key, value, maxlen=None):
+    """
+        append value to a stream (trimmed to about maxlen entries), returns the entry id
+    """
+    return await redis_conn.xadd(key, {'data': pack_data(value)}, maxlen=maxlen, approximate=True)
+
+
+@decorator_command
+async def stream_delete(redis_conn, key, entry_ids):
+    if entry_ids:
+        await redis_conn.xdel(key, *entry_ids)
+    return True
+
+
+@decorator_command
+async def remove_key(redis_conn, *keys):
+    await redis_conn.delete(*keys)
+    return True
@@ -0,0 +1,123 @@
+import json
+import logging
+import pickle
+import uuid
+import datetime
+import decimal
+
+import msgpack
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class CodecError(ValueError):
+    pass
+
+
+def _to_primitive(obj):
+    """
+        fallback for values msgpack can not pack natively (ids, dates, amounts).
+        they are stored as strings, the same way the api serializers render them.
+    """
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not serializable')
+
+
+class BaseCodec:
+    """
+        every stored value is `tag (1 byte) + payload`, the tag selects the codec on read
+    """
+    name = None
+    tag = None
+
+    def encode(self, data):
+        raise NotImplementedError
+
+    def decode(self, payload):
+        raise NotImplementedError
+
+
+class MsgpackCodec(BaseCodec):
+    name = 'msgpack'
+    tag = b'\x01'
+
+    def encode(self, data):
+        return msgpack.packb(data, default=_to_primitive, use_bin_type=True)
+
+    def decode(self, payload):
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+class JsonCodec(BaseCodec):
+    name = 'json'
+    tag = b'\x02'
+
+    def encode(self, data):
+        return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+
+    def decode(self, payload):
+        return json.loads(payload)
+
+
+class LegacyPickleCodec(BaseCodec):
+    """
+        read-only, for keys written before the codec layer (pickle protocol >= 2 starts with 0x80).
+        off by default: the redis_utils read helpers then treat such keys as missing, so they are written again.
+        enable REDIS_CONFIG['ALLOW_PICKLE_READ'] to keep reading them until old keys have expired.
+        deprecated, removed in the next release
+    """
+    name = 'pickle'
+    tag = b'\x80'
+
+    def encode(self, data):
+        raise CodecError('Pickle is read-only, choose another redis codec')
+
+    def decode(self, payload):
+        logger.warning('Reading a pickled redis value, pickle reads are deprecated and will be removed in the '
+                       'next release: disable REDIS_ALLOW_PICKLE_READ once keys written before the codecs expired')
+        return pickle.loads(self.tag + payload)
+
+
+CODECS = {codec.name: codec for codec in (MsgpackCodec(), JsonCodec())}
+CODECS_BY_TAG = {codec.tag: codec for codec in CODECS.values()}
+LEGACY_PICKLE = LegacyPickleCodec()
+
+
+def get_codec(name=None):
+    name = name or settings.REDIS_CONFIG['CODEC']
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise CodecError(f'Unknown redis codec {name!r}')
+
+
+def encode(data, codec=None):
+    codec = codec or get_codec()
+    return codec.tag + codec.encode(data)
+
+
+def is_unreadable_legacy(data):
+    """
+        value written before the codec layer while pickle reads are off
+    """
+    return data[:1] == LEGACY_PICKLE.tag and not settings.REDIS_CONFIG['ALLOW_PICKLE_READ']
+
+
+def decode(data):
+    tag, payload = data[:1], data[1:]
+    codec = CODECS_BY_TAG.get(tag)
+    if codec:
+        return codec.decode(payload)
+    if tag == LEGACY_PICKLE.tag and settings.REDIS_CONFIG['ALLOW_PICKLE_READ']:
+        return LEGACY_PICKLE.decode(payload)
+    raise CodecError(f'Unknown redis value format {tag!r}')
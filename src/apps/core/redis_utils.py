@@ -1,20 +1,54 @@
 import redis
 import pickle
+import logging
 
 from functools import wraps
 from django.conf import settings
 
+from . import redis_codecs
+
+logger = logging.getLogger(__name__)
+
 
 class RedisManager:
+    """
+        one connection pool per process, shared by every helper.
+        the pool is created lazily so forked workers (gunicorn/celery) never
+        inherit a socket opened by the parent process.
+    """
 
     def __init__(self):
-        self.redis = redis.Redis(host=settings.REDIS_CONFIG['HOST'], port=settings.REDIS_CONFIG['PORT'])
+        self.pool = None
+        self.redis = None
+
+    def get_pool(self):
+        if self.pool is None:
+            conf = settings.REDIS_CONFIG
+            self.pool = redis.BlockingConnectionPool(
+                host=conf['HOST'],
+                port=conf['PORT'],
+                db=conf['DB'],
+                max_connections=conf['MAX_CONNECTIONS'],
+                timeout=conf['POOL_TIMEOUT'],
+                socket_timeout=conf['SOCKET_TIMEOUT'],
+                socket_connect_timeout=conf['SOCKET_TIMEOUT'],
+                health_check_interval=conf['HEALTH_CHECK_INTERVAL'],
+                retry_on_timeout=True,
+            )
+        return self.pool
 
     def get_conn(self):
+        if self.redis is None:
+            self.redis = redis.Redis(connection_pool=self.get_pool())
         return self.redis
 
     def close(self):
-        self.redis.close()
+        if self.redis is not None:
+            self.redis.close()
+        if self.pool is not None:
+            self.pool.disconnect()
+        self.pool = None
+        self.redis = None
 
 
 redis_manager = RedisManager()
@@ -29,6 +63,55 @@ def decorator_command(func):
     return wrapper
 
 
+# delete key only when it still holds one of the expected encodings (atomic compare-and-delete)
+_DELETE_IF_EQUAL_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+for _, expected in ipairs(ARGV) do
+    if current == expected then
+        return redis.call('DEL', KEYS[1])
+    end
+end
+return 0
+"""
+
+# token bucket in a hash {tokens, ts}, refilled by elapsed redis time so every client shares one clock.
+# takes a token and returns 0, or returns the milliseconds until one is available (nothing taken)
+_TAKE_TOKEN_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return wait
+"""
+
+
+# counters are plain integers (not codec encoded) so INCRBY works on them.
+# increase only the keys that exist, a missing counter is rebuilt by its reader
+_INCR_EXISTING_SCRIPT = """
+local values = {}
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        values[i] = redis.call('INCRBY', key, ARGV[i])
+    else
+        values[i] = false
+    end
+end
+return values
+"""
+
+
 @decorator_command
 def test_conn(redis_conn):
     try:
@@ -39,41 +122,191 @@ def test_conn(redis_conn):
         return False
 
 
-@decorator_command
-def pack_data(redis_conn, data):
-    return pickle.dumps(data)
+def pack_data(data):
+    return redis_codecs.encode(data)
+
+
+def unpack_data(data):
+    """
+        a legacy pickled value that may not be read (REDIS_CONFIG['ALLOW_PICKLE_READ'] off) is treated as missing
+    """
+    if redis_codecs.is_unreadable_legacy(data):
+        logger.warning('Ignoring a pickled redis value written before the codecs, pickle reads are off')
+        return None
+    return redis_codecs.decode(data)
 
 
 @decorator_command
-def unpack_data(redis_conn, data):
-    return pickle.loads(data)
+def pipeline(redis_conn, transaction=True):
+    """
+        queue several commands and send them in one round trip
+        usage: with redis_utils.pipeline() as pipe: ...
+    """
+    return redis_conn.pipeline(transaction=transaction)
 
 
 @decorator_command
 def set_value(redis_conn, key, value):
-    redis_conn.set(key, pack_data(redis_conn, value))
+    redis_conn.set(key, pack_data(value))
     return True
 
 
 @decorator_command
 def set_value_expire(redis_conn, key, value, seconds):
-    redis_conn.set(key, pack_data(redis_conn, value), ex=seconds)
+    redis_conn.set(key, pack_data(value), ex=seconds)
     return True
 
 
 @decorator_command
 def get_value(redis_conn, key):
     val = redis_conn.get(key)
-    return unpack_data(redis_conn, val) if val else None
+    return unpack_data(val) if val else None
+
+
+@decorator_command
+def get_many(redis_conn, keys):
+    """
+        fetch several keys with one MGET, returns {key: value} (missing keys are None)
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    values = redis_conn.mget(keys)
+    return {key: unpack_data(val) if val else None for key, val in zip(keys, values)}
+
+
+@decorator_command
+def set_many_expire(redis_conn, mapping, seconds):
+    """
+        set several keys with the same ttl in one round trip
+    """
+    if not mapping:
+        return True
+    with redis_conn.pipeline(transaction=False) as pipe:
+        for key, value in mapping.items():
+            pipe.set(key, pack_data(value), ex=seconds)
+        pipe.execute()
+    return True
+
+
+@decorator_command
+def get_and_set_if_absent(redis_conn, key, value, seconds):
+    """
+        set key (with ttl) only if it does not exist, in one round trip.
+        returns None when the value was stored, otherwise the value already stored.
+        a legacy value that may not be read counts as absent and is replaced.
+    """
+    with redis_conn.pipeline(transaction=True) as pipe:
+        pipe.set(key, pack_data(value), ex=seconds, nx=True)
+        pipe.get(key)
+        is_set, current = pipe.execute()
+    if is_set:
+        return None
+    if current and redis_codecs.is_unreadable_legacy(current):
+        redis_conn.set(key, pack_data(value), ex=seconds)
+        return None
+    return unpack_data(current) if current else None
+
+
+@decorator_command
+def delete_if_equal(redis_conn, key, value):
+    """
+        remove key only if it holds value, in one round trip.
+        returns True when the key matched and was removed.
+    """
+    expected = [pack_data(value)]
+    if settings.REDIS_CONFIG['ALLOW_PICKLE_READ']:
+        # keys written before the codec layer
+        expected.append(pickle.dumps(value))
+    script = redis_conn.register_script(_DELETE_IF_EQUAL_SCRIPT)
+    return bool(script(keys=[key], args=expected))
+
+
+@decorator_command
+def take_token(redis_conn, key, rate, capacity):
+    """
+        rate limit shared by every process: take one token from the bucket at key,
+        refilled with rate tokens per second up to capacity (the allowed burst).
+        returns 0 when a token was taken, otherwise the seconds to wait before trying again.
+    """
+    script = redis_conn.register_script(_TAKE_TOKEN_SCRIPT)
+    return script(keys=[key], args=[rate, capacity]) / 1000
+
+
+@decorator_command
+def get_counter(redis_conn, key):
+    val = redis_conn.get(key)
+    return int(val) if val is not None else None
+
+
+@decorator_command
+def set_counter_if_absent(redis_conn, key, value, seconds):
+    return bool(redis_conn.set(key, int(value), ex=seconds, nx=True))
+
+
+@decorator_command
+def incr_hash(redis_conn, key, amounts):
+    """
+        {field: amount} increase several counters of a hash in one round trip
+    """
+    with redis_conn.pipeline(transaction=False) as pipe:
+        for field, amount in amounts.items():
+            pipe.hincrby(key, field, int(amount))
+        pipe.execute()
+    return True
+
+
+@decorator_command
+def get_hash_counters(redis_conn, key):
+    return {field.decode(): int(val) for field, val in redis_conn.hgetall(key).items()}
 
 
 @decorator_command
-def remove_key(redis_conn, key):
-    redis_conn.delete(key)
+def incr_existing(redis_conn, amounts):
+    """
+        {key: amount} increase the counters that exist, in one round trip.
+        returns {key: new value} (None for missing keys, they are left missing)
+    """
+    if not amounts:
+        return {}
+    keys = list(amounts)
+    script = redis_conn.register_script(_INCR_EXISTING_SCRIPT)
+    values = script(keys=keys, args=[int(amounts[key]) for key in keys])
+    return {key: int(val) if val is not None else None for key, val in zip(keys, values)}
+
+
+@decorator_command
+def stream_range(redis_conn, key, max_id='+', count=None):
+    """
+        entries of a stream written by redis_async.stream_add, oldest first: [(entry_id, value)]
+    """
+    entries = redis_conn.xrange(key, min='-', max=max_id, count=count)
+    return [(entry_id, unpack_data(fields[b'data'])) for entry_id, fields in entries]
+
+
+@decorator_command
+def get_time(redis_conn):
+    """
+        time of the redis server in seconds, the clock stream entry ids are issued from
+    """
+    seconds, microseconds = redis_conn.time()
+    return seconds + microseconds / 1000000
+
+
+@decorator_command
+def stream_delete(redis_conn, key, entry_ids):
+    if entry_ids:
+        redis_conn.xdel(key, *entry_ids)
+    return True
+
+
+@decorator_command
+def remove_key(redis_conn, *keys):
+    redis_conn.delete(*keys)
     return True
 
 
 @decorator_command
 def clear_db(redis_conn):
     redis_conn.flushdb()
-    return True
\ No newline at end of file
+    return True
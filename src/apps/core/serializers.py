@@ -3,7 +3,7 @@ from rest_framework import serializers
 
 class PaginatorSerializer(serializers.Serializer):
     objects_count = serializers.IntegerField(source='count')
-    pages_count = serializers.IntegerField(source='num_page')
+    pages_count = serializers.IntegerField(source='num_pages')
 
     
 class ListSerializer(serializers.Serializer):
@@ -12,6 +12,7 @@ class ListSerializer(serializers.Serializer):
 
 class ListParamsSerializer(serializers.Serializer):
     page = serializers.IntegerField(default=1, required=False)
+    cursor = serializers.CharField(required=False)  # views with cursor_pagination
 
 
 class FilterByDateSerializer(serializers.Serializer):
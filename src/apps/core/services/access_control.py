@@ -1,15 +1,95 @@
+import uuid
+import threading
+import weakref
+
 from rest_framework.exceptions import PermissionDenied
 from apps.core import text
 from apps.team.models import TeamMembership
 from apps.account.enums import UserRoleEnum
 
 
+# team ids of a user are loaded once and kept on the user instance,
+# request.user lives as long as the request so this is a per-request cache
+TEAM_IDS_CACHE_ATTR = '_team_ids_cache'
+# instances holding that cache (by id(), model instances of the same user compare equal),
+# a membership change reaches request.user even when the signal gets another instance of the user
+_cached_users = weakref.WeakValueDictionary()
+_cached_users_lock = threading.Lock()
+
+
+def _get_team_id(team):
+    """
+        accept a team instance or its id (uuid or str), return uuid or None
+    """
+    if team is None:
+        return None
+    team_id = getattr(team, 'pk', team)
+    if isinstance(team_id, uuid.UUID):
+        return team_id
+    try:
+        return uuid.UUID(str(team_id))
+    except ValueError:
+        return None
+
+
+def get_user_team_ids(user):
+    team_ids = getattr(user, TEAM_IDS_CACHE_ATTR, None)
+    if team_ids is None:
+        team_ids = frozenset(TeamMembership.objects.filter(user=user).values_list('team_id', flat=True))
+        setattr(user, TEAM_IDS_CACHE_ATTR, team_ids)
+        with _cached_users_lock:
+            _cached_users[id(user)] = user
+    return team_ids
+
+
+def reset_user_team_ids(user):
+    """
+        drop the cached team ids of every instance of the user (by user id)
+    """
+    if user is None or user.pk is None:
+        return
+    with _cached_users_lock:
+        instances = [cached for cached in _cached_users.values() if cached.pk == user.pk]
+    for instance in [user, *instances]:
+        instance.__dict__.pop(TEAM_IDS_CACHE_ATTR, None)
+
+
 def is_team_member(user, team):
 
     if user.role == UserRoleEnum.ADMIN:
         return True
 
-    if not TeamMembership.objects.filter(user=user, team=team).exists():
+    team_id = _get_team_id(team)
+    if team_id is None or team_id not in get_user_team_ids(user):
+        raise PermissionDenied(text.permission_denied)
+
+    return True
+
+
+def check_team_members(users, team):
+    """
+        same as is_team_member for several users, users without a cached
+        membership set are checked together with one query
+    """
+    team_id = _get_team_id(team)
+    if team_id is None:
         raise PermissionDenied(text.permission_denied)
 
+    pending = []
+    for user in users:
+        if user.role == UserRoleEnum.ADMIN:
+            continue
+        team_ids = getattr(user, TEAM_IDS_CACHE_ATTR, None)
+        if team_ids is None:
+            pending.append(user)
+        elif team_id not in team_ids:
+            raise PermissionDenied(text.permission_denied)
+
+    if pending:
+        member_ids = set(
+            TeamMembership.objects.filter(team_id=team_id, user__in=pending).values_list('user_id', flat=True)
+        )
+        if any(user.pk not in member_ids for user in pending):
+            raise PermissionDenied(text.permission_denied)
+
     return True
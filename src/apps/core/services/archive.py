@@ -0,0 +1,209 @@
+"""
+    retention of append-only tables (see settings.RETENTION_CONFIG).
+    expired rows are written oldest first to gzipped json lines files under ARCHIVE_DIR/<policy>/,
+    one file per batch, and deleted by primary key right after, each batch in its own short transaction.
+    a run that stops halfway (time limit, crash) simply continues with the oldest rows left,
+    a batch archived but not deleted is archived again and restore() skips the duplicate.
+"""
+import datetime
+import gzip
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+FILE_SUFFIX = '.jsonl.gz'
+TIME_FORMAT = '%Y%m%dT%H%M%S'
+
+
+class ArchiveEncoder(DjangoJSONEncoder):
+    """
+        DjangoJSONEncoder cuts datetimes to milliseconds, archived times are kept exact
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class Policy:
+    """
+        one entry of RETENTION_CONFIG['POLICIES']:
+        'name': {'model': 'app.Model', 'field': 'status', 'days': {'default': 90, 'PENDING': None}}
+        rows whose field value has no days entry use 'default', None keeps them forever
+    """
+
+    def __init__(self, name, model, field, days):
+        self.name = name
+        self.model = apps.get_model(model)
+        self.field = field
+        self.days = days
+
+    @classmethod
+    def get(cls, name):
+        return cls(name, **settings.RETENTION_CONFIG['POLICIES'][name])
+
+    @classmethod
+    def all(cls):
+        return [cls.get(name) for name in settings.RETENTION_CONFIG['POLICIES']]
+
+    def get_expired(self, now=None):
+        now = now or timezone.now()
+        special = {value: days for value, days in self.days.items() if value != 'default'}
+
+        condition = Q()
+        for value, days in special.items():
+            if days is not None:
+                condition |= Q(**{self.field: value, 'created_at__lt': now - datetime.timedelta(days=days)})
+        default = self.days.get('default')
+        if default is not None:
+            others = Q(created_at__lt=now - datetime.timedelta(days=default))
+            if special:
+                others &= ~Q(**{f'{self.field}__in': list(special)})
+            condition |= others
+
+        if not condition:
+            return self.model.objects.none()
+        return self.model.objects.filter(condition)
+
+    @property
+    def directory(self):
+        return Path(settings.RETENTION_CONFIG['ARCHIVE_DIR']) / self.name
+
+
+def _to_name_time(value):
+    # aware times are named in utc, naive ones (USE_TZ = False) as stored
+    return value.astimezone(datetime.timezone.utc) if timezone.is_aware(value) else value
+
+
+def _from_name_time(value):
+    value = datetime.datetime.strptime(value, TIME_FORMAT)
+    return value.replace(tzinfo=datetime.timezone.utc) if settings.USE_TZ else value
+
+
+def write_file(directory, objs):
+    """
+        write objs (ordered by created_at) to a new archive file, the name carries their time range
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    first, last = (_to_name_time(obj.created_at) for obj in (objs[0], objs[-1]))
+    name = f'{first:{TIME_FORMAT}}_{last:{TIME_FORMAT}}_{uuid.uuid4().hex[:8]}{FILE_SUFFIX}'
+    path = directory / name
+    tmp_path = directory / f'.{name}.tmp'
+
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as file:
+        for row in serializers.serialize('python', objs):
+            file.write(json.dumps(row, cls=ArchiveEncoder) + '\n')
+    # a partial file is never visible under its final name
+    os.replace(tmp_path, path)
+    return path
+
+
+def archive(policy, batch_size=None, time_limit=None):
+    """
+        archive and delete expired rows of policy, returns (rows archived, finished)
+    """
+    conf = settings.RETENTION_CONFIG
+    batch_size = batch_size or conf['BATCH_SIZE']
+    time_limit = time_limit or conf['TIME_LIMIT']
+    deadline = time.monotonic() + time_limit
+    expired = policy.get_expired().order_by('created_at', 'pk')
+    archived = 0
+
+    while time.monotonic() < deadline:
+        objs = list(expired[:batch_size])
+        if not objs:
+            return archived, True
+        write_file(policy.directory, objs)
+        with transaction.atomic():
+            policy.model.objects.filter(pk__in=[obj.pk for obj in objs]).delete()
+        archived += len(objs)
+
+    return archived, False
+
+
+def get_files(policy, start=None, end=None):
+    """
+        archive files of policy whose rows may fall in [start, end)
+    """
+    if not policy.directory.exists():
+        return []
+    files = []
+    for path in sorted(policy.directory.glob(f'*{FILE_SUFFIX}')):
+        first, last = (_from_name_time(value) for value in path.name[:-len(FILE_SUFFIX)].split('_')[:2])
+        # times in names are truncated to the second
+        if (start is None or last + datetime.timedelta(seconds=1) > start) and (end is None or first < end):
+            files.append(path)
+    return files
+
+
+def _clear_missing_relations(model, objs):
+    """
+        rows may point to users, teams... deleted since they were archived,
+        nullable foreign keys to missing rows are cleared, other rows can not be restored
+    """
+    for field in model._meta.concrete_fields:
+        if not isinstance(field, models.ForeignKey):
+            continue
+        ids = {getattr(obj, field.attname) for obj in objs} - {None}
+        if not ids:
+            continue
+        existing = set(field.related_model._base_manager.filter(pk__in=ids).values_list('pk', flat=True))
+        if len(existing) == len(ids):
+            continue
+        for obj in objs:
+            value = getattr(obj, field.attname)
+            if value is not None and value not in existing:
+                if not field.null:
+                    raise ValueError(f'{model.__name__} {obj.pk}: {field.name} {value} no longer exists')
+                setattr(obj, field.attname, None)
+
+
+def _restore_batch(model, objs):
+    existing = set(model._base_manager.filter(pk__in=[obj.pk for obj in objs]).values_list('pk', flat=True))
+    # a batch archived twice (run stopped before its delete) shows up in two files
+    objs = list({obj.pk: obj for obj in objs if obj.pk not in existing}.values())
+    if not objs:
+        return 0
+    _clear_missing_relations(model, objs)
+    times = [(obj.created_at, obj.updated_at) for obj in objs]
+    # bulk_create applies auto_now(_add), the archived times are written back afterwards
+    model.objects.bulk_create(objs)
+    for obj, (created_at, updated_at) in zip(objs, times):
+        obj.created_at, obj.updated_at = created_at, updated_at
+    model.objects.bulk_update(objs, ['created_at', 'updated_at'])
+    return len(objs)
+
+
+@transaction.atomic
+def restore(policy, start=None, end=None, batch_size=None):
+    """
+        put archived rows created in [start, end) back into their table, returns the number restored.
+        rows already in the table are skipped, archive files are left in place.
+        rows still past retention are archived again by the next run.
+    """
+    batch_size = batch_size or settings.RETENTION_CONFIG['BATCH_SIZE']
+    restored = 0
+    batch = []
+    for path in get_files(policy, start, end):
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            for item in serializers.deserialize('python', (json.loads(line) for line in file)):
+                obj = item.object
+                if (start is None or obj.created_at >= start) and (end is None or obj.created_at < end):
+                    batch.append(obj)
+                if len(batch) >= batch_size:
+                    restored += _restore_batch(policy.model, batch)
+                    batch = []
+    if batch:
+        restored += _restore_batch(policy.model, batch)
+    return restored
@@ -0,0 +1,20 @@
+from celery import shared_task
+from django.conf import settings
+
+from .services import archive
+
+
+@shared_task
+def archive_expired_rows(policy=None):
+    """
+        archive rows past their retention (settings.RETENTION_CONFIG), one policy or all of them.
+        a policy that is not done within TIME_LIMIT continues in a new task, so a large backlog
+        never holds a worker for long.
+    """
+    names = [policy] if policy else list(settings.RETENTION_CONFIG['POLICIES'])
+    archived = {}
+    for name in names:
+        archived[name], finished = archive.archive(archive.Policy.get(name))
+        if not finished:
+            archive_expired_rows.delay(name)
+    return archived
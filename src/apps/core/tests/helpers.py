@@ -0,0 +1,83 @@
+"""
+    test helpers shared by several apps
+"""
+import asyncio
+
+
+class SlowRedisStub:
+    """
+        in-memory stand-in with network-like latency that only awaits (never blocks)
+    """
+
+    def __init__(self, latency=0.01):
+        self.latency = latency
+        self.data = {}
+
+    async def get(self, key):
+        await asyncio.sleep(self.latency)
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        await asyncio.sleep(self.latency)
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def mget(self, keys):
+        await asyncio.sleep(self.latency)
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return SlowPipelineStub(self)
+
+
+class SlowPipelineStub:
+    """
+        queues set/get calls and runs them on execute with one round trip of latency
+    """
+
+    def __init__(self, stub):
+        self.stub = stub
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands = []
+
+    def set(self, key, value, ex=None, nx=False):
+        self.commands.append(('set', key, value, nx))
+        return self
+
+    def get(self, key):
+        self.commands.append(('get', key))
+        return self
+
+    async def execute(self):
+        await asyncio.sleep(self.stub.latency)
+        data = self.stub.data
+        results = []
+        for command in self.commands:
+            if command[0] == 'get':
+                results.append(data.get(command[1]))
+                continue
+            _, key, value, nx = command
+            if nx and key in data:
+                results.append(None)
+                continue
+            data[key] = value
+            results.append(True)
+        self.commands = []
+        return results
+
+
+async def measure_loop_lag(stop, interval=0.005):
+    loop = asyncio.get_running_loop()
+    max_lag = 0.0
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, loop.time() - start - interval)
+    return max_lag
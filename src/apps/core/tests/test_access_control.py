@@ -0,0 +1,130 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APIClient
+
+from apps.account.models import User
+from apps.account.tests.factories import UserFactory
+from apps.account.enums import UserRoleEnum as Role
+from apps.team.tests.factories import TeamFactory, TeamMembershipFactory
+from apps.board.tests.factories import BoardFactory
+from apps.task.tests.factories import TaskListFactory, TaskFactory
+from apps.core.services.access_control import is_team_member, check_team_members, get_user_team_ids
+
+
+def membership_queries(queries):
+    return [q for q in queries if 'team_teammembership' in q['sql']]
+
+
+@pytest.mark.django_db
+class TestIsTeamMember:
+
+    def test_team_ids_are_loaded_once(self, django_assert_num_queries):
+        user = UserFactory(role=Role.PROJECT_MEMBER)
+        team = TeamFactory()
+        TeamMembershipFactory(user=user, team=team)
+
+        with django_assert_num_queries(1):
+            assert is_team_member(user, team)
+            assert is_team_member(user, team.id)
+            assert is_team_member(user, str(team.id))
+
+    def test_non_member_and_invalid_team_denied(self):
+        user = UserFactory(role=Role.PROJECT_MEMBER)
+
+        with pytest.raises(PermissionDenied):
+            is_team_member(user, TeamFactory())
+        with pytest.raises(PermissionDenied):
+            is_team_member(user, None)
+        with pytest.raises(PermissionDenied):
+            is_team_member(user, "not-a-uuid")
+
+    def test_membership_change_resets_cache(self):
+        user = UserFactory(role=Role.PROJECT_MEMBER)
+        team = TeamFactory()
+        assert team.id not in get_user_team_ids(user)
+
+        membership = TeamMembershipFactory(user=user, team=team)
+        assert is_team_member(user, team)
+
+        membership.delete()
+        with pytest.raises(PermissionDenied):
+            is_team_member(user, team)
+
+    def test_membership_change_resets_other_instances_of_the_user(self):
+        user = UserFactory(role=Role.PROJECT_MEMBER)
+        team = TeamFactory()
+        # request.user and the user the membership signal gets are different instances
+        request_user = User.objects.get(pk=user.pk)
+        assert team.id not in get_user_team_ids(request_user)
+
+        membership = TeamMembershipFactory(user=User.objects.get(pk=user.pk), team=team)
+        assert is_team_member(request_user, team)
+        assert check_team_members([request_user], team)
+
+        membership.delete()
+        with pytest.raises(PermissionDenied):
+            is_team_member(request_user, team)
+        with pytest.raises(PermissionDenied):
+            check_team_members([request_user], team)
+
+    def test_check_team_members_single_query(self, django_assert_num_queries):
+        team = TeamFactory()
+        users = [UserFactory(role=Role.PROJECT_MEMBER) for _ in range(3)]
+        for user in users:
+            TeamMembershipFactory(user=user, team=team)
+
+        with django_assert_num_queries(1):
+            assert check_team_members(users, team)
+
+        with pytest.raises(PermissionDenied):
+            check_team_members([*users, UserFactory(role=Role.PROJECT_MEMBER)], team)
+
+
+@pytest.mark.django_db
+class TestProtectedEndpointsMembershipLookups:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.client = APIClient()
+        self.user = UserFactory(role=Role.PROJECT_ADMIN)
+        self.team = TeamFactory(created_by=self.user)
+        TeamMembershipFactory(user=self.user, team=self.team)
+        self.board = BoardFactory(team=self.team, created_by=self.user)
+        self.tasklist = TaskListFactory(board=self.board)
+        self.task = TaskFactory(task_list=self.tasklist, assignee=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def assert_one_lookup(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, format="json")
+        assert response.status_code < 400, response.data
+        assert len(membership_queries(ctx.captured_queries)) <= 1
+
+    def test_task_detail(self):
+        self.assert_one_lookup("get", reverse("task:task-detail", kwargs={"task_id": self.task.id}))
+
+    def test_task_update(self):
+        self.assert_one_lookup("put", reverse("task:task-update", kwargs={"task_id": self.task.id}),
+                               {"title": "new title"})
+
+    def test_assign_task(self):
+        assignee = UserFactory(role=Role.PROJECT_MEMBER)
+        TeamMembershipFactory(user=assignee, team=self.team)
+        self.assert_one_lookup("post", reverse("task:assign-task-to-user"), {
+            "title": "task", "task_list": str(self.tasklist.id), "assignee": str(assignee.id),
+        })
+
+    def test_tasklist_detail(self):
+        self.assert_one_lookup("get", reverse("task:tasklist-detail", kwargs={"tasklist_id": self.tasklist.id}))
+
+    def test_task_lists(self):
+        self.assert_one_lookup("get", reverse("task:task-list") + f"?board_id={self.board.id}")
+
+    def test_board_detail(self):
+        self.assert_one_lookup("get", reverse("board:board-detail", kwargs={"board_id": self.board.id}))
+
+    def test_logbook_list(self):
+        self.assert_one_lookup("get", reverse("logbook:log-list") + f"?team={self.team.id}")
@@ -0,0 +1,125 @@
+import datetime
+import gzip
+import json
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.account.tests.factories import UserFactory
+from apps.core import tasks
+from apps.core.services import archive
+from apps.logbook.enums import LogEventEnum
+from apps.logbook.models import LogEntryModel
+from apps.logbook.tests.factories import LogEntryFactory
+from apps.notification.enums import NotificationType, NotificationStatus
+from apps.notification.models import Notification
+from apps.notification.tests.factories import NotificationFactory
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(settings, tmp_path):
+    settings.RETENTION_CONFIG = {
+        **settings.RETENTION_CONFIG,
+        'ARCHIVE_DIR': tmp_path,
+        'BATCH_SIZE': 3,
+        'POLICIES': {
+            'logbook': {'model': 'logbook.LogEntryModel', 'field': 'event',
+                        'days': {'default': 30, LogEventEnum.USER_LOGIN: 7}},
+            'notification': {'model': 'notification.Notification', 'field': 'status',
+                             'days': {'default': 30, NotificationStatus.PENDING: None}},
+        },
+    }
+    return tmp_path
+
+
+def make_logs(count, days_ago, **kwargs):
+    logs = LogEntryFactory.create_batch(count, **kwargs)
+    LogEntryModel.objects.filter(pk__in=[log.pk for log in logs]) \
+        .update(created_at=timezone.now() - datetime.timedelta(days=days_ago))
+    return logs
+
+
+def make_notifications(count, days_ago, status, **kwargs):
+    items = NotificationFactory.create_batch(count, status=status, type=NotificationType.IN_APP, **kwargs)
+    Notification.objects.filter(pk__in=[n.pk for n in items]) \
+        .update(created_at=timezone.now() - datetime.timedelta(days=days_ago))
+    return items
+
+
+@pytest.mark.django_db
+class TestRetention:
+
+    def test_policy_selects_rows_per_field_value(self):
+        expired = make_logs(2, 40, event=LogEventEnum.TASK_UPDATE)
+        logins = make_logs(2, 10, event=LogEventEnum.USER_LOGIN)
+        make_logs(2, 10, event=LogEventEnum.TASK_UPDATE)
+
+        selected = set(archive.Policy.get('logbook').get_expired().values_list('pk', flat=True))
+
+        assert selected == {log.pk for log in expired + logins}
+
+    def test_none_keeps_rows_forever(self):
+        make_notifications(2, 400, NotificationStatus.PENDING)
+        sent = make_notifications(2, 40, NotificationStatus.SENT)
+
+        selected = set(archive.Policy.get('notification').get_expired().values_list('pk', flat=True))
+
+        assert selected == {n.pk for n in sent}
+
+    def test_archive_writes_batches_and_deletes(self, archive_dir):
+        expired = make_logs(7, 40, event=LogEventEnum.TASK_UPDATE)
+        kept = make_logs(2, 1, event=LogEventEnum.TASK_UPDATE)
+
+        archived, finished = archive.archive(archive.Policy.get('logbook'))
+
+        assert (archived, finished) == (7, True)
+        assert set(LogEntryModel.objects.values_list('pk', flat=True)) == {log.pk for log in kept}
+        files = sorted((archive_dir / 'logbook').glob('*.jsonl.gz'))
+        assert len(files) == 3
+        with gzip.open(files[0], 'rt') as file:
+            rows = [json.loads(line) for line in file]
+        assert {row['pk'] for row in rows} <= {str(log.pk) for log in expired}
+
+    def test_archive_stops_at_time_limit(self):
+        make_logs(7, 40, event=LogEventEnum.TASK_UPDATE)
+
+        with mock.patch.object(archive.time, 'monotonic', side_effect=[0, 0, 0, 1000]):
+            archived, finished = archive.archive(archive.Policy.get('logbook'), time_limit=10)
+
+        assert (archived, finished) == (6, False)
+        assert LogEntryModel.objects.count() == 1
+
+    def test_task_requeues_unfinished_policy(self):
+        with mock.patch.object(archive, 'archive', side_effect=[(3, False), (0, True)]), \
+                mock.patch.object(tasks.archive_expired_rows, 'delay') as delay:
+            assert tasks.archive_expired_rows() == {'logbook': 3, 'notification': 0}
+
+        delay.assert_called_once_with('logbook')
+
+    def test_restore_range(self):
+        old = make_logs(3, 40, event=LogEventEnum.TASK_UPDATE)
+        older = make_logs(3, 60, event=LogEventEnum.TASK_UPDATE)
+        created_at = {log.pk: LogEntryModel.objects.get(pk=log.pk).created_at for log in old}
+        archive.archive(archive.Policy.get('logbook'))
+
+        now = timezone.now()
+        call_command('restore_archive', 'logbook', '--from', f'{(now - datetime.timedelta(days=45)).date()}')
+
+        restored = {log.pk: log.created_at for log in LogEntryModel.objects.all()}
+        assert restored == created_at
+        assert not LogEntryModel.objects.filter(pk__in=[log.pk for log in older]).exists()
+
+    def test_restore_skips_existing_rows_and_missing_users(self):
+        user = UserFactory()
+        notifications = make_notifications(2, 40, NotificationStatus.SENT, to_user=user)
+        policy = archive.Policy.get('notification')
+        archive.archive(policy)
+        # the same rows archived twice, as after a run stopped before its delete
+        archive.write_file(policy.directory, notifications)
+        user.delete()
+
+        assert archive.restore(policy) == 2
+        assert not Notification.objects.filter(to_user__isnull=False).exists()
+        assert archive.restore(policy) == 0
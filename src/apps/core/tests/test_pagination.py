@@ -0,0 +1,143 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.account.models import UserProfileModel
+from apps.account.tests.factories import UserFactory
+from apps.board.tests.factories import BoardFactory
+from apps.notification.models import Notification
+from apps.notification.enums import NotificationType, NotificationStatus
+from apps.notification.tests.factories import NotificationFactory
+from apps.task.tests.factories import TaskListFactory
+from apps.team.tests.factories import TeamFactory, TeamMembershipFactory
+from apps.core.exceptions import InvalidCursor
+from apps.core.pagination import CursorPaginator
+
+
+@pytest.fixture
+def notifications():
+    user = UserFactory()
+    items = NotificationFactory.create_batch(25, to_user=user, type=NotificationType.IN_APP,
+                                           status=NotificationStatus.SENT)
+    # several rows share created_at so the id tiebreaker is exercised
+    same_time = datetime.datetime(2025, 1, 1, 12, 0)
+    Notification.objects.filter(pk__in=[n.pk for n in items[:10]]).update(created_at=same_time)
+    return Notification.objects.filter(to_user=user)
+
+
+def ordered_ids(queryset):
+    return list(queryset.order_by('-created_at', '-id').values_list('id', flat=True))
+
+
+@pytest.mark.django_db
+class TestCursorPaginator:
+
+    def test_walk_forward_and_back(self, notifications):
+        paginator = CursorPaginator(notifications, per_page=10)
+        expected = ordered_ids(notifications)
+
+        pages = [paginator.get_page()]
+        while pages[-1].next_cursor:
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert [obj.id for page in pages for obj in page] == expected
+        assert pages[0].previous_cursor is None
+
+        back = paginator.get_page(pages[-1].previous_cursor)
+        assert [obj.id for obj in back] == [obj.id for obj in pages[1]]
+        first = paginator.get_page(back.previous_cursor)
+        assert [obj.id for obj in first] == [obj.id for obj in pages[0]]
+        assert first.previous_cursor is None
+
+    def test_ascending_ordering(self, notifications):
+        paginator = CursorPaginator(notifications, per_page=20, ordering=('created_at', 'id'))
+        page = paginator.get_page()
+        page = paginator.get_page(page.next_cursor)
+        assert [obj.id for obj in page] == ordered_ids(notifications)[::-1][20:]
+
+    def test_count_is_optional(self, notifications):
+        assert CursorPaginator(notifications, per_page=10).count is None
+        assert CursorPaginator(notifications, per_page=10, with_count=True).count == 25
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "WyJ4IixbXV0", "WyJuIixbIngiLCJ5Il1d"])
+    def test_invalid_cursor(self, notifications, cursor):
+        with pytest.raises(InvalidCursor):
+            CursorPaginator(notifications, per_page=10).get_page(cursor)
+
+
+@pytest.mark.django_db
+class TestCursorListView:
+
+    def test_notification_list_uses_cursor(self, notifications):
+        user = notifications.first().to_user
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("notification:notification-list")
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url, {"cursor": ""})
+        assert response.status_code == 200
+        assert len(response.data["data"]) == 20
+        assert response.data["cursor"]["previous"] is None
+        assert not [q for q in ctx.captured_queries if 'COUNT(' in q['sql'].upper()]
+
+        response = client.get(url, {"cursor": response.data["cursor"]["next"]})
+        assert len(response.data["data"]) == 5
+        assert response.data["cursor"]["next"] is None
+
+    def test_notification_list_keeps_numbered_pages(self, notifications):
+        client = APIClient()
+        client.force_authenticate(user=notifications.first().to_user)
+
+        response = client.get(reverse("notification:notification-list"), {"page": 2})
+        assert response.status_code == 200
+        assert len(response.data["data"]) == 5
+        assert "cursor" not in response.data
+
+    def test_invalid_cursor_response(self, notifications):
+        client = APIClient()
+        client.force_authenticate(user=notifications.first().to_user)
+
+        response = client.get(reverse("notification:notification-list"), {"cursor": "broken"})
+        assert response.status_code == 400
+
+    def test_profile_list_opts_into_cursor(self):
+        UserFactory.create_batch(25)
+        client = APIClient()
+        url = reverse("apps.account:profile-list")
+
+        response = client.get(url, {"cursor": ""})
+        assert response.status_code == 200
+        first = [profile["id"] for profile in response.data["results"]]
+        response = client.get(url, {"cursor": response.data["cursor"]["next"]})
+        rest = [profile["id"] for profile in response.data["results"]]
+
+        assert response.data["cursor"]["next"] is None
+        expected = UserProfileModel.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        assert first + rest == [str(pk) for pk in expected]
+
+        response = client.get(url, {"page": 2})
+        assert "cursor" not in response.data
+        assert len(response.data["results"]) == len(rest)
+
+    def test_task_list_cursor_follows_board_position(self):
+        user = UserFactory(is_active=True, role="admin")
+        team = TeamFactory(created_by=user)
+        board = BoardFactory(team=team, created_by=user)
+        TeamMembershipFactory(user=user, team=team)
+        task_lists = [TaskListFactory(board=board, order=(25 - i) * 1024) for i in range(25)]
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("task:task-list")
+
+        response = client.get(url, {"board_id": str(board.id), "cursor": ""})
+        ids = [task_list["id"] for task_list in response.data["data"]]
+        response = client.get(url, {"board_id": str(board.id), "cursor": response.data["cursor"]["next"]})
+        ids += [task_list["id"] for task_list in response.data["data"]]
+
+        assert ids == [str(task_list.id) for task_list in reversed(task_lists)]
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from unittest import mock
+
+from apps.core import redis_async, redis_utils
+from apps.core.tests.helpers import SlowRedisStub, measure_loop_lag
+
+
+@pytest.fixture
+def redis_stub():
+    stub = SlowRedisStub()
+    with mock.patch.object(redis_async.redis_manager, "get_conn", return_value=stub):
+        yield stub
+
+
+@pytest.mark.asyncio
+async def test_values_are_shared_with_sync_codec(redis_stub):
+    await redis_async.set_value("key", {"room": 1})
+
+    assert redis_utils.unpack_data(redis_stub.data["key"]) == {"room": 1}
+    assert await redis_async.get_value("key") == {"room": 1}
+    assert await redis_async.get_many(["key", "missing"]) == {"key": {"room": 1}, "missing": None}
+
+
+@pytest.mark.asyncio
+async def test_pool_is_created_per_event_loop():
+    manager = redis_async.AsyncRedisManager()
+
+    conn = manager.get_conn()
+
+    assert manager.get_conn() is conn
+    assert len(manager.clients) == 1
+    await manager.close()
+    assert len(manager.clients) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_do_not_block_loop(redis_stub):
+    stop = asyncio.Event()
+    probe = asyncio.create_task(measure_loop_lag(stop))
+
+    # run serially this would hold the loop for 200 * 10ms
+    await asyncio.gather(*(redis_async.get_value(f"key_{i}") for i in range(200)))
+    stop.set()
+
+    assert await probe < 0.05
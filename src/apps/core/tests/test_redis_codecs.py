@@ -0,0 +1,45 @@
+import pickle
+import uuid
+import pytest
+
+from apps.core import redis_codecs
+
+
+@pytest.mark.parametrize("codec_name", ["msgpack", "json"])
+@pytest.mark.parametrize("value", ["123456", 42, None, [1, "a"], {"title": "board", "tasks": [{"id": 1}]}])
+def test_round_trip(codec_name, value):
+    codec = redis_codecs.get_codec(codec_name)
+    data = redis_codecs.encode(value, codec)
+
+    assert data[:1] == codec.tag
+    assert redis_codecs.decode(data) == value
+
+
+def test_default_codec_is_smaller_than_pickle():
+    assert len(redis_codecs.encode("123456")) < len(pickle.dumps("123456"))
+
+
+def test_uuid_is_stored_as_string():
+    value = uuid.uuid4()
+
+    assert redis_codecs.decode(redis_codecs.encode({"id": value})) == {"id": str(value)}
+
+
+def test_reads_legacy_pickle_value_when_allowed(settings, caplog):
+    settings.REDIS_CONFIG = {**settings.REDIS_CONFIG, "ALLOW_PICKLE_READ": True}
+
+    assert redis_codecs.decode(pickle.dumps("1234")) == "1234"
+    assert "deprecated" in caplog.text
+
+
+def test_legacy_pickle_read_is_off_by_default():
+    with pytest.raises(redis_codecs.CodecError):
+        redis_codecs.decode(pickle.dumps("1234"))
+
+
+def test_unknown_codec_and_tag():
+    with pytest.raises(redis_codecs.CodecError):
+        redis_codecs.get_codec("yaml")
+
+    with pytest.raises(redis_codecs.CodecError):
+        redis_codecs.decode(b"\x7fpayload")
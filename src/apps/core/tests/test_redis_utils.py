@@ -0,0 +1,86 @@
+import pickle
+import pytest
+from unittest import mock
+
+from apps.core import redis_utils
+
+
+@pytest.fixture
+def redis_conn():
+    conn = mock.MagicMock()
+    with mock.patch.object(redis_utils.redis_manager, "get_conn", return_value=conn):
+        yield conn
+
+
+def test_pool_is_shared_and_lazy(settings):
+    manager = redis_utils.RedisManager()
+    assert manager.pool is None
+
+    conn = manager.get_conn()
+
+    assert manager.get_conn() is conn
+    assert conn.connection_pool is manager.get_pool()
+    assert manager.pool.max_connections == settings.REDIS_CONFIG['MAX_CONNECTIONS']
+    manager.close()
+    assert manager.pool is None
+
+
+def test_get_and_set_if_absent_stores_value(redis_conn):
+    pipe = redis_conn.pipeline.return_value.__enter__.return_value
+    pipe.execute.return_value = [True, redis_utils.pack_data("1234")]
+
+    assert redis_utils.get_and_set_if_absent("key", "1234", 60) is None
+    pipe.set.assert_called_once_with("key", redis_utils.pack_data("1234"), ex=60, nx=True)
+    pipe.execute.assert_called_once()
+
+
+def test_get_and_set_if_absent_returns_existing_value(redis_conn):
+    pipe = redis_conn.pipeline.return_value.__enter__.return_value
+    pipe.execute.return_value = [None, redis_utils.pack_data("9999")]
+
+    assert redis_utils.get_and_set_if_absent("key", "1234", 60) == "9999"
+
+
+def test_unreadable_legacy_value_is_missing(redis_conn):
+    redis_conn.get.return_value = pickle.dumps("1234")
+
+    assert redis_utils.get_value("key") is None
+
+
+def test_get_and_set_if_absent_replaces_unreadable_legacy_value(redis_conn):
+    pipe = redis_conn.pipeline.return_value.__enter__.return_value
+    pipe.execute.return_value = [None, pickle.dumps("9999")]
+
+    assert redis_utils.get_and_set_if_absent("key", "1234", 60) is None
+    redis_conn.set.assert_called_once_with("key", redis_utils.pack_data("1234"), ex=60)
+
+
+def test_get_many_uses_single_mget(redis_conn):
+    redis_conn.mget.return_value = [redis_utils.pack_data(1), None]
+
+    assert redis_utils.get_many(["a", "b"]) == {"a": 1, "b": None}
+    redis_conn.mget.assert_called_once_with(["a", "b"])
+
+
+def test_set_many_expire_pipelines_commands(redis_conn):
+    pipe = redis_conn.pipeline.return_value.__enter__.return_value
+
+    redis_utils.set_many_expire({"a": 1, "b": 2}, 30)
+
+    assert pipe.set.call_count == 2
+    pipe.execute.assert_called_once()
+
+
+def test_delete_if_equal_sends_packed_value(redis_conn):
+    script = redis_conn.register_script.return_value
+    script.return_value = 1
+
+    assert redis_utils.delete_if_equal("key", "1234") is True
+    script.assert_called_once()
+    assert script.call_args.kwargs["args"][0] == redis_utils.pack_data("1234")
+
+
+def test_get_time_reads_server_clock(redis_conn):
+    redis_conn.time.return_value = (1700000000, 250000)
+
+    assert redis_utils.get_time() == 1700000000.25
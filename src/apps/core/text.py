@@ -120,6 +120,12 @@ add_task_user = _('Added task to user')
 
 is_archived_board = _('It is not possible to create a list for an archived win.')
 
+not_same_board = _('Task list is not on the same board')
+
+not_in_container = _('The item to place after is not in the target list')
+
+duplicate_task_operation = _('A task can appear only once in a bulk request')
+
 # ----
 
 
@@ -2,6 +2,10 @@ from django.core.paginator import Paginator
 from rest_framework.response import Response
 from rest_framework import status
 
+from apps.core.pagination import CursorPaginator
+
+CURSOR_OPT_IN = 'opt_in'
+
 
 class ViewMixin:
     serializer = None
@@ -91,6 +95,13 @@ class UpdateViewMixin(ViewMixin):
 class ListViewMixin(ViewMixin):
     page_size = 20
     query_params = None
+    # keyset pagination on `cursor_ordering` instead of numbered pages (no COUNT/OFFSET),
+    # the response gets a `cursor` key with opaque next/previous values for `?cursor=`.
+    # True pages every request by cursor, CURSOR_OPT_IN only requests passing `cursor`
+    # (empty for the first page) so `?page=` clients keep numbered pages
+    cursor_pagination = False
+    cursor_ordering = ('-created_at', '-id')
+    cursor_with_count = False
 
     def list(self, request, response=True, *args, **kwargs):
         serializer = self.get_serializer()
@@ -100,21 +111,46 @@ class ListViewMixin(ViewMixin):
             self.query_params = serializer.validated_data
         else:
             self.query_params = request.data
-        query_set = self.get_queryset() or []
-        paginator = Paginator(query_set, self.page_size)
-        page = self.get_page(paginator)
+        # `or []` would evaluate the whole queryset before paginating it
+        query_set = self.get_queryset()
+        if query_set is None:
+            query_set = []
+        use_cursor = self.use_cursor()
+        if use_cursor:
+            paginator = CursorPaginator(query_set, self.page_size, self.cursor_ordering, self.cursor_with_count)
+            page = paginator.get_page(self.get_cursor())
+        else:
+            paginator = Paginator(query_set, self.page_size)
+            page = self.get_page(paginator)
         serializer_resp_data = {
             'paginator': paginator,
             'data': page.object_list
         }
-        ser_resp = self.get_serializer_response()(serializer_resp_data)
+        ser_resp = self.get_serializer_response()(serializer_resp_data, context={'request': request})
+        data = ser_resp.data
+        if use_cursor:
+            data['cursor'] = self.get_cursor_data(paginator, page)
         if response:
-            return Response(ser_resp.data, status=status.HTTP_200_OK)
-        return ser_resp.data
+            return Response(data, status=status.HTTP_200_OK)
+        return data
 
     def get_page(self, paginator):
         return paginator.get_page(self.query_params.get('page', 1))
 
+    def use_cursor(self):
+        if self.cursor_pagination == CURSOR_OPT_IN:
+            return 'cursor' in self.request.GET
+        return bool(self.cursor_pagination)
+
+    def get_cursor(self):
+        return self.request.GET.get('cursor') or None
+
+    def get_cursor_data(self, paginator, page):
+        cursor = {'next': page.next_cursor, 'previous': page.previous_cursor}
+        if paginator.with_count:
+            cursor['count'] = paginator.count
+        return cursor
+
     def get_queryset(self):
         return None
 
@@ -6,6 +6,7 @@ class LogEventEnum(TextChoices):
     TASK_CREATE = "task_create", _("Task created")
     TASK_UPDATE = "task_update", _("Task updated")
     TASK_DELETE = "task_delete", _("Task deleted")
+    TASK_BULK = "task_bulk", _("Tasks changed in bulk")
     BOARD_CREATE = "board_create", _("Board created")
     BOARD_UPDATE = "board_update", _("Board updated")
     BOARD_ARCHIVE = "board_archive", _("Board archived/restore")
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.logbook.services import partitions
+
+
+class Command(BaseCommand):
+    help = 'Create the coming monthly log partitions and detach old ones (postgresql)'
+
+    def add_arguments(self, parser):
+        conf = settings.LOGBOOK_CONFIG
+        parser.add_argument('--convert', action='store_true',
+                            help='turn the log table into a partitioned table first (copies all rows)')
+        parser.add_argument('--months-ahead', type=int, default=conf['PARTITION_MONTHS_AHEAD'])
+        parser.add_argument('--keep-months', type=int, default=conf['PARTITION_KEEP_MONTHS'],
+                            help='detach partitions older than this many months, 0 keeps all')
+
+    def handle(self, *args, **options):
+        try:
+            if options['convert'] and partitions.convert(options['months_ahead']):
+                self.stdout.write(self.style.SUCCESS('log table converted to monthly partitions'))
+
+            for name in partitions.create_partitions(options['months_ahead']):
+                self.stdout.write(f'created {name}')
+
+            if options['keep_months'] > 0:
+                for name in partitions.detach_partitions(options['keep_months']):
+                    self.stdout.write(f'detached {name}')
+        except partitions.PartitioningNotSupported as e:
+            raise CommandError(str(e))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.logbook.services.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the logbook dashboard rollups from log entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--team', dest='team_id', help='only this team')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = rebuild(options['team_id'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{written} rollup rows written'))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:35
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0002_alter_boardmodel_is_archived'),
+        ('logbook', '0002_alter_logentrymodel_event'),
+        ('team', '0003_alter_teammodel_created_by'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogActivityRollupModel',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField(verbose_name='Date')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('actor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activity_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Actor')),
+                ('board', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity_rollups', to='board.boardmodel', verbose_name='Board')),
+                ('team', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity_rollups', to='team.teammodel', verbose_name='Team')),
+            ],
+            options={
+                'verbose_name': 'Activity rollup',
+                'verbose_name_plural': 'Activity rollups',
+                'indexes': [models.Index(fields=['team', 'date'], name='logbook_log_team_id_e751d7_idx')],
+            },
+        ),
+    ]
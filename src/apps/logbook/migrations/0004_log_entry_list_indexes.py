@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0002_alter_boardmodel_is_archived'),
+        ('logbook', '0003_activity_rollup'),
+        ('team', '0003_alter_teammodel_created_by'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logentrymodel',
+            index=models.Index(fields=['team', '-created_at', '-id'], name='logbook_team_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logentrymodel',
+            index=models.Index(fields=['board', '-created_at', '-id'], name='logbook_board_created_idx'),
+        ),
+    ]
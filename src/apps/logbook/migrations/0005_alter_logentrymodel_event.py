@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logbook', '0004_log_entry_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='logentrymodel',
+            name='event',
+            field=models.CharField(choices=[('task_create', 'Task created'), ('task_update', 'Task updated'), ('task_delete', 'Task deleted'), ('task_bulk', 'Tasks changed in bulk'), ('board_create', 'Board created'), ('board_update', 'Board updated'), ('board_archive', 'Board archived/restore'), ('team_member_add', 'Team member added'), ('team_member_drop', 'Team member removed'), ('user_signup', 'User signed up'), ('user_login', 'User logged in'), ('user_logout', 'User logged out'), ('profile_update', 'Profile updated')], max_length=32, verbose_name='Event'),
+        ),
+    ]
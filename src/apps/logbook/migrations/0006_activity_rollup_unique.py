@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:10
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicates(apps, schema_editor):
+    """ rows of one key written by concurrent first writes are summed into one before the constraint """
+    LogActivityRollupModel = apps.get_model('logbook', 'LogActivityRollupModel')
+
+    keys = LogActivityRollupModel.objects \
+        .exclude(team=None).exclude(actor=None).exclude(board=None) \
+        .values('team_id', 'date', 'actor_id', 'board_id') \
+        .annotate(rows=Count('id'), total=Sum('count')) \
+        .filter(rows__gt=1) \
+        .order_by()
+    for key in keys:
+        rows = LogActivityRollupModel.objects.filter(team_id=key['team_id'], date=key['date'],
+                                                     actor_id=key['actor_id'], board_id=key['board_id'])
+        keep = rows.order_by('created_at', 'id').values_list('pk', flat=True).first()
+        rows.exclude(pk=keep).delete()
+        LogActivityRollupModel.objects.filter(pk=keep).update(count=key['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logbook', '0005_alter_logentrymodel_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='logactivityrollupmodel',
+            constraint=models.UniqueConstraint(fields=('team', 'date', 'actor', 'board'),
+                                               name='unique_activity_rollup'),
+        ),
+    ]
@@ -30,6 +30,39 @@ class LogEntryModel(BaseModel):
         verbose_name = _("Log Entry")
         verbose_name_plural = _("Log Entries")
         ordering = ("-created_at",)
+        # LogEntryListView filters by team or board and pages on (-created_at, -id)
+        indexes = [
+            models.Index(fields=['team', '-created_at', '-id'], name='logbook_team_created_idx'),
+            models.Index(fields=['board', '-created_at', '-id'], name='logbook_board_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_event_display()} by {self.actor or 'system'} @ {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class LogActivityRollupModel(BaseModel):
+    """
+        number of log entries per team, day, actor and board, read by the dashboard instead of the log table.
+        kept up to date by services.rollups, rebuilt with `manage.py rebuild_log_rollups`.
+        one row per key (unique constraint), except keys with an empty team, actor or board where
+        concurrent first writes can leave a second row, so readers always sum `count`.
+    """
+    team = models.ForeignKey(TeamModel, null=True, on_delete=models.CASCADE, related_name="activity_rollups",
+                             verbose_name=_('Team'))
+    date = models.DateField(_('Date'))
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL,
+                              related_name="activity_rollups", verbose_name=_('Actor'))
+    board = models.ForeignKey(BoardModel, null=True, blank=True, on_delete=models.CASCADE,
+                              related_name="activity_rollups", verbose_name=_('Board'))
+    count = models.PositiveIntegerField(_('Count'), default=0)
+
+    class Meta:
+        verbose_name = _("Activity rollup")
+        verbose_name_plural = _("Activity rollups")
+        indexes = [models.Index(fields=['team', 'date'])]
+        constraints = [
+            models.UniqueConstraint(fields=['team', 'date', 'actor', 'board'], name='unique_activity_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.team_id} {self.date}: {self.count}"
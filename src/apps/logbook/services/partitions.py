@@ -0,0 +1,184 @@
+"""
+    optional monthly range partitioning of LogEntryModel on created_at (postgresql only).
+
+    `manage.py log_partitions --convert` turns the table into a partitioned one once,
+    after that the same command (from cron) creates the coming months and detaches old ones.
+    a partitioned table can only have a primary key that contains the partition key,
+    so the primary key becomes (id, created_at), ids are still uuid4 and unique in practice.
+    detached partitions stay as plain tables (`logbook_logentrymodel_YYYYMM`) to archive or drop.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .. import models
+
+
+TABLE = models.LogEntryModel._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+class PartitioningNotSupported(Exception):
+    pass
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def get_month(value=None):
+    value = value or timezone.localdate()
+    if isinstance(value, datetime.datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        value = value.date()
+    return value.replace(day=1)
+
+
+def get_partition_name(month):
+    return f'{TABLE}_{month:%Y%m}'
+
+
+def get_month_range(start, end):
+    """
+        first days of the months from start to end, both included
+    """
+    month = get_month(start)
+    end = get_month(end)
+    while month <= end:
+        yield month
+        month = add_months(month, 1)
+
+
+def check_supported():
+    if connection.vendor != 'postgresql':
+        raise PartitioningNotSupported(f'partitioning needs postgresql, not {connection.vendor}')
+
+
+def is_partitioned():
+    check_supported()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass', [TABLE])
+        return cursor.fetchone() is not None
+
+
+def get_partitions():
+    """
+        {month: table name} of the attached monthly partitions
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE pg_inherits.inhparent = %s::regclass',
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        suffix = name[len(TABLE) + 1:]
+        if suffix.isdigit() and len(suffix) == 6:
+            partitions[datetime.date(int(suffix[:4]), int(suffix[4:]), 1)] = name
+    return partitions
+
+
+def _get_month_start(month):
+    value = datetime.datetime.combine(month, datetime.time())
+    return timezone.make_aware(value) if settings.USE_TZ else value
+
+
+def _create_partition(cursor, month):
+    bounds = [_get_month_start(month), _get_month_start(add_months(month, 1))]
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS "{get_partition_name(month)}" PARTITION OF "{TABLE}" '
+        f'FOR VALUES FROM (%s) TO (%s)',
+        bounds,
+    )
+
+
+def create_partitions(months_ahead=3):
+    """
+        make sure partitions exist from the current month to months_ahead, returns the created names
+    """
+    if not is_partitioned():
+        raise PartitioningNotSupported(f'{TABLE} is not partitioned, run `log_partitions --convert` first')
+
+    existing = get_partitions()
+    current = get_month()
+    created = []
+    with connection.cursor() as cursor:
+        for month in get_month_range(current, add_months(current, months_ahead)):
+            if month not in existing:
+                _create_partition(cursor, month)
+                created.append(get_partition_name(month))
+    return created
+
+
+def detach_partitions(keep_months):
+    """
+        detach partitions older than keep_months full months, returns the detached names
+    """
+    if not is_partitioned():
+        raise PartitioningNotSupported(f'{TABLE} is not partitioned, run `log_partitions --convert` first')
+
+    oldest = add_months(get_month(), -keep_months)
+    detached = []
+    with connection.cursor() as cursor:
+        for month, name in sorted(get_partitions().items()):
+            if month < oldest:
+                cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+                detached.append(name)
+    return detached
+
+
+@transaction.atomic
+def convert(months_ahead=3):
+    """
+        rebuild LogEntryModel's table as a partitioned table, in one transaction.
+        rows are copied, so run it in a maintenance window, writers wait on the table lock meanwhile.
+        indexes and foreign keys of the old table are recreated on the new one,
+        a default partition catches rows outside the created months.
+    """
+    if is_partitioned():
+        return False
+
+    old = f'{TABLE}_unpartitioned'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+            [TABLE, f'{TABLE}_pkey'],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f'SELECT MIN(created_at) FROM "{TABLE}"')
+        first_log = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{old}"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE (created_at)'
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, created_at)')
+        cursor.execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+
+        current = get_month()
+        for month in get_month_range(first_log or current, add_months(current, months_ahead)):
+            _create_partition(cursor, month)
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{old}"')
+        cursor.execute(f'DROP TABLE "{old}"')
+
+        # names were released with the old table
+        for indexdef in indexes:
+            cursor.execute(indexdef)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+    return True
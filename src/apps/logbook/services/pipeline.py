@@ -0,0 +1,198 @@
+"""
+    asynchronous logbook writes.
+    signals call emit(), after commit the event is appended to a redis stream (one pipelined round trip)
+    and a celery flush is scheduled once per FLUSH_DELAY. tasks.flush_log_events drains the stream in
+    order with bulk_create, entries are removed from the stream only after they are stored (at-least-once).
+    if redis is unreachable the event is written inline so it is never lost.
+    an event the database still rejects is logged and dropped, one bad event never stalls the stream.
+"""
+import datetime
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from apps.core import redis_utils
+from apps.board.models import BoardModel
+from apps.team.models import TeamModel
+from apps.task.models import TaskListModel
+
+from .. import models
+from . import rollups
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SCHEDULED_KEY = 'logbook_flush_scheduled'  # redis key
+FLUSH_LOCK_KEY = 'logbook_flush_lock'  # redis key
+
+
+def emit(event, target_id, target_repr, actor_id=None, team_id=None, board_id=None, task_list_id=None,
+         extra_data=None):
+    """
+        record a log event, team/board may be left out when task_list_id is given (resolved on write)
+    """
+    data = {
+        'event': event,
+        'actor_id': actor_id,
+        'team_id': team_id,
+        'board_id': board_id,
+        'task_list_id': task_list_id,
+        'target_id': target_id,
+        'target_repr': target_repr,
+        'extra_data': extra_data,
+    }
+    if not settings.LOGBOOK_CONFIG['ASYNC']:
+        write_events([data])
+        return
+
+    data['created_at'] = timezone.now()
+    transaction.on_commit(lambda: publish([data]))
+
+
+def publish(events):
+    conf = settings.LOGBOOK_CONFIG
+    try:
+        with redis_utils.pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.xadd(conf['STREAM'], {'data': redis_utils.pack_data(event)},
+                          maxlen=conf['STREAM_MAXLEN'], approximate=True)
+            pipe.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=conf['FLUSH_DELAY'] * 10)
+            *_, scheduled = pipe.execute()
+    except RedisError:
+        logger.warning('Logbook stream unavailable, writing %s events inline', len(events))
+        write_events(events)
+        return
+
+    if scheduled:
+        schedule_flush(countdown=conf['FLUSH_DELAY'])
+
+
+def flush():
+    """
+        drain the stream into LogEntryModel, returns the number of events handled
+    """
+    conf = settings.LOGBOOK_CONFIG
+    token = uuid.uuid4().hex
+    if redis_utils.get_and_set_if_absent(FLUSH_LOCK_KEY, token, conf['FLUSH_LOCK_TIMEOUT']) is not None:
+        # another worker is flushing, one reader keeps the stream order
+        return 0
+
+    # no batch starts after half the lock ttl, so the lock never expires while this worker still writes
+    deadline = time.monotonic() + conf['FLUSH_LOCK_TIMEOUT'] / 2
+    flushed = 0
+    try:
+        # events added from now on schedule the next flush
+        redis_utils.remove_key(FLUSH_SCHEDULED_KEY)
+        while True:
+            if time.monotonic() > deadline:
+                schedule_flush()
+                break
+            entries = redis_utils.stream_range(conf['STREAM'], count=conf['FLUSH_BATCH_SIZE'])
+            if not entries:
+                break
+            write_batch([event for _, event in entries])
+            redis_utils.stream_delete(conf['STREAM'], [entry_id for entry_id, _ in entries])
+            flushed += len(entries)
+    finally:
+        # the lock of this worker only
+        redis_utils.delete_if_equal(FLUSH_LOCK_KEY, token)
+    return flushed
+
+
+def schedule_flush(countdown=None):
+    from ..tasks import flush_log_events
+    try:
+        flush_log_events.apply_async(countdown=countdown)
+    except Exception:
+        # the periodic flush picks the events up
+        logger.exception('Could not schedule logbook flush')
+
+
+def write_batch(events):
+    """
+        write_events, an event the database rejects is logged and dropped instead of stalling the stream
+    """
+    try:
+        write_events(events)
+    except IntegrityError:
+        for event in events:
+            try:
+                write_events([event])
+            except IntegrityError:
+                logger.exception('Dropping logbook event %s of %s', event['event'], event['target_id'])
+
+
+def _to_uuid(value):
+    return uuid.UUID(str(value)) if value else None
+
+
+def get_existing(model, ids):
+    return set(model.objects.filter(pk__in=ids).values_list('pk', flat=True)) if ids else set()
+
+
+@transaction.atomic
+def write_events(events):
+    """
+        store events in the given order, team/board of task events are resolved with one query.
+        rows deleted since an event was emitted are handled like their on_delete: the event of a gone
+        team or board is dropped, a gone actor is left empty
+    """
+    task_list_ids = {_to_uuid(e['task_list_id']) for e in events if e.get('task_list_id') and not e.get('board_id')}
+    task_lists = {
+        pk: (board_id, team_id)
+        for pk, board_id, team_id in TaskListModel.objects
+        .filter(pk__in=task_list_ids)
+        .values_list('pk', 'board_id', 'board__team_id')
+    } if task_list_ids else {}
+
+    rows = []
+    for event in events:
+        board_id, team_id = _to_uuid(event.get('board_id')), _to_uuid(event.get('team_id'))
+        resolved = False
+        if event.get('task_list_id') and not board_id:
+            board_id, team_id = task_lists.get(_to_uuid(event['task_list_id']), (None, None))
+            if not board_id or not team_id:
+                # task list without a board, nothing to log (task list may also be gone by now)
+                continue
+            resolved = True
+        rows.append((event, board_id, team_id, _to_uuid(event.get('actor_id')), resolved))
+
+    # boards and teams of resolved task lists were just read, the others are checked with one query each
+    boards = get_existing(BoardModel, {board_id for _, board_id, _, _, resolved in rows if board_id and not resolved})
+    teams = get_existing(TeamModel, {team_id for _, _, team_id, _, resolved in rows if team_id and not resolved})
+    actors = get_existing(get_user_model(), {actor_id for _, _, _, actor_id, _ in rows if actor_id})
+
+    entries = []
+    created_at = []
+    for event, board_id, team_id, actor_id, resolved in rows:
+        if not resolved and ((board_id and board_id not in boards) or (team_id and team_id not in teams)):
+            continue
+        entries.append(models.LogEntryModel(
+            event=event['event'],
+            actor_id=actor_id if actor_id in actors else None,
+            team_id=team_id,
+            board_id=board_id,
+            target_id=_to_uuid(event['target_id']),
+            target_repr=event['target_repr'],
+            extra_data=event.get('extra_data'),
+        ))
+        created_at.append(event.get('created_at'))
+
+    objs = models.LogEntryModel.objects.bulk_create(entries)
+
+    # auto_now_add stamped the write time, keep the time the event happened
+    delayed = []
+    for obj, value in zip(objs, created_at):
+        if value:
+            obj.created_at = datetime.datetime.fromisoformat(value) if isinstance(value, str) else value
+            delayed.append(obj)
+    if delayed:
+        models.LogEntryModel.objects.bulk_update(delayed, ['created_at'])
+
+    rollups.add_entries(objs)
+    return objs
@@ -0,0 +1,102 @@
+"""
+    incremental counters behind LogbookStatsDashboardView, see models.LogActivityRollupModel
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Subquery, Sum
+from django.db.models.functions import TruncDate
+
+from .. import models
+
+
+def get_rollup_key(entry):
+    return entry.team_id, entry.created_at.date(), entry.actor_id, entry.board_id
+
+
+def increment(key, count):
+    """
+        add count to the row of key, returns whether there is one. only one row is updated: keys with an
+        empty team, actor or board are not covered by the unique constraint (nulls are distinct) and may have two
+    """
+    team_id, date, actor_id, board_id = key
+    rows = models.LogActivityRollupModel.objects.filter(team_id=team_id, date=date, actor_id=actor_id,
+                                                        board_id=board_id)
+    return bool(rows.filter(pk=Subquery(rows.values('pk')[:1])).update(count=F('count') + count))
+
+
+def insert(key, count):
+    team_id, date, actor_id, board_id = key
+    try:
+        with transaction.atomic():
+            models.LogActivityRollupModel.objects.create(team_id=team_id, date=date, actor_id=actor_id,
+                                                         board_id=board_id, count=count)
+    except IntegrityError:
+        # inserted by another writer since the update
+        increment(key, count)
+
+
+def add_entries(entries):
+    """
+        count new log entries into the rollups, one update (or insert) per distinct key of the batch.
+        runs in the caller's transaction, a key inserted meanwhile by another writer fails the
+        unique constraint and is updated instead
+    """
+    keys = Counter(get_rollup_key(entry) for entry in entries)
+    missing = {key: count for key, count in keys.items() if not increment(key, count)}
+    if not missing:
+        return
+    try:
+        with transaction.atomic():
+            models.LogActivityRollupModel.objects.bulk_create([
+                models.LogActivityRollupModel(team_id=team_id, date=date, actor_id=actor_id, board_id=board_id,
+                                              count=count)
+                for (team_id, date, actor_id, board_id), count in missing.items()
+            ])
+    except IntegrityError:
+        for key, count in missing.items():
+            if not increment(key, count):
+                insert(key, count)
+
+
+@transaction.atomic
+def rebuild(team_id=None, batch_size=1000):
+    """
+        recompute rollups from LogEntryModel, returns the number of rollup rows written.
+        log entries written while this runs may be counted twice, run it when the flusher is idle.
+    """
+    rollups = models.LogActivityRollupModel.objects.all()
+    logs = models.LogEntryModel.objects.all()
+    if team_id:
+        rollups = rollups.filter(team_id=team_id)
+        logs = logs.filter(team_id=team_id)
+    rollups.delete()
+
+    rows = logs.annotate(date=TruncDate('created_at')) \
+        .values('team_id', 'date', 'actor_id', 'board_id') \
+        .annotate(count=Count('id')) \
+        .order_by()
+    objs = (models.LogActivityRollupModel(**row) for row in rows.iterator(chunk_size=batch_size))
+    written = 0
+    while True:
+        batch = [obj for _, obj in zip(range(batch_size), objs)]
+        if not batch:
+            break
+        models.LogActivityRollupModel.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+def dashboard(team_id=None, days=10, top=5):
+    rollups = models.LogActivityRollupModel.objects.all()
+    if team_id:
+        rollups = rollups.filter(team_id=team_id)
+
+    activity_trend = rollups.values('date').annotate(count=Sum('count')).order_by('-date')[:days]
+    top_actors = rollups.values('actor__id', 'actor__email') \
+        .annotate(activity_count=Sum('count')) \
+        .order_by('-activity_count')[:top]
+    popular_boards = rollups.values('board__id', 'board__title', 'team__id') \
+        .annotate(activity_count=Sum('count')) \
+        .order_by('-activity_count')[:top]
+    return activity_trend, top_actors, popular_boards
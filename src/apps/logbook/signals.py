@@ -3,25 +3,30 @@ from django.db.models.signals import post_save
 
 from apps.task.models import TaskModel
 
+from .services.pipeline import emit
+from .services import rollups
 from . import enums, models
 
 
 @receiver(post_save, sender=TaskModel)
 def log_task_save(sender, instance, created, **kwargs):
-    board = getattr(getattr(instance, "task_list", None), "board", None)
-    team = getattr(board, "team", None)
-
-    if not team or not board:
+    """ no queries here, board and team are resolved when the event is written """
+    if not instance.task_list_id:
         return
 
     event = enums.LogEventEnum.TASK_CREATE if created else enums.LogEventEnum.TASK_UPDATE
 
-    models.LogEntryModel.objects.create(
+    emit(
         event=event,
-        actor=None,
-        team=team,
-        board=board,
         target_id=instance.id,
         target_repr=instance.title,
-        extra_data={"list_id": str(instance.task_list.id)} if instance.task_list else None,
+        task_list_id=instance.task_list_id,
+        extra_data={"list_id": str(instance.task_list_id)},
     )
+
+
+@receiver(post_save, sender=models.LogEntryModel)
+def count_log_entry(sender, instance, created, **kwargs):
+    """ single creates, the pipeline counts its bulk inserts itself """
+    if created:
+        rollups.add_entries([instance])
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .services import pipeline
+
+
+@shared_task
+def flush_log_events():
+    return pipeline.flush()
@@ -1,6 +1,13 @@
 import pytest
+from datetime import date
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
 from apps.logbook.tests.factories import LogEntryFactory
 from apps.logbook.enums import LogEventEnum
+from apps.logbook.services import partitions
 
 
 @pytest.mark.django_db
@@ -16,3 +23,21 @@ def test_log_entry_factory_creates_valid_entry():
     assert log_entry.target_repr
     assert isinstance(log_entry.extra_data, dict)
 
+
+
+def test_partition_months():
+    assert partitions.add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert partitions.add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert list(partitions.get_month_range(date(2025, 12, 15), date(2026, 2, 3))) == [
+        date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1),
+    ]
+    assert partitions.get_partition_name(date(2026, 2, 1)) == "logbook_logentrymodel_202602"
+
+
+@pytest.mark.django_db
+def test_partition_command_needs_postgresql():
+    if connection.vendor == "postgresql":
+        pytest.skip("only checks the error on other databases")
+
+    with pytest.raises(CommandError):
+        call_command("log_partitions")
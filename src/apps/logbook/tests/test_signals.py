@@ -1,19 +1,102 @@
 # tests/logbook/test_signals.py
+import uuid
+
 import pytest
+from unittest import mock
 
+from apps.core import redis_utils
+from apps.logbook.services import pipeline
 from apps.task.tests.factories import TaskFactory, TaskListFactory
 from apps.board.tests.factories import BoardFactory
 from apps.team.tests.factories import TeamFactory
-from apps.logbook.models import LogEntryModel
+from apps.account.tests.factories import UserFactory
+from apps.logbook.models import LogEntryModel, LogActivityRollupModel
 from apps.logbook.enums import LogEventEnum
 
 
+class FakeLogStream:
+    """
+        in-memory stand-in for the redis calls of the logbook pipeline
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.keys = {}
+        self.next_id = 0
+
+    # pipeline(transaction=False) context manager
+    def __call__(self, transaction=True):
+        self.commands = []
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.commands.append(("xadd", fields))
+
+    def set(self, key, value, nx=False, ex=None):
+        self.commands.append(("set", key))
+
+    def execute(self):
+        results = []
+        for command, arg in self.commands:
+            if command == "xadd":
+                self.next_id += 1
+                self.entries.append((f"{self.next_id}-0", arg["data"]))
+                results.append(self.entries[-1][0])
+            else:
+                results.append(arg not in self.keys)
+                self.keys.setdefault(arg, 1)
+        return results
+
+    def get_and_set_if_absent(self, key, value, seconds):
+        if key in self.keys:
+            return self.keys[key]
+        self.keys[key] = value
+
+    def delete_if_equal(self, key, value):
+        if self.keys.get(key) != value:
+            return False
+        del self.keys[key]
+        return True
+
+    def remove_key(self, *keys):
+        for key in keys:
+            self.keys.pop(key, None)
+
+    def stream_range(self, key, max_id="+", count=None):
+        return [(entry_id, redis_utils.unpack_data(data)) for entry_id, data in self.entries[:count]]
+
+    def stream_delete(self, key, entry_ids):
+        self.entries = [entry for entry in self.entries if entry[0] not in entry_ids]
+
+
+@pytest.fixture
+def log_stream():
+    stream = FakeLogStream()
+    with mock.patch.object(pipeline.redis_utils, "pipeline", stream), \
+            mock.patch.object(pipeline.redis_utils, "get_and_set_if_absent", stream.get_and_set_if_absent), \
+            mock.patch.object(pipeline.redis_utils, "delete_if_equal", stream.delete_if_equal), \
+            mock.patch.object(pipeline.redis_utils, "remove_key", stream.remove_key), \
+            mock.patch.object(pipeline.redis_utils, "stream_range", stream.stream_range), \
+            mock.patch.object(pipeline.redis_utils, "stream_delete", stream.stream_delete), \
+            mock.patch("apps.logbook.tasks.flush_log_events.apply_async") as schedule:
+        stream.schedule = schedule
+        yield stream
+
+
 @pytest.mark.django_db
-def test_task_log_created_without_actor():
+def test_task_log_created_without_actor(log_stream, django_capture_on_commit_callbacks):
     team = TeamFactory()
     board = BoardFactory(team=team)
     task_list = TaskListFactory(board=board)
-    task = TaskFactory(task_list=task_list)
+    with django_capture_on_commit_callbacks(execute=True):
+        task = TaskFactory(task_list=task_list)
+    pipeline.flush()
 
     log = LogEntryModel.objects.filter(
         event=LogEventEnum.TASK_CREATE,
@@ -25,3 +108,94 @@ def test_task_log_created_without_actor():
     assert log.team == team
     assert log.board == board
     assert log.target_repr == task.title
+
+
+@pytest.mark.django_db
+class TestLogPipeline:
+
+    def test_task_save_does_not_write_log(self, log_stream, django_assert_num_queries):
+        task = TaskFactory()
+
+        with django_assert_num_queries(1):
+            task.title = "renamed"
+            task.save()
+
+        assert not LogEntryModel.objects.filter(event=LogEventEnum.TASK_UPDATE, target_id=task.id).exists()
+
+    def test_flush_keeps_order_and_event_time(self, log_stream, django_capture_on_commit_callbacks,
+                                              django_assert_max_num_queries):
+        task_list = TaskListFactory()
+        with django_capture_on_commit_callbacks(execute=True):
+            task = TaskFactory(task_list=task_list)
+            for i in range(5):
+                task.title = f"title {i}"
+                task.save()
+
+        assert len(log_stream.entries) == 6
+        log_stream.schedule.assert_called_once()
+
+        # savepoint + resolve task lists + insert + created_at update + rollup update
+        # + rollup insert in its own savepoint
+        with django_assert_max_num_queries(9):
+            assert pipeline.flush() == 6
+
+        assert log_stream.entries == []
+        logs = list(LogEntryModel.objects.filter(target_id=task.id).order_by("created_at"))
+        assert [log.target_repr for log in logs][1:] == [f"title {i}" for i in range(5)]
+        assert logs[0].event == LogEventEnum.TASK_CREATE
+        assert all(log.team_id == task_list.board.team_id for log in logs)
+        rollup = LogActivityRollupModel.objects.get(team_id=task_list.board.team_id)
+        assert rollup.count == 6
+
+    def test_entries_stay_in_stream_when_write_fails(self, log_stream, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            TaskFactory()
+
+        with mock.patch.object(pipeline, "write_events", side_effect=RuntimeError), pytest.raises(RuntimeError):
+            pipeline.flush()
+
+        assert len(log_stream.entries) == 1
+        assert pipeline.FLUSH_LOCK_KEY not in log_stream.keys
+        assert pipeline.flush() == 1
+
+    def test_expired_lock_of_another_worker_is_kept(self, log_stream, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            TaskFactory()
+
+        def slow_write(events):
+            # the lock expired meanwhile and another worker took it
+            log_stream.keys[pipeline.FLUSH_LOCK_KEY] = "other"
+
+        with mock.patch.object(pipeline, "write_events", side_effect=slow_write):
+            pipeline.flush()
+
+        assert log_stream.keys[pipeline.FLUSH_LOCK_KEY] == "other"
+
+    def test_events_of_deleted_rows(self, log_stream, django_capture_on_commit_callbacks):
+        board = BoardFactory()
+        actor = UserFactory()
+        with django_capture_on_commit_callbacks(execute=True):
+            pipeline.emit(LogEventEnum.TASK_BULK, board.id, board.title, actor_id=actor.id,
+                          team_id=board.team_id, board_id=board.id)
+            pipeline.emit(LogEventEnum.TASK_BULK, board.id, board.title, actor_id=actor.id,
+                          team_id=board.team_id, board_id=uuid.uuid4())
+        actor.delete()
+
+        assert pipeline.flush() == 2
+
+        assert log_stream.entries == []
+        log = LogEntryModel.objects.get(event=LogEventEnum.TASK_BULK)
+        assert (log.board_id, log.actor_id) == (board.id, None)
+
+    def test_redis_down_writes_inline(self, django_capture_on_commit_callbacks):
+        with mock.patch.object(pipeline.redis_utils, "pipeline", side_effect=redis_utils.redis.ConnectionError):
+            with django_capture_on_commit_callbacks(execute=True):
+                task = TaskFactory()
+
+        assert LogEntryModel.objects.filter(event=LogEventEnum.TASK_CREATE, target_id=task.id).exists()
+
+    def test_sync_mode(self, settings):
+        settings.LOGBOOK_CONFIG = {**settings.LOGBOOK_CONFIG, "ASYNC": False}
+        task = TaskFactory()
+
+        assert LogEntryModel.objects.filter(event=LogEventEnum.TASK_CREATE, target_id=task.id).exists()
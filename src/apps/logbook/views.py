@@ -1,6 +1,3 @@
-from django.db.models import Count
-from django.db.models.functions import TruncDate
-
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.response import Response
@@ -12,6 +9,7 @@ from apps.core import text
 from apps.core.services.access_control import is_team_member
 
 from . import models, serializers
+from .services import rollups
 
 
 class LogEntryListView(ms.SwaggerViewMixin, mixins.ListViewMixin, APIView):
@@ -24,6 +22,7 @@ class LogEntryListView(ms.SwaggerViewMixin, mixins.ListViewMixin, APIView):
     serializer = serializers.LogEntrySerializer
     serializer_response = serializers.LogEntryListResponseSerializer
     page_size = 20
+    cursor_pagination = mixins.CURSOR_OPT_IN
 
     def get_queryset(self):
 
@@ -67,30 +66,11 @@ class LogbookStatsDashboardView(ms.SwaggerViewMixin, APIView):
 
     def get(self, request):
         team_id = request.query_params.get("team")
-        logs = models.LogEntryModel.objects.all()
 
         if team_id:
-            logs = logs.filter(team_id=team_id)
             is_team_member(request.user, team_id)
 
-        activity_trend = (
-            logs.annotate(date=TruncDate("created_at"))
-            .values("date")
-            .annotate(count=Count("id"))
-            .order_by("-date")[:10]
-        )
-
-        top_actors = (
-            logs.values("actor__id", "actor__email")
-            .annotate(activity_count=Count("id"))
-            .order_by("-activity_count")[:5]
-        )
-
-        popular_boards = (
-            logs.values("board__id", "board__title", "team__id")
-            .annotate(activity_count=Count("id"))
-            .order_by("-activity_count")[:5]
-        )
+        activity_trend, top_actors, popular_boards = rollups.dashboard(team_id)
 
         data = {
             "activity_trend": [
@@ -6,11 +6,11 @@ from apps.notification.models import Notification
 class NotificationAdmin(admin.ModelAdmin):
     list_display = (
         'id', 'type', 'status', 'title', 'to_user', 'email',
-        'phone_number', 'is_visited', 'retry_count', 'sent_at', 'created_at'
+        'phone_number', 'is_visited', 'count', 'retry_count', 'sent_at', 'created_at'
     )
     list_filter = ('type', 'status', 'is_visited', 'created_at')
     search_fields = ('title', 'description', 'email', 'phone_number')
-    readonly_fields = ('retry_count', 'sent_at', 'created_at')
+    readonly_fields = ('digest_key', 'count', 'retry_count', 'sent_at', 'created_at')
     ordering = ('-created_at',)
 
     fieldsets = (
@@ -23,6 +23,6 @@ class NotificationAdmin(admin.ModelAdmin):
             'fields': ('to_user', 'email', 'phone_number')
         }),
         ('Status & Meta', {
-            'fields': ('is_visited', 'retry_count', 'sent_at', 'created_at')
+            'fields': ('is_visited', 'digest_key', 'count', 'retry_count', 'sent_at', 'created_at')
         }),
     )
\ No newline at end of file
@@ -0,0 +1,42 @@
+import json
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from .services.push import get_user_group, get_unread_count
+
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+        push only: new notifications of the connected user and its unread count (services.push)
+    """
+
+    async def connect(self):
+        self.user = self.scope['user']
+        self.group_name = None
+
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+
+        self.group_name = get_user_group(self.user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.send(text_data=json.dumps({
+            'unread': await database_sync_to_async(get_unread_count)(self.user.id),
+        }))
+
+    async def disconnect(self, close_code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def notification_message(self, event):
+        await self.send(text_data=json.dumps({
+            'notification': event['notification'],
+            'unread': event['unread'],
+        }))
+
+    async def notification_unread(self, event):
+        await self.send(text_data=json.dumps({
+            'unread': event['unread'],
+        }))
@@ -1,4 +1,4 @@
-from .tasks import send_email
+from .services.senders import build_email_message
 
 
 class EmailTeamNotificationHandler:
@@ -7,56 +7,75 @@ class EmailTeamNotificationHandler:
     def team_creation_handler(cls, email_notification, recipient_email):
         subject = "You're Created Team"
         context = {
-            "user_name": email_notification.to_user.get_full_name(),
+            "user_name": email_notification.to_user.full_name(),
             "team_name": email_notification.kwargs.get('team_name'),
         }
-        send_email(subject, [recipient_email], context)
+        return build_email_message(subject, [recipient_email], context)
 
     @classmethod
     def team_request_join_handler(cls, email_notification, recipient_email):
         subject = "You Have a Request to Join a Team"
         context = {
-            "user_name": email_notification.to_user.get_full_name(),
+            "user_name": email_notification.to_user.full_name(),
             "team_name": email_notification.kwargs.get('team_name'),
         }
-        send_email(subject, [recipient_email], context)
+        return build_email_message(subject, [recipient_email], context)
 
     @classmethod
     def team_result_join_handler(cls, email_notification, recipient_email):
         subject = "Result Join a Team"
         context = {
-            "user_name": email_notification.to_user.get_full_name(),
+            "user_name": email_notification.to_user.full_name(),
             "team_name": email_notification.kwargs.get('team_name'),
         }
-        send_email(subject, [recipient_email], context)
+        return build_email_message(subject, [recipient_email], context)
 
     @classmethod
     def team_invitation_handler(cls, email_notification, recipient_email):
         subject = "You're Invited to Join a Team"
         context = {
-            "user_name": email_notification.to_user.get_full_name(),
+            "user_name": email_notification.to_user.full_name(),
             "team_name": email_notification.kwargs.get('team_name'),
             "invitation_link": email_notification.kwargs.get('invitation_link'),
         }
-        send_email(subject, [recipient_email], context)
+        return build_email_message(subject, [recipient_email], context)
 
     @classmethod
     def team_result_invitation_handler(cls, email_notification, recipient_email):
         subject = "You're Invited to Join a Team"
         context = {
-            "user_name": email_notification.to_user.get_full_name(),
+            "user_name": email_notification.to_user.full_name(),
             "team_name": email_notification.kwargs.get('team_name'),
         }
-        send_email(subject, [recipient_email], context)
+        return build_email_message(subject, [recipient_email], context)
 
     @classmethod
     def team_remove_handler(cls, email_notification, recipient_email):
         subject = "You're Invited to Join a Team"
         context = {
-            "user_name": email_notification.to_user.get_full_name(),
+            "user_name": email_notification.to_user.full_name(),
             "team_name": email_notification.kwargs.get('team_name'),
         }
-        send_email(subject, [recipient_email], context)
+        return build_email_message(subject, [recipient_email], context)
+
+    @classmethod
+    def team_lock_handler(cls, email_notification, recipient_email):
+        subject = "Your Team Was Locked"
+        context = {
+            "user_name": email_notification.to_user.full_name(),
+            "team_name": email_notification.kwargs.get('team_name'),
+        }
+        return build_email_message(subject, [recipient_email], context)
+
+    @classmethod
+    def board_archive_handler(cls, email_notification, recipient_email):
+        subject = "A Board of Your Team Was Archived"
+        context = {
+            "user_name": email_notification.to_user.full_name(),
+            "board_title": email_notification.kwargs.get('board_title'),
+            "team_name": email_notification.kwargs.get('team_name'),
+        }
+        return build_email_message(subject, [recipient_email], context)
 
 
 class EmailTaskNotificationHandler:
@@ -65,34 +84,45 @@ class EmailTaskNotificationHandler:
     def add_task_handler(cls, email_notification, recipient_email):
         subject = "You're Invited to Join a Team"
         context = {
-            "user_name": email_notification.to_user.get_full_name(),
+            "user_name": email_notification.to_user.full_name(),
             "task_title": email_notification.kwargs.get('task_title'),
             "board_title": email_notification.kwargs.get('board_title'),
             "team_name": email_notification.kwargs.get('team_name'),
         }
-        send_email(subject, [recipient_email], context)
+        return build_email_message(subject, [recipient_email], context)
 
     @classmethod
     def remove_task_handler(cls, email_notification, recipient_email):
         subject = "You're Invited to Join a Team"
         context = {
             "task_title": email_notification.kwargs.get('task_title'),
-            "user_name": email_notification.to_user.get_full_name(),
+            "user_name": email_notification.to_user.full_name(),
             "board_title": email_notification.kwargs.get('board_title'),
             "team_name": email_notification.kwargs.get('team_name'),
         }
-        send_email(subject, [recipient_email], context)
+        return build_email_message(subject, [recipient_email], context)
 
     @classmethod
     def update_task_handler(cls, email_notification, recipient_email):
         subject = "You're Invited to Join a Team"
         context = {
             "task_title": email_notification.kwargs.get('task_title'),
-            "user_name": email_notification.to_user.get_full_name(),
+            "user_name": email_notification.to_user.full_name(),
+            "board_title": email_notification.kwargs.get('board_title'),
+            "team_name": email_notification.kwargs.get('team_name'),
+        }
+        return build_email_message(subject, [recipient_email], context)
+
+    @classmethod
+    def bulk_task_handler(cls, email_notification, recipient_email):
+        subject = "Tasks of Your Board Were Changed"
+        context = {
+            "user_name": email_notification.to_user.full_name(),
+            "task_count": email_notification.kwargs.get('task_count'),
             "board_title": email_notification.kwargs.get('board_title'),
             "team_name": email_notification.kwargs.get('team_name'),
         }
-        send_email(subject, [recipient_email], context)
+        return build_email_message(subject, [recipient_email], context)
 
 
 EMAIL_NOTIFICATION_HANDLERS = {
@@ -104,10 +134,13 @@ EMAIL_NOTIFICATION_HANDLERS = {
     'TEAM_INVITATION': EmailTeamNotificationHandler.team_invitation_handler,
     'TEAM_RESULT_INVITATION': EmailTeamNotificationHandler.team_result_invitation_handler,
     'TEAM_REMOVE': EmailTeamNotificationHandler.team_remove_handler,
+    'TEAM_LOCKED': EmailTeamNotificationHandler.team_lock_handler,
+    'BOARD_ARCHIVED': EmailTeamNotificationHandler.board_archive_handler,
 
     # task
     'ADDED_TASK': EmailTaskNotificationHandler.add_task_handler,
     'REMOVED_TASK': EmailTaskNotificationHandler.remove_task_handler,
     'UPDATED_TASK': EmailTaskNotificationHandler.update_task_handler,
+    'BULK_TASKS': EmailTaskNotificationHandler.bulk_task_handler,
 
 }
@@ -10,5 +10,8 @@ class NotificationType(TextChoices):
 
 class NotificationStatus(TextChoices):
     PENDING = 'PENDING', _('Pending')
+    QUEUED = 'QUEUED', _('Queued')
+    DIGEST = 'DIGEST', _('Waiting for digest')
+    SENDING = 'SENDING', _('Sending')
     SENT = 'SENT', _('Sent')
     FAILED = 'FAILED', _('Failed')
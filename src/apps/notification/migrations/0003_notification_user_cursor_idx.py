@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0002_rename_user_notification_to_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['to_user', '-created_at', '-id'], name='notification_user_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0004_notification_email_outbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='count',
+            field=models.PositiveIntegerField(default=1, verbose_name='Count'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='digest_key',
+            field=models.CharField(blank=True, max_length=150, null=True, verbose_name='Digest Key'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('QUEUED', 'Queued'), ('DIGEST', 'Waiting for digest'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=20, verbose_name='Status'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('status', 'DIGEST')), fields=['created_at'], name='notification_digest_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'DIGEST')), fields=('to_user', 'digest_key'), name='notification_open_digest_uniq'),
+        ),
+    ]
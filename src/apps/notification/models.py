@@ -21,10 +21,28 @@ class Notification(BaseModel):
 
     is_visited = models.BooleanField(_('Is Visited'), default=False)
     retry_count = models.PositiveIntegerField(_('Retry Count'), default=0)
+    # digest mode (utils.create_notify_digest): repeats of the same event are merged into one row
+    digest_key = models.CharField(_('Digest Key'), max_length=150, blank=True, null=True)
+    count = models.PositiveIntegerField(_('Count'), default=1)
     sent_at = models.DateTimeField(_('Sent At'), blank=True, null=True)
 
     class Meta:
         ordering = ('-created_at',)
+        indexes = [
+            # NotificationListView cursor pages
+            models.Index(fields=['to_user', '-created_at', '-id'], name='notification_user_cursor_idx'),
+            # email outbox of tasks.send_queued_emails
+            models.Index(fields=['created_at'], condition=models.Q(status=NotificationStatus.QUEUED),
+                         name='notification_queued_idx'),
+            # tasks.send_notification_digests
+            models.Index(fields=['created_at'], condition=models.Q(status=NotificationStatus.DIGEST),
+                         name='notification_digest_idx'),
+        ]
+        constraints = [
+            # one open digest row per user and event
+            models.UniqueConstraint(fields=['to_user', 'digest_key'], condition=models.Q(status=NotificationStatus.DIGEST),
+                                    name='notification_open_digest_uniq'),
+        ]
         verbose_name = _('Notification')
         verbose_name_plural = _('Notifications')
 
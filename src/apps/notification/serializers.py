@@ -18,6 +18,7 @@ class NotificationSerializer(serializers.ModelSerializer):
             'status',
             'title',
             'description',
+            'count',
             'is_visited',
             'sent_at',
             'created_at',
@@ -26,3 +27,17 @@ class NotificationSerializer(serializers.ModelSerializer):
 
 class NotificationResponseSerializer(serializers.Serializer):
     data = NotificationSerializer(many=True)
+
+
+class UnreadCountSerializer(serializers.Serializer):
+    unread = serializers.IntegerField(read_only=True)
+
+
+class MarkVisitedSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False,
+                                help_text='notifications to mark, all of them when omitted')
+
+
+class MarkVisitedResponseSerializer(serializers.Serializer):
+    marked_count = serializers.IntegerField(read_only=True)
+    unread = serializers.IntegerField(read_only=True)
@@ -0,0 +1,61 @@
+"""
+    handler lookup and delivery of one notification, shared by the dispatchers (checks on the request)
+    and the celery tasks (the actual send)
+"""
+from apps.notification.email import EMAIL_NOTIFICATION_HANDLERS
+from apps.notification.sms import SMS_NOTIFICATION_HANDLERS
+from apps.notification.enums import NotificationType
+
+
+def get_email_handler(notification):
+    notif_type = notification.kwargs.get('type')
+
+    if not notif_type:
+        raise ValueError("Missing 'type' in notification kwargs for email dispatch.")
+
+    handler = EMAIL_NOTIFICATION_HANDLERS.get(notif_type)
+    if not handler:
+        raise ValueError(f"No handler found for email notification type '{notif_type}'.")
+    return handler
+
+
+def get_sms_handler(notification):
+    notif_type = notification.kwargs.get('type')
+
+    if not notif_type:
+        raise ValueError("Missing 'type' in notification kwargs for SMS dispatch.")
+
+    handler = SMS_NOTIFICATION_HANDLERS.get(notif_type)
+    if not handler:
+        raise ValueError(f"No SMS handler found for notification type '{notif_type}'.")
+    return handler
+
+
+def get_phone_number(notification):
+    phone_number = notification.phone_number or getattr(notification.to_user, 'phone_number', None)
+    if not phone_number:
+        raise ValueError("Notification does not have a phone number to send SMS.")
+    return phone_number
+
+
+def get_email(notification):
+    email = notification.email or getattr(notification.to_user, 'email', None)
+    if not email:
+        raise ValueError("Notification does not have an email address.")
+    return email
+
+
+def build_email(notification):
+    """
+        the email handlers build the message, it is sent by tasks.send_queued_emails with the rest of its batch
+    """
+    return get_email_handler(notification)(notification, get_email(notification))
+
+
+def deliver(notification):
+    if notification.type == NotificationType.EMAIL:
+        build_email(notification).send(fail_silently=False)
+    elif notification.type == NotificationType.SMS:
+        get_sms_handler(notification)(notification, get_phone_number(notification))
+    else:
+        raise ValueError(f"{notification.type} notifications are not delivered by a worker.")
@@ -1,17 +1,19 @@
-from apps.notification.email import EMAIL_NOTIFICATION_HANDLERS
+from django.db import transaction
+
+from apps.notification.enums import NotificationStatus
+from apps.notification.models import Notification
+from apps.notification.tasks import send_queued_emails
+from .delivery import get_email_handler, get_email
 
 
 def dispatch_email_notification(notification):
     """
-    Finds and executes the corresponding email handler based on notification.kwargs['type'].
+    Checks the notification has an email handler and queues it, the email is sent by a celery
+    worker (queue 'email') with the other queued emails once the transaction commits.
     """
-    notif_type = notification.kwargs.get('type')
-
-    if not notif_type:
-        raise ValueError("Missing 'type' in notification kwargs for email dispatch.")
-
-    handler = EMAIL_NOTIFICATION_HANDLERS.get(notif_type)
-    if not handler:
-        raise ValueError(f"No handler found for email notification type '{notif_type}'.")
+    get_email_handler(notification)
+    get_email(notification)
 
-    handler(notification, notification.email)
+    Notification.objects.filter(pk=notification.pk).update(status=NotificationStatus.QUEUED)
+    notification.status = NotificationStatus.QUEUED
+    transaction.on_commit(send_queued_emails.delay)
@@ -0,0 +1,112 @@
+"""
+    in-app push: every new notification goes to the websocket group of its user (consumers.NotificationConsumer)
+    with the user's unread count, kept in a redis counter so neither needs a query.
+    the counter is rebuilt from the database when missing and expires after UNREAD_COUNT_TIMEOUT,
+    which also bounds any drift from a rebuild racing with new notifications.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from apps.core import redis_utils
+from apps.notification.models import Notification
+
+logger = logging.getLogger(__name__)
+
+USER_GROUP = 'user_{}'
+UNREAD_KEY = 'notification_unread_{}'
+
+
+def get_user_group(user_id):
+    return USER_GROUP.format(user_id)
+
+
+def notification_event(notification):
+    return {
+        'id': str(notification.id),
+        'type': notification.type,
+        'title': str(notification.get_title()),
+        'description': notification.description,
+        'count': notification.count,
+        'link': notification.get_link(),
+        'created_at': notification.created_at.strftime('%Y-%m-%d %H:%M'),
+    }
+
+
+def get_unread_count(user_id):
+    key = UNREAD_KEY.format(user_id)
+    try:
+        count = redis_utils.get_counter(key)
+    except RedisError as e:
+        logger.warning(f"Unread counter unavailable: {e}")
+        return Notification.objects.filter(to_user_id=user_id, is_visited=False).count()
+    if count is not None:
+        return count
+
+    count = Notification.objects.filter(to_user_id=user_id, is_visited=False).count()
+    try:
+        redis_utils.set_counter_if_absent(key, count, settings.NOTIFICATION_CONFIG['UNREAD_COUNT_TIMEOUT'])
+    except RedisError as e:
+        logger.warning(f"Unread counter unavailable: {e}")
+    return count
+
+
+def reset_unread_count(user_id):
+    try:
+        redis_utils.remove_key(UNREAD_KEY.format(user_id))
+    except RedisError as e:
+        logger.warning(f"Unread counter of user {user_id} was not reset: {e}")
+
+
+async def _group_send(messages):
+    channel_layer = get_channel_layer()
+    for group, message in messages:
+        await channel_layer.group_send(group, message)
+
+
+def send_to_users(messages):
+    """
+        [(user_id, event)] to the users' sockets, a push failure never fails the caller
+    """
+    if not messages:
+        return
+    try:
+        async_to_sync(_group_send)([(get_user_group(user_id), message) for user_id, message in messages])
+    except Exception as e:
+        logger.warning(f"Notification push failed: {e}")
+
+
+def publish(notifications):
+    """
+        count new notifications as unread and push them, called once the transaction that created them commits
+    """
+    notifications = [n for n in notifications if n.to_user_id]
+    if not notifications:
+        return
+
+    amounts = {}
+    for notification in notifications:
+        key = UNREAD_KEY.format(notification.to_user_id)
+        amounts[key] = amounts.get(key, 0) + 1
+    try:
+        counts = redis_utils.incr_existing(amounts)
+    except RedisError as e:
+        logger.warning(f"Unread counters were not increased: {e}")
+        counts = {}
+
+    send_to_users([
+        (notification.to_user_id, {
+            'type': 'notification.message',
+            'notification': notification_event(notification),
+            # None when the counter has to be rebuilt, clients then ask the unread endpoint
+            'unread': counts.get(UNREAD_KEY.format(notification.to_user_id)),
+        })
+        for notification in notifications
+    ])
+
+
+def publish_unread(user_id):
+    send_to_users([(user_id, {'type': 'notification.unread', 'unread': get_unread_count(user_id)})])
@@ -0,0 +1,151 @@
+"""
+    the actual delivery calls (smtp, ippanel), used from celery workers only
+"""
+import functools
+import hashlib
+import logging
+import time
+
+from ippanel import Client
+from django.conf import settings
+from django.core.mail import EmailMessage
+from redis.exceptions import RedisError
+
+from apps.core import redis_utils
+from apps.core.utils import get_coded_phone_number
+
+logger = logging.getLogger(__name__)
+
+SMS_RATE_KEY = 'sms_rate_limit'
+SMS_SENT_KEY = 'sms_sent_{}'
+
+
+class SmsRateLimited(Exception):
+
+    def __init__(self, wait):
+        super().__init__(f'sms rate limit reached, retry in {wait:.2f}s')
+        self.wait = wait
+
+
+def build_email_message(subject, recipients, context):
+    body = "\n".join([f"{k}: {v}" for k, v in context.items()])
+    return EmailMessage(subject=subject, body=body, from_email=settings.DEFAULT_FROM_EMAIL, to=recipients)
+
+
+def build_digest_message(recipients, notifications):
+    """
+        one email for several notifications, repeats are counted instead of listed
+    """
+    lines = []
+    for notification in notifications:
+        title = notification.get_title()
+        if notification.count > 1:
+            title = f"{title} ({notification.count} times)"
+        lines.append(f"{title}\n{notification.description or ''}".strip())
+    subject = f"You have {len(notifications)} new updates" if len(notifications) > 1 else notifications[0].get_title()
+    return EmailMessage(subject=subject, body="\n\n".join(lines), from_email=settings.DEFAULT_FROM_EMAIL,
+                        to=recipients)
+
+
+def send_email_message(subject, recipients, context):
+    build_email_message(subject, recipients, context).send(fail_silently=False)
+    logger.info(f"Email sent to {recipients}")
+
+
+def send_email_batch(messages, connection):
+    """
+        send messages over one open connection, one at a time so a refused message does not stop the others.
+        returns the exceptions by message index
+    """
+    errors = {}
+    for i, message in enumerate(messages):
+        try:
+            connection.send_messages([message])
+        except Exception as e:
+            errors[i] = e
+    return errors
+
+
+@functools.lru_cache(maxsize=None)
+def get_sms_client(api_key):
+    """
+        one ippanel client per worker process (and api key), reused by every sms it sends
+    """
+    return Client(api_key)
+
+
+def wait_for_sms_token():
+    """
+        block until the rate limit shared by all workers allows one more sms.
+        raises SmsRateLimited when that takes longer than RATE_MAX_WAIT, the caller puts the sms back in the queue.
+        without redis the sms is sent unthrottled, the provider limit is then the only one.
+    """
+    conf = settings.SMS_CONFIG
+    deadline = time.monotonic() + conf['RATE_MAX_WAIT']
+    while True:
+        try:
+            wait = redis_utils.take_token(SMS_RATE_KEY, conf['RATE_LIMIT'], conf['RATE_BURST'])
+        except RedisError as e:
+            logger.warning(f"SMS rate limiter unavailable, sending without it: {e}")
+            return
+        if not wait:
+            return
+        if time.monotonic() + wait > deadline:
+            raise SmsRateLimited(wait)
+        time.sleep(wait)
+
+
+def get_sent_key(phone_number, pattern, data):
+    digest = hashlib.sha1(repr((pattern, sorted(data.items()))).encode()).hexdigest()
+    return SMS_SENT_KEY.format(f'{phone_number}_{digest}')
+
+
+def claim_sms(key):
+    """
+        True when the same sms was not sent in the last OTP_COALESCE_WINDOW seconds
+    """
+    try:
+        return redis_utils.get_and_set_if_absent(key, 1, settings.SMS_CONFIG['OTP_COALESCE_WINDOW']) is None
+    except RedisError as e:
+        logger.warning(f"SMS coalescing unavailable: {e}")
+        return True
+
+
+def release_sms(key):
+    try:
+        redis_utils.remove_key(key)
+    except RedisError as e:
+        logger.warning(f"SMS coalescing key {key} was not released: {e}")
+
+
+def send_sms_message(phone_number, pattern, data, coalesce=False):
+    """
+        send one pattern sms, throttled by the shared rate limit.
+        with coalesce (one time codes) the same sms to the same number is sent once per OTP_COALESCE_WINDOW,
+        a duplicate returns False without calling the provider.
+    """
+    # PhoneNumberField values are already international, plain strings are local numbers
+    phone_number = getattr(phone_number, 'as_e164', None) or get_coded_phone_number(phone_number)
+    phone_number = phone_number.replace('+', '')
+
+    sent_key = get_sent_key(phone_number, pattern, data) if coalesce else None
+    if sent_key and not claim_sms(sent_key):
+        logger.info(f"SMS to {phone_number} with pattern {pattern} was already sent, skipped")
+        return False
+
+    try:
+        wait_for_sms_token()
+        sms = get_sms_client(settings.SMS_CONFIG['API_KEY'])
+        sms.send_pattern(
+            pattern,
+            settings.SMS_CONFIG['ORIGINATOR'],
+            phone_number,
+            data
+        )
+    except Exception:
+        if sent_key:
+            # not sent, a retry must not be skipped
+            release_sms(sent_key)
+        raise
+    logger.info(f"SMS sent to {phone_number} with pattern {pattern}")
+    return True
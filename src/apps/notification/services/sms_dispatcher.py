@@ -1,21 +1,16 @@
-from apps.notification.sms import SMS_NOTIFICATION_HANDLERS
+from django.db import transaction
+
+from apps.notification.tasks import send_sms_notifications
+from .delivery import get_sms_handler, get_phone_number
 
 
 def dispatch_sms_notification(notification):
     """
-    Finds and executes the corresponding SMS handler based on notification.kwargs['type'].
+    Checks the notification has an SMS handler and queues it, the SMS is sent by a celery
+    worker (queue 'sms') once the transaction commits.
     """
-    notif_type = notification.kwargs.get('type')
-
-    if not notif_type:
-        raise ValueError("Missing 'type' in notification kwargs for SMS dispatch.")
-
-    handler = SMS_NOTIFICATION_HANDLERS.get(notif_type)
-    if not handler:
-        raise ValueError(f"No SMS handler found for notification type '{notif_type}'.")
-
-    phone_number = notification.phone_number
-    if not phone_number:
-        raise ValueError("Notification does not have a phone number to send SMS.")
+    get_sms_handler(notification)
+    get_phone_number(notification)
 
-    handler(notification, phone_number)
+    notification_id = str(notification.pk)
+    transaction.on_commit(lambda: send_sms_notifications.delay([notification_id]))
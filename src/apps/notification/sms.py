@@ -1,4 +1,4 @@
-from .tasks import send_sms
+from .services.senders import send_sms_message
 
 
 class NotificationUser:
@@ -6,51 +6,51 @@ class NotificationUser:
     @classmethod
     def handler_otp_send_code(cls, notification, phone_number):
         pattern = ''  # TODO: Add your pattern code here later
-        send_sms(phone_number, pattern, {
+        send_sms_message(phone_number, pattern, {
             'code': notification.kwargs['code']
-        })
+        }, coalesce=True)
 
     @classmethod
     def handler_login_success(cls, notification, phone_number):
         pattern = ''  # TODO: Add your pattern code here later
-        send_sms(phone_number, pattern, {
-            'user': notification.to_user.get_full_name(),
+        send_sms_message(phone_number, pattern, {
+            'user': notification.to_user.full_name(),
             'ip': notification.kwargs['ip'],
         })
 
     @classmethod
     def handler_register_success(cls, notification, phone_number):
         pattern = ''  # TODO: Add your pattern code here later
-        send_sms(phone_number, pattern, {
-            'user': notification.to_user.get_full_name()
+        send_sms_message(phone_number, pattern, {
+            'user': notification.to_user.full_name()
         })
 
     @classmethod
     def handler_reset_password_code_sent(cls, notification, phone_number):
         pattern = ''  # TODO: Add your pattern code here later
-        send_sms(phone_number, pattern, {
+        send_sms_message(phone_number, pattern, {
             'code': notification.kwargs['code']
-        })
+        }, coalesce=True)
 
     @classmethod
     def handler_reset_password_successfully(cls, notification, phone_number):
         pattern = ''  # TODO: Add your pattern code here later
-        send_sms(phone_number, pattern, {
-            'user': notification.to_user.get_full_name()
+        send_sms_message(phone_number, pattern, {
+            'user': notification.to_user.full_name()
         })
 
     @classmethod
     def handler_confirm_phone_number_send_code(cls, notification, phone_number):
         pattern = ''  # TODO: Add your pattern code here later
-        send_sms(phone_number, pattern, {
+        send_sms_message(phone_number, pattern, {
             'code': notification.kwargs['code']
-        })
+        }, coalesce=True)
 
     @classmethod
     def handler_confirm_phone_number_successfully(cls, notification, phone_number):
         pattern = ''  # TODO: Add your pattern code here later
-        send_sms(phone_number, pattern, {
-            'user': notification.to_user.get_full_name()
+        send_sms_message(phone_number, pattern, {
+            'user': notification.to_user.full_name()
         })
 
 
@@ -1,11 +1,17 @@
+import datetime
 import logging
-from ippanel import Client
-from celery import shared_task
-from django.core.mail import send_mail as django_send_mail
-
 
-from apps.core.utils import get_coded_phone_number
+from celery import shared_task
 from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Notification
+from .enums import NotificationStatus, NotificationType
+from .services import senders
+from .services.delivery import deliver, build_email, get_email
 
 logger = logging.getLogger(__name__)
 
@@ -13,15 +19,7 @@ logger = logging.getLogger(__name__)
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def send_email(self, subject, recipients, context):
     try:
-        body = "\n".join([f"{k}: {v}" for k, v in context.items()])
-        django_send_mail(
-            subject=subject,
-            message=body,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=recipients,
-            fail_silently=False
-        )
-        logger.info(f"Email sent to {recipients}")
+        senders.send_email_message(subject, recipients, context)
     except Exception as e:
         logger.error(f"Email sending failed: {e}")
         raise self.retry(exc=e)
@@ -30,21 +28,228 @@ def send_email(self, subject, recipients, context):
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def send_sms(self, phone_number, pattern, data):
     try:
+        senders.send_sms_message(phone_number, pattern, data)
+    except senders.SmsRateLimited as e:
+        # throttled, not failed: queued again without using a retry
+        send_sms.apply_async(args=[phone_number, pattern, data], countdown=e.wait)
+    except Exception as e:
+        logger.error(f"SMS sending failed for {phone_number}: {e}")
+        raise self.retry(exc=e)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_sms_notifications(self, notification_ids):
+    """
+        deliver pending sms notifications and record the result on them.
+        failed ones are retried together (retry_count is increased each time),
+        they are marked FAILED once the task runs out of retries.
+        when the shared sms rate limit is reached the rest are queued again for when it allows them.
+    """
+    notifications = list(
+        Notification.objects.filter(pk__in=notification_ids, status=NotificationStatus.PENDING)
+        .select_related('to_user')
+    )
+    sent, failed = [], []
+    for i, notification in enumerate(notifications):
+        try:
+            deliver(notification)
+            sent.append(notification.pk)
+        except senders.SmsRateLimited as e:
+            send_sms_notifications.apply_async(
+                args=[[str(n.pk) for n in notifications[i:]]], countdown=e.wait
+            )
+            break
+        except Exception as e:
+            logger.error(f"Notification {notification.pk} delivery failed: {e}")
+            failed.append(notification.pk)
+
+    if sent:
+        Notification.objects.filter(pk__in=sent).update(status=NotificationStatus.SENT, sent_at=timezone.now())
+    if not failed:
+        return len(sent)
+
+    Notification.objects.filter(pk__in=failed).update(retry_count=F('retry_count') + 1)
+    if self.request.retries >= self.max_retries:
+        Notification.objects.filter(pk__in=failed).update(status=NotificationStatus.FAILED)
+        return len(sent)
+    raise self.retry(args=[[str(pk) for pk in failed]])
+
+
+def get_queued_emails():
+    """
+        QUEUED emails (a failed one waits EMAIL_RETRY_DELAY), and claimed ones whose worker died EMAIL_RETRY_DELAY ago.
+        digest rows are left to get_due_digests
+    """
+    retry_after = timezone.now() - datetime.timedelta(seconds=settings.NOTIFICATION_CONFIG['EMAIL_RETRY_DELAY'])
+    return Notification.objects \
+        .filter(type=NotificationType.EMAIL) \
+        .filter(
+            Q(status=NotificationStatus.QUEUED) & (Q(retry_count=0) | Q(updated_at__lte=retry_after))
+            | Q(status=NotificationStatus.SENDING, digest_key__isnull=True, updated_at__lte=retry_after)
+        ) \
+        .order_by('created_at')
 
-        phone_number = get_coded_phone_number(phone_number).replace('+', '')
 
-        sms = Client(settings.SMS_CONFIG['API_KEY'])
+@shared_task
+def send_queued_emails(batch_size=None):
+    """
+        send QUEUED email notifications in batches of EMAIL_BATCH_SIZE, over one smtp connection per batch.
+        a batch is claimed (SENDING) in a short transaction (skip_locked, so parallel runs never take the same rows)
+        and mailed after it commits, so requests updating those rows never wait for smtp.
+        each email succeeds or fails on its own: a failed one is QUEUED again and waits EMAIL_RETRY_DELAY
+        for the next run (beat runs this every minute), it becomes FAILED after EMAIL_MAX_RETRIES.
+    """
+    conf = settings.NOTIFICATION_CONFIG
+    batch_size = batch_size or conf['EMAIL_BATCH_SIZE']
+    total = 0
 
-        sms.send_pattern(
-            pattern,
-            settings.SMS_CONFIG['ORIGINATOR'],
-            phone_number,
-            data
-        )
+    while True:
+        with transaction.atomic():
+            batch = list(
+                get_queued_emails().select_related('to_user').select_for_update(skip_locked=True, of=('self',))
+                [:batch_size]
+            )
+            if not batch:
+                break
+            Notification.objects.filter(pk__in=[n.pk for n in batch]) \
+                .update(status=NotificationStatus.SENDING, updated_at=timezone.now())
+        total += _send_email_batch(batch, conf['EMAIL_MAX_RETRIES'])
+        if len(batch) < batch_size:
+            break
+    return total
 
-        logger.info(f"SMS sent to {phone_number} with pattern {pattern}")
 
+def _send_messages(messages):
+    """
+        send messages over one smtp connection, returns the exceptions by message index
+    """
+    connection = get_connection()
+    try:
+        connection.open()
     except Exception as e:
-        logger.error(f"SMS sending failed for {phone_number}: {e}")
-        raise self.retry(exc=e)
+        return dict.fromkeys(range(len(messages)), e)
+    try:
+        return senders.send_email_batch(messages, connection)
+    finally:
+        try:
+            connection.close()
+        except Exception as e:
+            logger.warning(f"Closing the smtp connection failed: {e}")
+
+
+def _send_email_batch(notifications, max_retries):
+    messages, errors = [], {}
+    for notification in notifications:
+        try:
+            messages.append((notification, build_email(notification)))
+        except Exception as e:
+            errors[notification.pk] = e
+
+    if messages:
+        for i, e in _send_messages([message for _, message in messages]).items():
+            errors[messages[i][0].pk] = e
+
+    now = timezone.now()
+    sent = [notification.pk for notification in notifications if notification.pk not in errors]
+    Notification.objects.filter(pk__in=sent).update(status=NotificationStatus.SENT, sent_at=now, updated_at=now)
+
+    for pk, e in errors.items():
+        logger.error(f"Notification {pk} email failed: {e}")
+    if errors:
+        retried = Notification.objects.filter(pk__in=errors)
+        retried.update(status=NotificationStatus.QUEUED, retry_count=F('retry_count') + 1, updated_at=now)
+        retried.filter(retry_count__gt=max_retries).update(status=NotificationStatus.FAILED)
+    return len(sent)
+
+
+def get_due_digests():
+    """
+        digests opened more than DIGEST_WINDOW ago, and claimed ones whose send failed (or whose worker died)
+        EMAIL_RETRY_DELAY ago
+    """
+    conf = settings.NOTIFICATION_CONFIG
+    now = timezone.now()
+    cutoff = now - datetime.timedelta(seconds=conf['DIGEST_WINDOW'])
+    retry_after = now - datetime.timedelta(seconds=conf['EMAIL_RETRY_DELAY'])
+    return Notification.objects.filter(
+        Q(status=NotificationStatus.DIGEST, created_at__lte=cutoff)
+        | Q(status=NotificationStatus.SENDING, digest_key__isnull=False, updated_at__lte=retry_after)
+    )
+
+
+@shared_task
+def send_notification_digests(batch_size=None):
+    """
+        close the digest rows (utils.create_notify_digest) opened more than DIGEST_WINDOW ago
+        and send one email per user for its email ones, EMAIL_BATCH_SIZE users per smtp connection.
+        the other types stay in-app only (PENDING like any undispatched notification).
+        rows are claimed (SENDING) in a short transaction and mailed after it commits, so a request merging
+        into a digest never waits for smtp: the next event of the same key opens a new digest.
+        a failed digest is sent again after EMAIL_RETRY_DELAY (beat runs this every minute),
+        it becomes FAILED after EMAIL_MAX_RETRIES.
+    """
+    conf = settings.NOTIFICATION_CONFIG
+    batch_size = batch_size or conf['EMAIL_BATCH_SIZE']
+    due = get_due_digests()
+    total = 0
+    last_user_id = None
+
+    while True:
+        # users in key order, claimed rows are not due again in this run
+        users = due.order_by('to_user_id')
+        if last_user_id is not None:
+            users = users.filter(to_user_id__gt=last_user_id)
+        user_ids = list(users.values_list('to_user_id', flat=True).distinct()[:batch_size])
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+
+        with transaction.atomic():
+            # all due rows of a user go in the same batch, so each user gets a single email.
+            # a parallel run holding them makes this one wait, then skip what it claimed
+            rows = list(
+                due.filter(to_user_id__in=user_ids).select_related('to_user')
+                .select_for_update(of=('self',)).order_by('created_at')
+            )
+            _claim_digests(rows)
+        total += _send_digest_batch(rows, conf['EMAIL_MAX_RETRIES'])
+        if len(user_ids) < batch_size:
+            break
+    return total
+
+
+def _claim_digests(notifications):
+    now = timezone.now()
+    Notification.objects.filter(pk__in=[n.pk for n in notifications if n.type != NotificationType.EMAIL]) \
+        .update(status=NotificationStatus.PENDING, updated_at=now)
+    Notification.objects.filter(pk__in=[n.pk for n in notifications if n.type == NotificationType.EMAIL]) \
+        .update(status=NotificationStatus.SENDING, updated_at=now)
+
+
+def _send_digest_batch(notifications, max_retries):
+    digests = {}
+    for notification in notifications:
+        if notification.type == NotificationType.EMAIL:
+            digests.setdefault(notification.to_user_id, []).append(notification)
+
+    messages, errors = [], {}
+    for user_id, rows in digests.items():
+        try:
+            messages.append((user_id, senders.build_digest_message([get_email(rows[0])], rows)))
+        except Exception as e:
+            errors[user_id] = e
+    if messages:
+        for i, e in _send_messages([message for _, message in messages]).items():
+            errors[messages[i][0]] = e
+
+    now = timezone.now()
+    sent = [n.pk for n in notifications if n.type == NotificationType.EMAIL and n.to_user_id not in errors]
+    Notification.objects.filter(pk__in=sent).update(status=NotificationStatus.SENT, sent_at=now, updated_at=now)
 
+    for user_id, e in errors.items():
+        logger.error(f"Notification digest for user {user_id} failed: {e}")
+    if errors:
+        retried = Notification.objects.filter(pk__in=[n.pk for user_id in errors for n in digests[user_id]])
+        retried.update(retry_count=F('retry_count') + 1, updated_at=now)
+        retried.filter(retry_count__gt=max_retries).update(status=NotificationStatus.FAILED)
+    return len(digests) - len(errors)
@@ -0,0 +1,38 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from apps.notification.services import senders
+
+
+class FakeSmsProvider:
+    """
+        stands in for ippanel.Client, records when each sms reached it
+    """
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.clients = 0
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def __call__(self, api_key):
+        self.clients += 1
+        return self
+
+    def send_pattern(self, pattern, originator, recipient, data):
+        if self.fail:
+            raise OSError("provider down")
+        with self.lock:
+            self.sent.append((time.monotonic(), recipient, data))
+
+
+@pytest.fixture
+def sms_provider(fake_redis):
+    provider = FakeSmsProvider()
+    senders.get_sms_client.cache_clear()
+    with mock.patch.object(senders, "Client", provider):
+        yield provider
+    senders.get_sms_client.cache_clear()
@@ -0,0 +1,58 @@
+import pytest
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+
+from config.asgi import application
+from apps.account.tests.factories import UserFactory
+from apps.notification.enums import NotificationType
+from apps.notification.services import push
+from apps.notification.utils import create_notify
+
+
+async def connect(user):
+    communicator = WebsocketCommunicator(application=application, path="/ws/notifications/")
+    communicator.scope["user"] = user
+    connected, _ = await communicator.connect()
+    return communicator, connected
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_new_notification_is_pushed_with_unread_count(in_memory_layer, fake_redis):
+    user = await database_sync_to_async(UserFactory)()
+    await database_sync_to_async(create_notify)(user, "Earlier", n_type=NotificationType.IN_APP)
+
+    communicator, connected = await connect(user)
+    assert connected is True
+    assert await communicator.receive_json_from() == {"unread": 1}
+
+    notification = await database_sync_to_async(create_notify)(user, "Hello", n_type=NotificationType.IN_APP)
+
+    response = await communicator.receive_json_from()
+    assert response["notification"]["id"] == str(notification.id)
+    assert response["notification"]["title"] == "Hello"
+    assert response["unread"] == 2
+    await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_other_users_notifications_are_not_pushed(in_memory_layer, fake_redis):
+    user, other = await database_sync_to_async(UserFactory)(), await database_sync_to_async(UserFactory)()
+
+    communicator, _ = await connect(user)
+    await communicator.receive_json_from()
+    await database_sync_to_async(create_notify)(other, "Hello", n_type=NotificationType.IN_APP)
+
+    assert await communicator.receive_nothing()
+    assert await database_sync_to_async(push.get_unread_count)(other.id) == 1
+    await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_anonymous_is_rejected(in_memory_layer):
+    _, connected = await connect(AnonymousUser())
+
+    assert connected is False
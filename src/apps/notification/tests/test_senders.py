@@ -0,0 +1,81 @@
+import threading
+from unittest import mock
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from apps.core import redis_utils
+from apps.notification.services import senders
+
+
+def send_otp(code="1234", phone_number="09120000000"):
+    return senders.send_sms_message(phone_number, "otp", {"code": code}, coalesce=True)
+
+
+def test_client_is_created_once_per_worker(sms_provider):
+    for i in range(3):
+        senders.send_sms_message("09120000000", "welcome", {"user": str(i)})
+
+    assert sms_provider.clients == 1
+    assert len(sms_provider.sent) == 3
+
+
+def test_workers_never_exceed_the_rate(settings, sms_provider):
+    rate, burst = 50, 5
+    settings.SMS_CONFIG = {**settings.SMS_CONFIG, "RATE_LIMIT": rate, "RATE_BURST": burst, "RATE_MAX_WAIT": 10}
+
+    def worker(index):
+        for i in range(10):
+            senders.send_sms_message("09120000000", "welcome", {"user": f"{index}-{i}"})
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    times = sorted(sent_at for sent_at, _, _ in sms_provider.sent)
+    assert len(times) == 40
+    # any window may hold the burst plus what was refilled meanwhile (10ms slack for thread scheduling)
+    for first in range(len(times)):
+        for last in range(first, len(times)):
+            assert last - first + 1 <= burst + rate * (times[last] - times[first] + 0.01)
+
+
+def test_long_wait_raises_rate_limited(settings, sms_provider):
+    settings.SMS_CONFIG = {**settings.SMS_CONFIG, "RATE_LIMIT": 1, "RATE_BURST": 1, "RATE_MAX_WAIT": 0.1}
+
+    senders.send_sms_message("09120000000", "welcome", {})
+    with pytest.raises(senders.SmsRateLimited) as e:
+        senders.send_sms_message("09120000000", "welcome", {})
+
+    assert 0.1 < e.value.wait <= 1
+    assert len(sms_provider.sent) == 1
+
+
+def test_duplicate_otp_is_coalesced(sms_provider):
+    assert send_otp() is True
+    assert send_otp() is False
+    assert send_otp(code="5678") is True
+    assert send_otp(phone_number="09121111111") is True
+
+    assert len(sms_provider.sent) == 3
+
+
+def test_failed_otp_is_not_coalesced(sms_provider):
+    sms_provider.fail = True
+    with pytest.raises(OSError):
+        send_otp()
+
+    sms_provider.fail = False
+    assert send_otp() is True
+    assert len(sms_provider.sent) == 1
+
+
+def test_sends_without_redis(sms_provider):
+    with mock.patch.object(redis_utils, "take_token", side_effect=ConnectionError("down")), \
+            mock.patch.object(redis_utils, "get_and_set_if_absent", side_effect=ConnectionError("down")):
+        assert send_otp() is True
+        assert send_otp() is True
+
+    assert len(sms_provider.sent) == 2
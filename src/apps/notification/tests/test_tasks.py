@@ -0,0 +1,273 @@
+from unittest import mock
+
+import pytest
+from datetime import timedelta
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.mail.backends import locmem
+from django.utils import timezone
+
+from apps.account.tests.factories import UserFactory
+from apps.notification import tasks
+from apps.notification.enums import NotificationStatus, NotificationType
+from apps.notification.models import Notification
+from apps.notification.services.email_dispatcher import dispatch_email_notification
+from apps.notification.services.sms_dispatcher import dispatch_sms_notification
+from apps.notification.tests.factories import NotificationFactory
+from apps.notification.utils import create_notify_digest
+
+
+def make_notification(**kwargs):
+    data = {
+        "type": NotificationType.EMAIL,
+        "status": NotificationStatus.PENDING,
+        "retry_count": 0,
+        "sent_at": None,
+        "to_user": UserFactory(email="member@example.com"),
+        "kwargs": {"type": "TEAM_CREATION", "team_name": "Core"},
+    }
+    data.update(kwargs)
+    return NotificationFactory(**data)
+
+
+@pytest.mark.django_db
+class TestDispatch:
+
+    def test_email_is_queued_after_commit(self, django_capture_on_commit_callbacks):
+        notification = make_notification()
+
+        with mock.patch.object(tasks.send_queued_emails, "delay") as delay:
+            with django_capture_on_commit_callbacks(execute=True):
+                dispatch_email_notification(notification)
+                delay.assert_not_called()
+
+        delay.assert_called_once_with()
+        notification.refresh_from_db()
+        assert notification.status == NotificationStatus.QUEUED
+        assert mail.outbox == []
+
+    def test_sms_is_queued_after_commit(self, django_capture_on_commit_callbacks):
+        notification = make_notification(type=NotificationType.SMS, kwargs={"type": "OTP_SEND_CODE", "code": "1234"})
+
+        with mock.patch.object(tasks.send_sms_notifications, "delay") as delay:
+            with django_capture_on_commit_callbacks(execute=True):
+                dispatch_sms_notification(notification)
+
+        delay.assert_called_once_with([str(notification.pk)])
+
+    def test_unknown_type_fails_on_the_request(self):
+        notification = make_notification(kwargs={"type": "NOT_A_TYPE"})
+
+        with pytest.raises(ValueError):
+            dispatch_email_notification(notification)
+
+
+@pytest.mark.django_db
+class TestSendQueuedEmails:
+
+    def queue(self, count, **kwargs):
+        return [make_notification(status=NotificationStatus.QUEUED, **kwargs) for _ in range(count)]
+
+    def test_batches_share_one_connection(self):
+        notifications = self.queue(5)
+
+        with mock.patch("apps.notification.tasks.get_connection", wraps=get_connection) as connections:
+            assert tasks.send_queued_emails(batch_size=2) == 5
+
+        assert connections.call_count == 3
+        assert len(mail.outbox) == 5
+        for notification in notifications:
+            notification.refresh_from_db()
+            assert notification.status == NotificationStatus.SENT
+            assert notification.sent_at is not None
+
+    def test_failed_message_is_retried_alone(self, settings):
+        settings.NOTIFICATION_CONFIG = {**settings.NOTIFICATION_CONFIG, "EMAIL_RETRY_DELAY": 0}
+        good, bad = self.queue(2)
+        Notification.objects.filter(pk=bad.pk).update(email="refused@example.com")
+
+        def send_messages(self, messages):
+            if messages[0].to == ["refused@example.com"]:
+                raise OSError("mailbox refused")
+            return len(messages)
+
+        with mock.patch.object(locmem.EmailBackend, "send_messages", send_messages):
+            assert tasks.send_queued_emails() == 1
+            good.refresh_from_db()
+            bad.refresh_from_db()
+            assert good.status == NotificationStatus.SENT
+            assert (bad.status, bad.retry_count) == (NotificationStatus.QUEUED, 1)
+
+            for _ in range(settings.NOTIFICATION_CONFIG["EMAIL_MAX_RETRIES"]):
+                tasks.send_queued_emails()
+
+        bad.refresh_from_db()
+        assert bad.status == NotificationStatus.FAILED
+
+    def test_waits_for_the_retry_delay(self):
+        notification, = self.queue(1, retry_count=1)
+
+        assert tasks.send_queued_emails() == 0
+        assert mail.outbox == []
+
+        Notification.objects.filter(pk=notification.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        assert tasks.send_queued_emails() == 1
+
+    def test_connection_failure_keeps_the_batch_queued(self):
+        notifications = self.queue(2)
+
+        with mock.patch.object(locmem.EmailBackend, "open", side_effect=OSError("no smtp")):
+            assert tasks.send_queued_emails() == 0
+
+        assert mail.outbox == []
+        assert set(Notification.objects.filter(pk__in=[n.pk for n in notifications])
+                   .values_list("status", "retry_count")) == {(NotificationStatus.QUEUED, 1)}
+
+    def test_batch_is_claimed_before_sending(self):
+        notification, = self.queue(1)
+
+        def send(messages):
+            # the claim is committed, the rows are no longer QUEUED while smtp runs
+            assert Notification.objects.get(pk=notification.pk).status == NotificationStatus.SENDING
+            return len(messages)
+
+        with mock.patch.object(locmem.EmailBackend, "send_messages", side_effect=send):
+            assert tasks.send_queued_emails() == 1
+
+        notification.refresh_from_db()
+        assert notification.status == NotificationStatus.SENT
+
+    def test_stale_claim_is_sent_again(self):
+        notification, = self.queue(1)
+        Notification.objects.filter(pk=notification.pk).update(status=NotificationStatus.SENDING)
+
+        assert tasks.send_queued_emails() == 0
+
+        Notification.objects.filter(pk=notification.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        assert tasks.send_queued_emails() == 1
+        notification.refresh_from_db()
+        assert notification.status == NotificationStatus.SENT
+
+
+@pytest.mark.django_db
+class TestSendNotificationDigests:
+
+    def digest(self, user, target, age=20):
+        create_notify_digest(user, target, f"Updated {target}", description="by admin", kwargs={"type": "UPDATED_TASK"})
+        notification = Notification.objects.get(to_user=user, digest_key=f"UPDATED_TASK:{target}",
+                                                status=NotificationStatus.DIGEST)
+        Notification.objects.filter(pk=notification.pk).update(created_at=timezone.now() - timedelta(minutes=age))
+        return notification
+
+    def test_one_email_per_user(self):
+        user, other = UserFactory(email="member@example.com"), UserFactory(email="other@example.com")
+        for target in ("task:1", "task:2", "task:1"):
+            self.digest(user, target)
+        self.digest(other, "task:3")
+
+        assert tasks.send_notification_digests() == 2
+
+        assert sorted(message.to[0] for message in mail.outbox) == ["member@example.com", "other@example.com"]
+        body = next(message.body for message in mail.outbox if message.to == ["member@example.com"])
+        assert "Updated task:1 (2 times)" in body
+        assert "Updated task:2" in body
+        assert not Notification.objects.exclude(status=NotificationStatus.SENT).exists()
+
+    def test_open_window_is_not_sent(self):
+        self.digest(UserFactory(email="member@example.com"), "task:1", age=1)
+
+        assert tasks.send_notification_digests() == 0
+        assert mail.outbox == []
+
+    def test_batches_share_one_connection(self):
+        for i in range(3):
+            self.digest(UserFactory(email=f"user{i}@example.com"), "task:1")
+
+        with mock.patch("apps.notification.tasks.get_connection", wraps=get_connection) as connections:
+            assert tasks.send_notification_digests(batch_size=2) == 3
+
+        assert connections.call_count == 2
+        assert len(mail.outbox) == 3
+
+    def test_in_app_digest_is_closed_without_email(self):
+        notification = self.digest(UserFactory(), "task:1")
+
+        assert tasks.send_notification_digests() == 0
+
+        notification.refresh_from_db()
+        assert notification.status == NotificationStatus.PENDING
+        assert mail.outbox == []
+
+    def test_failed_digest_is_retried(self, settings):
+        settings.NOTIFICATION_CONFIG = {**settings.NOTIFICATION_CONFIG, "EMAIL_RETRY_DELAY": 0}
+        notification = self.digest(UserFactory(email="member@example.com"), "task:1")
+
+        with mock.patch.object(locmem.EmailBackend, "send_messages", side_effect=OSError("mailbox refused")):
+            assert tasks.send_notification_digests() == 0
+            notification.refresh_from_db()
+            assert (notification.status, notification.retry_count) == (NotificationStatus.SENDING, 1)
+
+            for _ in range(settings.NOTIFICATION_CONFIG["EMAIL_MAX_RETRIES"]):
+                tasks.send_notification_digests()
+
+        notification.refresh_from_db()
+        assert notification.status == NotificationStatus.FAILED
+
+    def test_rows_are_not_locked_while_sending(self):
+        user = UserFactory(email="member@example.com")
+        notification = self.digest(user, "task:1")
+
+        def send(messages):
+            # an event of the same key while the email is sent opens a new digest
+            assert create_notify_digest(user, "task:1", "Updated again", kwargs={"type": "UPDATED_TASK"}) is not None
+            return len(messages)
+
+        with mock.patch.object(locmem.EmailBackend, "send_messages", side_effect=send):
+            assert tasks.send_notification_digests() == 1
+
+        notification.refresh_from_db()
+        assert notification.status == NotificationStatus.SENT
+        assert Notification.objects.get(to_user=user, status=NotificationStatus.DIGEST).title == "Updated again"
+
+
+@pytest.mark.django_db
+class TestSendSmsNotifications:
+
+    def sms(self, code="1234", **kwargs):
+        return make_notification(type=NotificationType.SMS, kwargs={"type": "OTP_SEND_CODE", "code": code}, **kwargs)
+
+    def test_sent_notifications_are_marked(self, sms_provider):
+        notification = self.sms()
+
+        tasks.send_sms_notifications.apply(args=[[str(notification.pk)]])
+
+        assert len(sms_provider.sent) == 1
+        notification.refresh_from_db()
+        assert notification.status == NotificationStatus.SENT
+        assert notification.sent_at is not None
+
+    def test_failures_are_retried_then_marked_failed(self, sms_provider):
+        sms_provider.fail = True
+        notification = self.sms()
+
+        tasks.send_sms_notifications.apply(args=[[str(notification.pk)]])
+
+        notification.refresh_from_db()
+        assert notification.status == NotificationStatus.FAILED
+        assert notification.retry_count == tasks.send_sms_notifications.max_retries + 1
+
+    def test_rate_limited_rest_is_queued_again(self, settings, sms_provider):
+        settings.SMS_CONFIG = {**settings.SMS_CONFIG, "RATE_LIMIT": 1, "RATE_BURST": 2, "RATE_MAX_WAIT": 0}
+        notifications = [self.sms(code=str(i)) for i in range(4)]
+
+        with mock.patch.object(tasks.send_sms_notifications, "apply_async") as apply_async:
+            tasks.send_sms_notifications.apply(args=[[str(n.pk) for n in notifications]])
+
+        assert len(sms_provider.sent) == 2
+        (delayed,) = apply_async.call_args.kwargs["args"]
+        assert 0 < apply_async.call_args.kwargs["countdown"] <= 1
+        assert sorted(delayed) == sorted(
+            str(n.pk) for n in Notification.objects.filter(status=NotificationStatus.PENDING)
+        )
+        assert len(delayed) == 2
+        assert not Notification.objects.filter(retry_count__gt=0).exists()
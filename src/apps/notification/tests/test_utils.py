@@ -0,0 +1,112 @@
+from unittest import mock
+
+import pytest
+
+from apps.account.models import User
+from apps.account.tests.factories import UserFactory
+from apps.notification import tasks
+from apps.notification.enums import NotificationType, NotificationStatus
+from apps.notification.models import Notification
+from apps.notification.utils import create_notify_bulk, create_notify_digest, create_notify_team
+from apps.team.models import TeamMembership
+from apps.team.tests.factories import TeamFactory
+
+
+def make_team(size):
+    team = TeamFactory()
+    users = User.objects.bulk_create(UserFactory.build_batch(size, password=None))
+    TeamMembership.objects.bulk_create([TeamMembership(user=user, team=team, responsible="dev") for user in users])
+    return team
+
+
+@pytest.mark.django_db
+class TestCreateNotifyBulk:
+
+    def test_one_insert_and_type_per_user(self, django_assert_num_queries):
+        email_user = UserFactory(email="member@example.com")
+        sms_user = UserFactory()
+
+        with django_assert_num_queries(1):
+            notifications = create_notify_bulk([email_user, sms_user], "Hello", kwargs={"type": "TEAM_LOCKED"})
+
+        assert [n.type for n in notifications] == [NotificationType.EMAIL, NotificationType.SMS]
+        assert notifications[0].email == "member@example.com"
+        assert notifications[1].phone_number == sms_user.phone_number
+        assert Notification.objects.filter(title="Hello").count() == 2
+
+    def test_type_can_be_forced(self):
+        notifications = create_notify_bulk([UserFactory(email="member@example.com")], "Hello",
+                                           n_type=NotificationType.IN_APP)
+
+        assert notifications[0].type == NotificationType.IN_APP
+        assert notifications[0].email is None
+
+    def test_jobs_are_grouped_per_type_after_commit(self, settings, django_capture_on_commit_callbacks):
+        settings.NOTIFICATION_CONFIG = {**settings.NOTIFICATION_CONFIG, "DISPATCH_BATCH_SIZE": 2}
+        users = [UserFactory(email=f"user{i}@example.com") for i in range(2)] + UserFactory.create_batch(3)
+
+        with mock.patch.object(tasks.send_queued_emails, "delay") as email_delay, \
+                mock.patch.object(tasks.send_sms_notifications, "delay") as sms_delay:
+            with django_capture_on_commit_callbacks(execute=True):
+                notifications = create_notify_bulk(users, "Hello", kwargs={"type": "TEAM_LOCKED"})
+                email_delay.assert_not_called()
+
+        email_delay.assert_called_once_with()
+        assert [n.status for n in notifications[:2]] == [NotificationStatus.QUEUED] * 2
+        assert [call.args[0] for call in sms_delay.call_args_list] == [
+            [str(n.pk) for n in notifications[2:4]],
+            [str(notifications[4].pk)],
+        ]
+
+    def test_team_notify_query_count_does_not_grow(self, django_assert_num_queries):
+        small, large = make_team(3), make_team(40)
+
+        for team, size in ((small, 3), (large, 40)):
+            # members + insert
+            with django_assert_num_queries(2):
+                assert len(create_notify_team(team.id, "Locked", kwargs={"type": "TEAM_LOCKED"})) == size
+
+
+@pytest.mark.django_db
+class TestCreateNotifyDigest:
+
+    def notify(self, user, target="task:1", n_type="UPDATED_TASK", title="Task Updated"):
+        return create_notify_digest(user, target, title, kwargs={"type": n_type})
+
+    def test_repeats_are_merged(self):
+        user = UserFactory(email="member@example.com")
+
+        first = self.notify(user)
+        assert self.notify(user, title="Task Updated again") is None
+
+        first.refresh_from_db()
+        assert (first.status, first.count, first.title) == (NotificationStatus.DIGEST, 2, "Task Updated again")
+        assert Notification.objects.count() == 1
+
+    def test_merge_marks_digest_unread(self):
+        user = UserFactory()
+        first = self.notify(user)
+        Notification.objects.filter(pk=first.pk).update(is_visited=True)
+
+        self.notify(user, title="Task Updated again")
+
+        first.refresh_from_db()
+        assert first.is_visited is False
+
+    def test_key_is_user_type_and_target(self):
+        user, other = UserFactory(), UserFactory()
+
+        self.notify(user)
+        self.notify(user, target="task:2")
+        self.notify(user, n_type="ADDED_TASK")
+        self.notify(other)
+
+        assert Notification.objects.filter(count=1).count() == 4
+
+    def test_closed_digest_is_not_reopened(self):
+        user = UserFactory()
+        first = self.notify(user)
+        Notification.objects.filter(pk=first.pk).update(status=NotificationStatus.SENT)
+
+        assert self.notify(user) is not None
+        assert Notification.objects.count() == 2
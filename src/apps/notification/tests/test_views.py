@@ -1,10 +1,15 @@
+from unittest import mock
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from apps.notification.services import push
 from apps.notification.tests.factories import NotificationFactory
 from apps.account.tests.factories import UserFactory
+from apps.notification.enums import NotificationType
+from apps.notification.utils import create_notify_bulk
 
 
 @pytest.mark.django_db
@@ -40,4 +45,66 @@ class TestNotificationListView:
     def test_unauthenticated_access_denied(self):
         response = self.client.get(self.url)
 
-        assert response.status_code == status.HTTP_401_UNAUTHORIZED
\ No newline at end of file
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db
+class TestUnreadCountView:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, fake_redis):
+        self.client = APIClient()
+        self.to_user = UserFactory()
+        self.client.force_authenticate(user=self.to_user)
+        self.url = reverse("notification:notification-unread")
+
+    def test_counter_is_built_once(self, django_assert_num_queries):
+        NotificationFactory.create_batch(3, to_user=self.to_user, is_visited=False)
+        NotificationFactory(to_user=self.to_user, is_visited=True)
+
+        with django_assert_num_queries(1):
+            assert self.client.get(self.url).data == {"unread": 3}
+        with django_assert_num_queries(0):
+            assert self.client.get(self.url).data == {"unread": 3}
+
+    def test_new_notifications_increase_the_counter(self, django_capture_on_commit_callbacks):
+        self.client.get(self.url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            create_notify_bulk([self.to_user] * 2, "Hello", n_type=NotificationType.IN_APP)
+
+        assert self.client.get(self.url).data == {"unread": 2}
+
+    def test_unauthenticated_access_denied(self):
+        self.client.force_authenticate(user=None)
+
+        assert self.client.get(self.url).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestMarkVisitedView:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, fake_redis):
+        self.client = APIClient()
+        self.to_user = UserFactory()
+        self.notifications = NotificationFactory.create_batch(3, to_user=self.to_user, is_visited=False)
+        self.client.force_authenticate(user=self.to_user)
+        self.url = reverse("notification:notification-visit")
+
+    def test_mark_given_notifications(self):
+        assert push.get_unread_count(self.to_user.id) == 3
+
+        with mock.patch.object(push, "send_to_users") as send_to_users:
+            response = self.client.post(self.url, {"ids": [str(self.notifications[0].id)]}, format="json")
+
+        assert response.data == {"marked_count": 1, "unread": 2}
+        send_to_users.assert_called_once_with([(self.to_user.id, {"type": "notification.unread", "unread": 2})])
+
+    def test_mark_all(self):
+        other = NotificationFactory(is_visited=False)
+
+        response = self.client.post(self.url, {}, format="json")
+
+        assert response.data == {"marked_count": 3, "unread": 0}
+        other.refresh_from_db()
+        assert other.is_visited is False
@@ -7,4 +7,6 @@ app_name = 'apps.notification'
 
 urlpatterns = [
     path('', views.NotificationListView.as_view(), name='notification-list'),
+    path('unread/', views.UnreadCountView.as_view(), name='notification-unread'),
+    path('visit/', views.MarkVisitedView.as_view(), name='notification-visit'),
 ]
@@ -1,29 +1,111 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.account.models import User
 from .models import Notification
-from .enums import NotificationType
+from .enums import NotificationType, NotificationStatus
+from .tasks import send_queued_emails, send_sms_notifications
+from .services import push
+
+
+def get_notify_type(user):
+    if user.email:
+        return NotificationType.EMAIL
+    if user.phone_number:
+        return NotificationType.SMS
+    return NotificationType.IN_APP
 
 
 def create_notify(to_user, title, description=None, kwargs=None, n_type=None, **kw):
     """
     Create a notification for a specific user, and auto-detect type if not provided.
+    It is pushed to the user's open sockets once the transaction commits.
     """
 
-    email = to_user.email
-    phone_number = to_user.phone_number
-
-    if not n_type:
-        if email:
-            n_type = NotificationType.EMAIL
-        elif phone_number:
-            n_type = NotificationType.SMS
-        else:
-            n_type = NotificationType.IN_APP
-
-    return Notification.objects.create(
-        type=n_type,
+    notification = Notification.objects.create(
+        type=n_type or get_notify_type(to_user),
         title=title,
         description=description,
         kwargs=kwargs,
         to_user=to_user,
         **kw
     )
+    transaction.on_commit(lambda: push.publish([notification]))
+    return notification
+
+
+def create_notify_digest(to_user, target, title, description=None, kwargs=None, n_type=None):
+    """
+    Notify about a frequent event without a row and an email per occurrence: repeats with the same
+    (to_user, kwargs type, target) are merged into the user's open digest row, which keeps the latest
+    title/description/kwargs and counts the occurrences. Open rows are mailed by tasks.send_notification_digests,
+    one email per user, DIGEST_WINDOW seconds after their first occurrence.
+    Returns the new row, or None when the event was merged into an open one.
+    """
+    digest_key = f"{(kwargs or {}).get('type')}:{target}"
+    # a user who already opened the digest sees it unread again
+    merged = dict(title=title, description=description, kwargs=kwargs, is_visited=False, updated_at=timezone.now())
+    for _ in range(2):
+        if Notification.objects.filter(to_user=to_user, digest_key=digest_key, status=NotificationStatus.DIGEST) \
+                .update(count=F('count') + 1, **merged):
+            # the row may have been read already, the counter is rebuilt with it unread
+            transaction.on_commit(lambda: push.reset_unread_count(to_user.pk))
+            return None
+        try:
+            # the partial unique constraint keeps one open row when two requests race here
+            with transaction.atomic():
+                return create_notify(to_user, title, description=description, kwargs=kwargs, n_type=n_type,
+                                     status=NotificationStatus.DIGEST, digest_key=digest_key)
+        except IntegrityError:
+            continue
+    raise IntegrityError(f"Digest notification {digest_key} for {to_user} could not be stored.")
+
+
+def create_notify_bulk(users, title, description=None, kwargs=None, n_type=None, **kw):
+    """
+    Create the same notification for many users with one INSERT, the type is detected per user
+    if not provided. Email and SMS notifications are delivered by celery once the transaction commits,
+    emails from the queued email batches and sms in groups of DISPATCH_BATCH_SIZE.
+    """
+    notifications = []
+    for user in users:
+        notify_type = n_type or get_notify_type(user)
+        notifications.append(Notification(
+            type=notify_type,
+            title=title,
+            description=description,
+            kwargs=kwargs,
+            to_user=user,
+            status=NotificationStatus.QUEUED if notify_type == NotificationType.EMAIL else NotificationStatus.PENDING,
+            email=user.email if notify_type == NotificationType.EMAIL else None,
+            phone_number=user.phone_number if notify_type == NotificationType.SMS else None,
+            **kw
+        ))
+
+    Notification.objects.bulk_create(notifications)
+    transaction.on_commit(lambda: queue_notifications(notifications))
+    transaction.on_commit(lambda: push.publish(notifications))
+    return notifications
+
+
+def create_notify_team(team_id, title, description=None, kwargs=None, exclude=None, **kw):
+    """
+    Notify every member of a team, a constant number of queries whatever the team size.
+    """
+    users = User.objects.filter(team_memberships__team_id=team_id)
+    if exclude is not None:
+        users = users.exclude(pk=exclude.pk)
+    return create_notify_bulk(users, title, description=description, kwargs=kwargs, **kw)
+
+
+def queue_notifications(notifications):
+    # emails are already QUEUED, one run sends them in batches
+    if any(n.type == NotificationType.EMAIL for n in notifications):
+        send_queued_emails.delay()
 
+    batch_size = settings.NOTIFICATION_CONFIG['DISPATCH_BATCH_SIZE']
+    ids = [str(n.pk) for n in notifications if n.type == NotificationType.SMS]
+    for i in range(0, len(ids), batch_size):
+        send_sms_notifications.delay(ids[i:i + batch_size])
@@ -4,8 +4,10 @@ from rest_framework.response import Response
 
 from apps.core.views import mixins
 from apps.core.swagger import mixins as ms
+from apps.core.serializers import ListParamsSerializer
 
 from . import serializers, models
+from .services.push import get_unread_count, reset_unread_count, publish_unread
 
 
 class NotificationListView(ms.SwaggerViewMixin, mixins.ListViewMixin, APIView):
@@ -16,7 +18,9 @@ class NotificationListView(ms.SwaggerViewMixin, mixins.ListViewMixin, APIView):
     swagger_tags = ['Notification']
     permission_classes = [permissions.IsAuthenticated]
 
+    serializer = ListParamsSerializer
     serializer_response = serializers.NotificationResponseSerializer
+    cursor_pagination = mixins.CURSOR_OPT_IN
 
     def get_queryset(self):
         return models.Notification.objects.filter(to_user=self.request.user).order_by('-created_at')
@@ -28,3 +32,44 @@ class NotificationListView(ms.SwaggerViewMixin, mixins.ListViewMixin, APIView):
             return response_data
 
         return Response({"data": response_data}, status=status.HTTP_200_OK)
+
+
+class UnreadCountView(ms.SwaggerViewMixin, APIView):
+    """
+    Unread notifications count of the user, read from a redis counter
+    """
+    swagger_title = 'Notification Unread Count'
+    swagger_tags = ['Notification']
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_response = serializers.UnreadCountSerializer
+
+    def get(self, request):
+        return Response(self.serializer_response({'unread': get_unread_count(request.user.id)}).data)
+
+
+class MarkVisitedView(ms.SwaggerViewMixin, APIView):
+    """
+    Mark notifications of the user as visited, the new unread count is pushed to the user's sockets too
+    """
+    swagger_title = 'Notification Mark Visited'
+    swagger_tags = ['Notification']
+    permission_classes = [permissions.IsAuthenticated]
+    serializer = serializers.MarkVisitedSerializer
+    serializer_response = serializers.MarkVisitedResponseSerializer
+
+    def post(self, request):
+        ser = self.serializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+
+        notifications = models.Notification.objects.filter(to_user=request.user, is_visited=False)
+        if 'ids' in ser.validated_data:
+            notifications = notifications.filter(pk__in=ser.validated_data['ids'])
+        marked_count = notifications.update(is_visited=True)
+
+        if marked_count:
+            reset_unread_count(request.user.id)
+            publish_unread(request.user.id)
+        return Response(self.serializer_response({
+            'marked_count': marked_count,
+            'unread': get_unread_count(request.user.id),
+        }).data)
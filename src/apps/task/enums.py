@@ -7,3 +7,11 @@ class TaskPriorityEnum(TextChoices):
     MEDIUM = 'medium', _('Medium')
     HIGH = 'high', _('High')
     CRITICAL = 'critical', _('Critical')
+
+
+class TaskBulkOperationEnum(TextChoices):
+    CREATE = 'create', _('Create')
+    UPDATE = 'update', _('Update')
+    MOVE = 'move', _('Move')
+    COMPLETE = 'complete', _('Complete')
+    DELETE = 'delete', _('Delete')
@@ -14,3 +14,13 @@ class NotFound(APIException):
     message = text.not_found
 
 
+class NotSameBoard(APIException):
+    status_code = 400
+    default_code = 'not_same_board'
+    message = text.not_same_board
+
+
+class NotInContainer(APIException):
+    status_code = 400
+    default_code = 'not_in_container'
+    message = text.not_in_container
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+GAP = 1024
+
+
+def spread_orders(apps, schema_editor):
+    """ existing tasks get sparse orders in creation order, existing task lists are spread GAP apart """
+    TaskModel = apps.get_model('task', 'TaskModel')
+    TaskListModel = apps.get_model('task', 'TaskListModel')
+
+    for task_list in TaskListModel.objects.all().iterator():
+        tasks = list(TaskModel.objects.filter(task_list=task_list).order_by('created_at', 'id'))
+        for index, task in enumerate(tasks):
+            task.order = (index + 1) * GAP
+        TaskModel.objects.bulk_update(tasks, ['order'], batch_size=500)
+
+    board_ids = TaskListModel.objects.exclude(board=None).values_list('board_id', flat=True).distinct()
+    for board_id in board_ids:
+        rows = list(TaskListModel.objects.filter(board_id=board_id).order_by('order').values_list('pk', 'order'))
+        targets = [(pk, old, (index + 1) * GAP) for index, (pk, old) in enumerate(rows)]
+        # rows moving down first in ascending order, then rows moving up in descending order,
+        # so the unique (board, order) constraint holds after every update
+        down = [row for row in targets if row[2] < row[1]]
+        up = [row for row in reversed(targets) if row[2] > row[1]]
+        for pk, _, order in down + up:
+            TaskListModel.objects.filter(pk=pk).update(order=order)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0002_alter_taskmodel_options_remove_taskmodel_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskmodel',
+            name='order',
+            field=models.PositiveIntegerField(default=0, verbose_name='Order'),
+        ),
+        migrations.RunPython(spread_orders, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='taskmodel',
+            constraint=models.UniqueConstraint(fields=('task_list', 'order'), name='unique_task_order'),
+        ),
+    ]
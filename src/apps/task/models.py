@@ -15,6 +15,7 @@ class TaskListModel(BaseModel):
     board = models.ForeignKey(BoardModel, verbose_name=_('Board'), on_delete=models.SET_NULL, null=True)
     title = models.CharField(_('Title'), max_length=128)
     description = models.TextField(_('Description'), blank=True, null=True)
+    # sparse, see services.ordering
     order = models.PositiveIntegerField(_('Order'), default=0, db_index=True)
 
     class Meta:
@@ -43,10 +44,15 @@ class TaskModel(BaseModel):
     deadline = models.DateTimeField(_('Deadline'), null=True, blank=True)
     completed_at = models.DateTimeField(_('Completed at'), null=True, blank=True)
     priority = models.CharField(_('Priority'), choices=Priority, default=Priority.MEDIUM)
+    # sparse, see services.ordering
+    order = models.PositiveIntegerField(_('Order'), default=0)
 
     class Meta:
         verbose_name = _("Task")
         verbose_name_plural = _("Tasks")
+        constraints = [
+            models.UniqueConstraint(fields=['task_list', 'order'], name='unique_task_order')
+        ]
 
     def __str__(self):
         return self.title
@@ -1,13 +1,16 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 
 from apps.core import text
 from apps.board.models import BoardModel
 from . import models, enums
+from .services import ordering
 
 
 Priority = enums.TaskPriorityEnum
+Operation = enums.TaskBulkOperationEnum
 User = get_user_model()
 
 
@@ -18,6 +21,7 @@ class TaskListCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.TaskListModel
         fields = ['title', 'description', 'order']
+        read_only_fields = ('order',)
 
     def create(self, validated_data):
         team_id = self.context['request'].data.get("team_id")
@@ -26,10 +30,8 @@ class TaskListCreateSerializer(serializers.ModelSerializer):
         if board.is_archived:
             raise serializers.ValidationError({"detail": text.is_archived_board})
 
-        last_task_list = models.TaskListModel.objects.filter(board=board).order_by("-order").first()
-        validated_data['order'] = (last_task_list.order + 1) if last_task_list else 1
-        validated_data['board'] = board
-        return super().create(validated_data)
+        # appended with the board locked, see services.ordering
+        return ordering.create_task_list(board, **validated_data)
 
 
 class TaskListCreateSerializersResponse(serializers.ModelSerializer):
@@ -102,7 +104,7 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.TaskModel
         fields = '__all__'
-        read_only_fields = ("task_list", "assignee")
+        read_only_fields = ("task_list", "assignee", "order")
 
 
 class TaskUpdateResponseSerializers(serializers.Serializer):
@@ -149,6 +151,10 @@ class AdminCreateTaskSerializer(serializers.ModelSerializer):
             'assignee'
         ]
 
+    def create(self, validated_data):
+        task_list = validated_data.pop('task_list')
+        return ordering.create_task(task_list, **validated_data)
+
 
 class RemoveTaskSerializer(serializers.Serializer):
     """
@@ -170,3 +176,124 @@ class RemoveTaskSerializer(serializers.Serializer):
         return attrs
 
 
+
+
+class TaskListMoveSerializer(serializers.Serializer):
+    """
+        serializer move task list, after_id is the list it goes after (empty: first)
+    """
+    after_id = serializers.UUIDField(required=False, allow_null=True)
+
+
+class TaskListMoveResponseSerializer(serializers.ModelSerializer):
+    """
+        serializer response move task list
+    """
+    class Meta:
+        model = models.TaskListModel
+        fields = ['id', 'title', 'order']
+
+
+class TaskMoveSerializer(serializers.Serializer):
+    """
+        serializer move task, into task_list_id (default: its own list) right after after_id (empty: first)
+    """
+    task_list_id = serializers.UUIDField(required=False)
+    after_id = serializers.UUIDField(required=False, allow_null=True)
+
+
+class TaskMoveResponseSerializer(serializers.ModelSerializer):
+    """
+        serializer response move task
+    """
+    class Meta:
+        model = models.TaskModel
+        fields = ['id', 'title', 'task_list', 'order']
+
+
+class TaskBulkOperationSerializer(serializers.Serializer):
+    """
+        one operation of a bulk request, ids stay plain uuids so the whole batch is resolved at once
+    """
+    op = serializers.ChoiceField(choices=Operation.choices)
+    id = serializers.UUIDField(required=False)
+    task_list = serializers.UUIDField(required=False)
+    assignee = serializers.UUIDField(required=False, allow_null=True)
+    title = serializers.CharField(max_length=128, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    deadline = serializers.DateTimeField(required=False, allow_null=True)
+    priority = serializers.ChoiceField(choices=Priority.choices, required=False)
+
+    required_fields = {
+        Operation.CREATE: ('task_list', 'title'),
+        Operation.UPDATE: ('id',),
+        Operation.MOVE: ('id', 'task_list'),
+        Operation.COMPLETE: ('id',),
+        Operation.DELETE: ('id',),
+    }
+
+    def validate(self, attrs):
+        missing = [field for field in self.required_fields[attrs['op']] if attrs.get(field) is None]
+        if missing:
+            raise serializers.ValidationError({field: self.fields[field].error_messages['required'] for field in missing})
+        return attrs
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+        serializer bulk task operations, tasks, task lists and assignees of every operation are loaded
+        with one in_bulk query each
+    """
+    operations = TaskBulkOperationSerializer(many=True, allow_empty=False,
+                                             max_length=settings.TASK_CONFIG['BULK_MAX_OPERATIONS'])
+
+    def validate(self, attrs):
+        operations = attrs['operations']
+        errors = {}
+
+        task_ids = [op['id'] for op in operations if op['op'] != Operation.CREATE]
+        seen = set()
+        for index, op in enumerate(operations):
+            if op['op'] != Operation.CREATE:
+                if op['id'] in seen:
+                    errors[index] = text.duplicate_task_operation
+                seen.add(op['id'])
+
+        tasks = models.TaskModel.objects.select_related('task_list__board__team', 'assignee').in_bulk(task_ids)
+        task_lists = models.TaskListModel.objects.select_related('board__team').in_bulk(
+            {op['task_list'] for op in operations if op['op'] in (Operation.CREATE, Operation.MOVE)}
+        )
+        assignees = User.objects.in_bulk({op['assignee'] for op in operations if op.get('assignee')})
+
+        for index, op in enumerate(operations):
+            task = tasks.get(op.get('id'))
+            task_list = task_lists.get(op['task_list']) if op['op'] in (Operation.CREATE, Operation.MOVE) else None
+            if op['op'] != Operation.CREATE and not task:
+                errors.setdefault(index, text.not_found)
+            elif op['op'] in (Operation.CREATE, Operation.MOVE) and not task_list:
+                errors.setdefault(index, text.not_found)
+            elif (task_list and not task_list.board) or (task and not task.task_list.board):
+                errors.setdefault(index, text.tasklist_not_board)
+            elif op['op'] == Operation.MOVE and task_list.board_id != task.task_list.board_id:
+                errors.setdefault(index, text.not_same_board)
+            elif op.get('assignee') and op['assignee'] not in assignees:
+                errors.setdefault(index, text.user_not_found)
+
+        if errors:
+            raise serializers.ValidationError({'operations': errors})
+
+        attrs['tasks'] = tasks
+        attrs['task_lists'] = task_lists
+        attrs['assignees'] = assignees
+        return attrs
+
+
+class TaskBulkResponseSerializer(serializers.Serializer):
+    """
+        serializer response bulk task operations, ids of the tasks per operation
+    """
+    created = serializers.ListField(child=serializers.UUIDField())
+    updated = serializers.ListField(child=serializers.UUIDField())
+    moved = serializers.ListField(child=serializers.UUIDField())
+    completed = serializers.ListField(child=serializers.UUIDField())
+    deleted = serializers.ListField(child=serializers.UUIDField())
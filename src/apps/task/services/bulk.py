@@ -0,0 +1,147 @@
+"""
+    many task operations in one request (TaskBulkView). the serializer has already loaded every task,
+    task list and assignee, here the batch is written in one transaction: one bulk_create, one bulk_update
+    per set of changed fields and one delete, then one log entry and one notification batch per board.
+    bulk writes send no model signals, so board caches and open boards are told through board.services.changes
+    (deletes still send theirs).
+"""
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.board.services import changes
+from apps.logbook.enums import LogEventEnum
+from apps.logbook.services.pipeline import emit
+from apps.notification.utils import create_notify_bulk
+from apps.task.enums import TaskBulkOperationEnum as Operation
+from apps.task.models import TaskModel
+
+from . import ordering
+
+FIELDS = ('title', 'description', 'deadline', 'priority')
+RESULT_KEYS = {
+    Operation.CREATE: 'created',
+    Operation.UPDATE: 'updated',
+    Operation.MOVE: 'moved',
+    Operation.COMPLETE: 'completed',
+    Operation.DELETE: 'deleted',
+}
+
+
+@transaction.atomic
+def apply(actor, operations, tasks, task_lists, assignees):
+    """
+        returns the task ids per operation: {'created': [...], 'updated': [...], 'moved': [...], ...}
+    """
+    now = timezone.now()
+    # tasks are appended to the lists they are created in or moved to, see services.ordering
+    targets = {op['task_list'] for op in operations if op['op'] in (Operation.CREATE, Operation.MOVE)}
+    ordering.lock_task_lists(targets)
+    next_orders = ordering.get_next_task_orders(targets)
+
+    def take_order(task_list_id):
+        order = next_orders[task_list_id]
+        next_orders[task_list_id] += ordering.GAP
+        return order
+
+    created, changed, deleted = [], {}, []
+    updates = {}  # fields: tasks, a task writes only the fields its own operation changed
+    kinds = {}
+    for op in operations:
+        kind = op['op']
+        if kind == Operation.CREATE:
+            task = TaskModel(task_list=task_lists[op['task_list']], assignee=assignees.get(op.get('assignee')),
+                             order=take_order(op['task_list']), **{f: op[f] for f in FIELDS if f in op})
+            created.append(task)
+            kinds[task.pk] = kind
+            continue
+
+        task = tasks[op['id']]
+        kinds[task.pk] = kind
+        if kind == Operation.DELETE:
+            deleted.append(task)
+            continue
+
+        fields = {'updated_at'}
+
+        if kind == Operation.UPDATE:
+            for field in FIELDS:
+                if field in op:
+                    setattr(task, field, op[field])
+                    fields.add(field)
+            if 'assignee' in op:
+                task.assignee = assignees.get(op['assignee'])
+                fields.add('assignee')
+        elif kind == Operation.MOVE:
+            task.task_list = task_lists[op['task_list']]
+            task.order = take_order(op['task_list'])
+            fields.update(('task_list', 'order'))
+        elif kind == Operation.COMPLETE and not task.is_done:
+            task.is_done = True
+            task.completed_at = now
+            fields.update(('is_done', 'completed_at'))
+        task.updated_at = now
+        changed[task.pk] = task
+        updates.setdefault(tuple(sorted(fields)), []).append(task)
+
+    TaskModel.objects.bulk_create(created)
+    # one bulk_update per set of fields, so no task gets values of the other operations written back
+    for fields, group in updates.items():
+        TaskModel.objects.bulk_update(group, fields)
+    if deleted:
+        TaskModel.objects.filter(pk__in=[task.pk for task in deleted]).delete()
+
+    for task in created:
+        changes.record_task(task, created=True)
+    for task in changed.values():
+        changes.record_task(task)
+
+    report(actor, [*created, *changed.values(), *deleted], kinds)
+
+    result = {key: [] for key in RESULT_KEYS.values()}
+    for task_id, kind in kinds.items():
+        result[RESULT_KEYS[kind]].append(task_id)
+    return result
+
+
+def report(actor, tasks, kinds):
+    """
+        one log entry and one notification to the assignees per board
+    """
+    boards = {}
+    for task in tasks:
+        board = task.task_list.board
+        boards.setdefault(board.pk, (board, []))[1].append(task)
+
+    for board, board_tasks in boards.values():
+        ids = {}
+        for task in board_tasks:
+            ids.setdefault(RESULT_KEYS[kinds[task.pk]], []).append(str(task.pk))
+        emit(
+            event=LogEventEnum.TASK_BULK,
+            target_id=board.id,
+            target_repr=board.title,
+            actor_id=actor.id,
+            team_id=board.team_id,
+            board_id=board.id,
+            extra_data=ids,
+        )
+
+        users = {task.assignee for task in board_tasks if task.assignee}
+        if not users:
+            continue
+        create_notify_bulk(
+            users,
+            title=_("Tasks Updated"),
+            description=_("{admin} changed {count} tasks on board '{board}'.").format(
+                admin=actor.full_name(),
+                count=len(board_tasks),
+                board=board.title,
+            ),
+            kwargs={
+                "task_count": len(board_tasks),
+                "board_title": board.title,
+                "team_name": board.team.name,
+                "type": "BULK_TASKS"
+            }
+        )
@@ -0,0 +1,125 @@
+"""
+    sparse ordering of task lists in a board and tasks in a task list.
+    orders are GAP apart, so appending or moving an item writes only its own row: it takes the
+    middle of its new neighbours. when two neighbours have no room left between them the siblings
+    are renumbered GAP apart once (about log2(GAP) moves into the same spot are needed for that).
+
+    every write locks the container row (board or task list) first, so concurrent creates and moves
+    of one container run one after another and never pick the same order.
+"""
+from django.db import transaction
+from django.db.models import Max
+
+from apps.task.models import TaskListModel, TaskModel
+
+GAP = 1024
+
+
+def lock(container):
+    type(container).objects.select_for_update().filter(pk=container.pk).first()
+
+
+def lock_task_lists(task_list_ids):
+    # in pk order, so two writers of the same lists never wait for each other in a cycle
+    list(TaskListModel.objects.select_for_update().filter(pk__in=task_list_ids).order_by('pk'))
+
+
+def get_next_order(siblings):
+    last = siblings.aggregate(last=Max('order'))['last']
+    return (last or 0) + GAP
+
+
+def get_next_task_orders(task_list_ids):
+    """
+        {task_list_id: order after its last task} with one query, the caller holds the lists' locks
+    """
+    last = dict(
+        TaskModel.objects.filter(task_list_id__in=task_list_ids)
+        .values('task_list_id').annotate(last=Max('order')).values_list('task_list_id', 'last')
+    )
+    return {pk: (last.get(pk) or 0) + GAP for pk in task_list_ids}
+
+
+def get_order_between(prev_order, next_order):
+    low = prev_order or 0
+    if next_order is None:
+        return low + GAP
+    if next_order - low > 1:
+        return (low + next_order) // 2
+    return None
+
+
+def get_neighbour_orders(siblings, after):
+    prev_order = None
+    if after is not None:
+        prev_order = siblings.filter(pk=after.pk).values_list('order', flat=True).first()
+        if prev_order is None:
+            raise ValueError('after is not in the same container')
+    following = siblings.filter(order__gt=prev_order) if prev_order is not None else siblings
+    next_order = following.order_by('order').values_list('order', flat=True).first()
+    return prev_order, next_order
+
+
+def renumber(items):
+    """
+        items GAP apart in their current order. rows are saved one by one (so board signals see them)
+        in an order that never hits the unique (container, order) constraint
+    """
+    rows = list(items.order_by('order'))
+    targets = [(item, (index + 1) * GAP) for index, item in enumerate(rows)]
+    # the renumbering keeps the order: rows moving down are free in ascending order, rows moving up in descending
+    down = [(item, order) for item, order in targets if order < item.order]
+    up = [(item, order) for item, order in reversed(targets) if order > item.order]
+    for item, order in down + up:
+        item.order = order
+        item.save(update_fields=['order', 'updated_at'])
+
+
+def place(instance, items, after=None):
+    """
+        set instance.order right after `after` (first when None) among items, the caller saves it.
+        items are all items of the target container (instance included when it is already there),
+        locked by the caller
+    """
+    siblings = items.exclude(pk=instance.pk)
+    order = get_order_between(*get_neighbour_orders(siblings, after))
+    if order is None:
+        renumber(items)
+        order = get_order_between(*get_neighbour_orders(siblings, after))
+    instance.order = order
+    return instance
+
+
+@transaction.atomic
+def create_task_list(board, **fields):
+    lock(board)
+    order = get_next_order(TaskListModel.objects.filter(board=board))
+    return TaskListModel.objects.create(board=board, order=order, **fields)
+
+
+@transaction.atomic
+def create_task(task_list, **fields):
+    lock(task_list)
+    order = get_next_order(TaskModel.objects.filter(task_list=task_list))
+    return TaskModel.objects.create(task_list=task_list, order=order, **fields)
+
+
+@transaction.atomic
+def move_task_list(task_list, after=None):
+    lock(task_list.board)
+    place(task_list, TaskListModel.objects.filter(board_id=task_list.board_id), after)
+    task_list.save(update_fields=['order', 'updated_at'])
+    return task_list
+
+
+@transaction.atomic
+def move_task(task, task_list=None, after=None):
+    """
+        move task right after `after` (first when None) in task_list (its own list when None)
+    """
+    task_list = task_list or task.task_list
+    lock(task_list)
+    place(task, TaskModel.objects.filter(task_list=task_list), after)
+    task.task_list = task_list
+    task.save(update_fields=['task_list', 'order', 'updated_at'])
+    return task
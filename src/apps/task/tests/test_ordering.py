@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection, connections
+
+from apps.board.tests.factories import BoardFactory
+from apps.task.models import TaskListModel, TaskModel
+from apps.task.services import ordering
+from apps.task.tests.factories import TaskListFactory, TaskFactory
+
+
+@pytest.mark.django_db
+def test_create_appends_after_the_last():
+    board = BoardFactory()
+    TaskListFactory(board=board, order=5000)
+
+    task_list = ordering.create_task_list(board, title="Next")
+
+    assert task_list.order == 5000 + ordering.GAP
+    assert ordering.create_task(task_list, title="First").order == ordering.GAP
+
+
+@pytest.mark.django_db
+def test_renumber_keeps_the_order():
+    task_list = TaskListFactory()
+    tasks = [TaskFactory(task_list=task_list, order=order) for order in (3, 4, 5, 9000)]
+
+    ordering.renumber(TaskModel.objects.filter(task_list=task_list))
+
+    assert list(TaskModel.objects.filter(task_list=task_list).order_by("order").values_list("id", "order")) == [
+        (task.id, (index + 1) * ordering.GAP) for index, task in enumerate(tasks)
+    ]
+
+
+@pytest.mark.skipif(connection.vendor == "sqlite", reason="sqlite serializes writers itself, the race needs a server")
+@pytest.mark.django_db(transaction=True)
+def test_parallel_creates_get_distinct_orders():
+    board = BoardFactory()
+
+    def create(index):
+        try:
+            return ordering.create_task_list(board, title=f"List {index}").order
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        orders = list(pool.map(create, range(32)))
+
+    assert len(set(orders)) == 32
+    assert sorted(TaskListModel.objects.filter(board=board).values_list("order", flat=True)) == sorted(orders)
@@ -1,13 +1,20 @@
 import pytest
 from uuid import uuid4
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from apps.account.tests.factories import UserFactory
 from apps.account.enums import UserRoleEnum as Role
 from apps.team.tests.factories import TeamFactory, TeamMembershipFactory
+from apps.task.models import TaskListModel, TaskModel
 from apps.task.tests.factories import TaskListFactory, TaskFactory
 from apps.board.tests.factories import BoardFactory
+from apps.notification.enums import NotificationStatus
+from apps.notification.models import Notification
+from apps.logbook.enums import LogEventEnum
+from apps.logbook.models import LogEntryModel
 
 
 @pytest.mark.django_db
@@ -316,7 +323,238 @@ class TestTaskUpdateView:
         response = self.client.put(url, {"title": "New Title"})
         assert response.status_code == 404
 
+    def test_repeated_updates_are_digested(self):
+        self.client.force_authenticate(user=self.admin)
+        for i in range(3):
+            response = self.client.put(self.url, {"title": f"Updated task {i}"})
+            assert response.status_code == 200
+
+        notification = Notification.objects.get(to_user=self.task.assignee)
+        assert notification.status == NotificationStatus.DIGEST
+        assert notification.count == 3
+        assert notification.kwargs["task_title"] == "Updated task 2"
+
+
+
+
+
+
+
+@pytest.mark.django_db
+class TestTaskListMoveView:
+    @pytest.fixture(autouse=True)
+    def setup(self, db):
+        self.client = APIClient()
+        self.admin = UserFactory(is_active=True, role=Role.ADMIN)
+        self.team = TeamFactory()
+        self.board = BoardFactory(team=self.team)
+        self.lists = [TaskListFactory(board=self.board, order=(i + 1) * 1024) for i in range(3)]
+
+        self.client.force_authenticate(user=self.admin)
+
+    def move(self, task_list, after=None):
+        url = reverse("task:tasklist-move", kwargs={'tasklist_id': task_list.id})
+        return self.client.post(url, {"after_id": str(after.id) if after else None}, format="json")
+
+    def board_order(self):
+        return list(TaskListModel.objects.filter(board=self.board).order_by("order").values_list("id", flat=True))
+
+    def test_move_writes_one_row(self):
+        first, second, third = self.lists
+
+        response = self.move(third, after=first)
+
+        assert response.status_code == 200
+        assert self.board_order() == [first.id, third.id, second.id]
+        assert TaskListModel.objects.get(id=first.id).order == first.order
+        assert TaskListModel.objects.get(id=second.id).order == second.order
+
+    def test_move_first(self):
+        first, second, third = self.lists
+
+        assert self.move(second).status_code == 200
+        assert self.board_order() == [second.id, first.id, third.id]
+
+    def test_after_list_of_another_board(self):
+        other = TaskListFactory()
+
+        response = self.move(self.lists[0], after=other)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_after_itself(self):
+        response = self.move(self.lists[1], after=self.lists[1])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert self.board_order() == [task_list.id for task_list in self.lists]
+
+
+@pytest.mark.django_db
+class TestTaskMoveView:
+    @pytest.fixture(autouse=True)
+    def setup(self, db):
+        self.client = APIClient()
+        self.admin = UserFactory(is_active=True, role=Role.ADMIN)
+        self.board = BoardFactory(team=TeamFactory())
+        self.todo = TaskListFactory(board=self.board)
+        self.done = TaskListFactory(board=self.board)
+        self.tasks = [TaskFactory(task_list=self.todo, order=(i + 1) * 1024) for i in range(3)]
+
+        self.client.force_authenticate(user=self.admin)
+
+    def move(self, task, after=None, task_list=None):
+        data = {"after_id": str(after.id) if after else None}
+        if task_list:
+            data["task_list_id"] = str(task_list.id)
+        return self.client.post(reverse("task:task-move", kwargs={'task_id': task.id}), data, format="json")
+
+    def list_order(self, task_list):
+        return list(TaskModel.objects.filter(task_list=task_list).order_by("order").values_list("id", flat=True))
+
+    def test_move_within_list(self):
+        first, second, third = self.tasks
+
+        response = self.move(first, after=third)
 
+        assert response.status_code == 200
+        assert self.list_order(self.todo) == [second.id, third.id, first.id]
+
+    def test_move_to_another_list(self):
+        first, second, third = self.tasks
+        waiting = TaskFactory(task_list=self.done)
+
+        assert self.move(second, task_list=self.done).status_code == 200
+        assert self.move(third, after=second, task_list=self.done).status_code == 200
+
+        assert self.list_order(self.todo) == [first.id]
+        assert self.list_order(self.done) == [second.id, third.id, waiting.id]
+
+    def test_repeated_moves_into_one_spot_keep_the_order(self):
+        first, second, third = self.tasks
+        moved = TaskFactory.create_batch(15, task_list=self.done)
+
+        # every move halves the gap after `first` until the list has to be renumbered
+        for task in moved:
+            assert self.move(task, after=first, task_list=self.todo).status_code == 200
+
+        assert self.list_order(self.todo) == [first.id, *[task.id for task in reversed(moved)], second.id, third.id]
+
+    def test_list_of_another_board(self):
+        response = self.move(self.tasks[0], task_list=TaskListFactory())
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_after_itself(self):
+        response = self.move(self.tasks[0], after=self.tasks[0])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert self.list_order(self.todo) == [task.id for task in self.tasks]
+
+
+@pytest.mark.django_db
+class TestTaskBulkView:
+    @pytest.fixture(autouse=True)
+    def setup(self, settings):
+        settings.LOGBOOK_CONFIG = {**settings.LOGBOOK_CONFIG, "ASYNC": False}
+        self.client = APIClient()
+        self.admin = UserFactory(is_active=True, project_admin=True)
+        self.assignee = UserFactory(is_active=True)
+        # the creator keeps project_admin when memberships update the roles
+        self.team = TeamFactory(created_by=self.admin)
+        self.board = BoardFactory(team=self.team)
+        self.todo = TaskListFactory(board=self.board)
+        self.done = TaskListFactory(board=self.board)
+        self.tasks = TaskFactory.create_batch(4, task_list=self.todo, assignee=self.assignee, is_done=False)
 
+        TeamMembershipFactory(user=self.admin, team=self.team)
+        TeamMembershipFactory(user=self.assignee, team=self.team)
+
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse("task:task-bulk")
+
+    def post(self, operations):
+        # a new user instance per request like real ones, no memberships cached on it
+        self.client.force_authenticate(user=type(self.admin).objects.get(pk=self.admin.pk))
+        return self.client.post(self.url, {"operations": operations}, format="json")
+
+    def create_ops(self, count):
+        return [{"op": "create", "task_list": str(self.todo.id), "title": f"Imported {i}",
+                 "assignee": str(self.assignee.id)} for i in range(count)]
+
+    def test_mixed_batch(self):
+        first, second, third, fourth = self.tasks
+
+        response = self.post([
+            *self.create_ops(2),
+            {"op": "update", "id": str(first.id), "title": "Renamed"},
+            {"op": "move", "id": str(second.id), "task_list": str(self.done.id)},
+            {"op": "complete", "id": str(third.id)},
+            {"op": "delete", "id": str(fourth.id)},
+        ])
+
+        assert response.status_code == 200
+        assert len(response.data["created"]) == 2
+        assert response.data["deleted"] == [str(fourth.id)]
+        assert TaskModel.objects.get(id=first.id).title == "Renamed"
+        assert TaskModel.objects.get(id=second.id).task_list_id == self.done.id
+        assert TaskModel.objects.get(id=third.id).completed_at is not None
+        assert not TaskModel.objects.filter(id=fourth.id).exists()
+
+        orders = list(TaskModel.objects.filter(task_list=self.todo).values_list("order", flat=True))
+        assert len(set(orders)) == len(orders) == 4
+
+        entry = LogEntryModel.objects.get(event=LogEventEnum.TASK_BULK)
+        assert entry.board_id == self.board.id
+        assert entry.extra_data["moved"] == [str(second.id)]
+        assert Notification.objects.filter(to_user=self.assignee).count() == 1
+
+    def test_query_count_does_not_grow(self):
+        # the first request of the day also inserts the activity rollup row
+        assert self.post(self.create_ops(1)).status_code == 200
+
+        with CaptureQueriesContext(connection) as few:
+            assert self.post(self.create_ops(2)).status_code == 200
+        with CaptureQueriesContext(connection) as many:
+            assert self.post(self.create_ops(40)).status_code == 200
+
+        assert len(many) == len(few)
+
+    def test_invalid_operation_applies_nothing(self):
+        response = self.post([
+            {"op": "update", "id": str(self.tasks[0].id), "title": "Renamed"},
+            {"op": "delete", "id": str(uuid4())},
+            {"op": "move", "id": str(self.tasks[1].id)},
+        ])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert TaskModel.objects.get(id=self.tasks[0].id).title != "Renamed"
+
+    def test_forbidden_for_non_team_assignee(self):
+        outsider = UserFactory(is_active=True)
+
+        response = self.post([{"op": "update", "id": str(self.tasks[0].id), "assignee": str(outsider.id)}])
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert TaskModel.objects.get(id=self.tasks[0].id).assignee_id == self.assignee.id
+
+    def test_task_of_list_without_board(self):
+        task = TaskFactory(task_list=TaskListFactory(board=None), is_done=False)
 
+        response = self.post([{"op": "complete", "id": str(task.id)}])
 
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert TaskModel.objects.get(id=task.id).is_done is False
+
+    def test_operations_write_only_their_own_fields(self):
+        first, second = self.tasks[:2]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post([
+                {"op": "move", "id": str(second.id), "task_list": str(self.done.id)},
+                {"op": "update", "id": str(first.id), "title": "Renamed"},
+            ])
+
+        assert response.status_code == 200
+        updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "task_taskmodel"')]
+        renamed = [sql for sql in updates if '"title"' in sql]
+        assert len(renamed) == 1 and '"order"' not in renamed[0] and '"task_list_id"' not in renamed[0]
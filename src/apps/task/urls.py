@@ -10,10 +10,13 @@ urlpatterns = [
     path('tasklist/delete/', views.TaskListDeleteView.as_view(), name='task-delete'),
     path('tasklist/task-lists/', views.AllTaskListsView.as_view(), name='task-list'),
     path('tasklist/<uuid:tasklist_id>/detail/', views.TaskListsDetailView.as_view(), name='tasklist-detail'),
+    path('tasklist/<uuid:tasklist_id>/move/', views.TaskListMoveView.as_view(), name='tasklist-move'),
 
     path('assign/', views.AddTaskToUserView.as_view(), name='assign-task-to-user'),
     path('remove-task/', views.RemoveTaskView.as_view(), name='remove-task'),
+    path('bulk/', views.TaskBulkView.as_view(), name='task-bulk'),
     path('<uuid:task_id>/update/', views.TaskUpdateView.as_view(), name='task-update'),
     path('<uuid:task_id>/detail/', views.TaskDetailView.as_view(), name='task-detail'),
+    path('<uuid:task_id>/move/', views.TaskMoveView.as_view(), name='task-move'),
 
 ]
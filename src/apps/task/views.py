@@ -7,15 +7,17 @@ from rest_framework.views import APIView
 from apps.core.views import mixins
 from apps.core.swagger import mixins as ms
 from apps.core import text
-from apps.core.services.access_control import is_team_member
+from apps.core.services.access_control import is_team_member, check_team_members
 from apps.account.auth import permissions as per
-from apps.team.models import TeamModel
 from apps.board.models import BoardModel
-from apps.notification.utils import create_notify
+from apps.notification.utils import create_notify, create_notify_digest
 from apps.notification.enums import NotificationType
 from apps.notification.services.email_dispatcher import dispatch_email_notification
 
-from . import models, exceptions, serializers
+from . import models, exceptions, serializers, enums
+from .services import ordering, bulk
+
+Operation = enums.TaskBulkOperationEnum
 
 
 class TaskListCreationView(ms.SwaggerViewMixin, mixins.CreateViewMixin, APIView):
@@ -35,8 +37,7 @@ class TaskListCreationView(ms.SwaggerViewMixin, mixins.CreateViewMixin, APIView)
         if not team_id:
             raise exceptions.NotFoundTeam()
 
-        team = TeamModel.objects.filter(id=team_id).first()
-        is_team_member(request.user, team)
+        is_team_member(request.user, team_id)
 
         response_data = self.create(request, response=False, *args, **kwargs)
         return Response(response_data, status=status.HTTP_201_CREATED)
@@ -62,7 +63,7 @@ class TaskListDeleteView(ms.SwaggerViewMixin, mixins.DeleteViewMixin, APIView):
         self.validated_data = ser.validated_data
         tasklist = self.validated_data['tasklist']
 
-        is_team_member(self.request.user, tasklist.board.team)
+        is_team_member(self.request.user, tasklist.board.team_id)
         return tasklist
 
 
@@ -75,6 +76,9 @@ class AllTaskListsView(ms.SwaggerViewMixin, mixins.ListViewMixin, APIView):
     permission_classes = (per.IsTeamUser,)
     serializer = serializers.AllTaskListSerializer
     serializer_response = serializers.AllTaskListResponseSerializer
+    cursor_pagination = mixins.CURSOR_OPT_IN
+    # board position (unique per board), the order the board shows them in
+    cursor_ordering = ('board_id', 'order', 'id')
 
     def get_queryset(self):
         board_id = self.request.query_params.get("board_id")
@@ -82,10 +86,10 @@ class AllTaskListsView(ms.SwaggerViewMixin, mixins.ListViewMixin, APIView):
 
         if board_id:
             board = get_object_or_404(BoardModel, id=board_id)
-            is_team_member(self.request.user, board.team)
+            is_team_member(self.request.user, board.team_id)
             queryset = queryset.filter(board=board)
 
-        return queryset.order_by("id")
+        return queryset.order_by(*self.cursor_ordering)
 
     def get(self, request, *args, **kwargs):
         response_data = self.list(request)
@@ -110,11 +114,11 @@ class TaskListsDetailView(ms.SwaggerViewMixin, mixins.DetailViewMixin, APIView):
 
     def get_instance(self):
         tasklist_id = self.kwargs.get('tasklist_id')
-        tasklist = models.TaskListModel.objects.filter(id=tasklist_id).first()
+        tasklist = models.TaskListModel.objects.select_related('board').filter(id=tasklist_id).first()
         if not tasklist:
             raise exceptions.NotFound()
 
-        is_team_member(self.request.user, tasklist.board.team)
+        is_team_member(self.request.user, tasklist.board.team_id)
 
         return tasklist
 
@@ -136,8 +140,7 @@ class AddTaskToUserView(ms.SwaggerViewMixin, mixins.CreateViewMixin, APIView):
         task_list = self.validated_data["task_list"]
         assignee = self.validated_data["assignee"]
 
-        is_team_member(self.request.user, task_list.board.team)
-        is_team_member(assignee, task_list.board.team)
+        check_team_members([self.request.user, assignee], task_list.board.team_id)
 
         notification = create_notify(
             to_user=assignee,
@@ -176,7 +179,7 @@ class RemoveTaskView(ms.SwaggerViewMixin, mixins.DeleteViewMixin, APIView):
         self.validated_data = ser.validated_data
         task = self.validated_data['task']
 
-        is_team_member(self.request.user, task.task_list.board.team)
+        is_team_member(self.request.user, task.task_list.board.team_id)
 
         assignee = task.assignee
         board = task.task_list.board
@@ -215,11 +218,11 @@ class TaskUpdateView(ms.SwaggerViewMixin, mixins.UpdateViewMixin, APIView):
 
     def get_instance(self):
         task_id = self.kwargs.get('task_id')
-        task = models.TaskModel.objects.filter(id=task_id).first()
+        task = models.TaskModel.objects.select_related('task_list__board').filter(id=task_id).first()
         if not task:
             raise exceptions.NotFound()
 
-        is_team_member(self.request.user, task.task_list.board.team)
+        is_team_member(self.request.user, task.task_list.board.team_id)
 
         return task
 
@@ -233,8 +236,10 @@ class TaskUpdateView(ms.SwaggerViewMixin, mixins.UpdateViewMixin, APIView):
         board = ser.instance.task_list.board
         team = board.team
 
-        notification = create_notify(
+        # quick successive edits end up in one notification and one digest email
+        create_notify_digest(
             to_user=assignee,
+            target=f"task:{ser.instance.pk}",
             title=_("Task Updated"),
             description=_("Your task '{task}' in team '{team}' was updated by {admin}.").format(
                 task=ser.instance.title,
@@ -249,9 +254,6 @@ class TaskUpdateView(ms.SwaggerViewMixin, mixins.UpdateViewMixin, APIView):
             }
         )
 
-        if notification.type == NotificationType.EMAIL:
-            dispatch_email_notification(notification)
-
         return Response({
             'message': text.success_update,
             'update_date': ser.data,
@@ -272,14 +274,128 @@ class TaskDetailView(ms.SwaggerViewMixin, mixins.DetailViewMixin, APIView):
 
     def get_instance(self):
         task_id = self.kwargs.get('task_id')
-        task = models.TaskModel.objects.filter(id=task_id).first()
+        task = models.TaskModel.objects.select_related('task_list__board').filter(id=task_id).first()
         if not task:
             raise exceptions.NotFound()
 
-        is_team_member(self.request.user, task.task_list.board.team)
+        is_team_member(self.request.user, task.task_list.board.team_id)
 
         return task
 
 
+class TaskListMoveView(ms.SwaggerViewMixin, APIView):
+    """
+        move a task list after another list of its board (or first), only its own row is written
+    """
+    swagger_title = "TaskList Move"
+    swagger_tags = ["Task"]
+    permission_classes = (per.IsAdminOrProjectAdmin,)
+    serializer = serializers.TaskListMoveSerializer
+    serializer_response = serializers.TaskListMoveResponseSerializer
+
+    def post(self, request, *args, **kwargs):
+        ser = self.serializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+
+        task_list = models.TaskListModel.objects.select_related('board').filter(id=self.kwargs.get('tasklist_id')).first()
+        if not task_list or not task_list.board:
+            raise exceptions.NotFound()
+        is_team_member(request.user, task_list.board.team_id)
+
+        after = None
+        after_id = ser.validated_data.get('after_id')
+        if after_id:
+            # a list can not be placed after itself
+            after = models.TaskListModel.objects.filter(id=after_id, board_id=task_list.board_id) \
+                .exclude(pk=task_list.pk).first()
+            if not after:
+                raise exceptions.NotInContainer()
+
+        ordering.move_task_list(task_list, after)
+        return Response(self.serializer_response(task_list).data, status=status.HTTP_200_OK)
+
 
+class TaskMoveView(ms.SwaggerViewMixin, APIView):
+    """
+        move a task after another task (or first) of its list or of another list on the same board,
+        only its own row is written
+    """
+    swagger_title = "Task Move"
+    swagger_tags = ["Task"]
+    permission_classes = (per.IsAdminOrProjectAdmin,)
+    serializer = serializers.TaskMoveSerializer
+    serializer_response = serializers.TaskMoveResponseSerializer
+
+    def post(self, request, *args, **kwargs):
+        ser = self.serializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+
+        task = models.TaskModel.objects.select_related('task_list__board').filter(id=self.kwargs.get('task_id')).first()
+        if not task or not task.task_list.board:
+            raise exceptions.NotFound()
+        is_team_member(request.user, task.task_list.board.team_id)
+
+        task_list = task.task_list
+        task_list_id = ser.validated_data.get('task_list_id')
+        if task_list_id and task_list_id != task_list.id:
+            task_list = models.TaskListModel.objects.filter(id=task_list_id).first()
+            if not task_list:
+                raise exceptions.NotFound()
+            if task_list.board_id != task.task_list.board_id:
+                raise exceptions.NotSameBoard()
+
+        after = None
+        after_id = ser.validated_data.get('after_id')
+        if after_id:
+            # a task can not be placed after itself
+            after = models.TaskModel.objects.filter(id=after_id, task_list=task_list).exclude(pk=task.pk).first()
+            if not after:
+                raise exceptions.NotInContainer()
+
+        ordering.move_task(task, task_list, after)
+        return Response(self.serializer_response(task).data, status=status.HTTP_200_OK)
+
+
+class TaskBulkView(ms.SwaggerViewMixin, APIView):
+    """
+        create, update, move, complete and delete many tasks in one request and one transaction
+    """
+    swagger_title = "Task Bulk"
+    swagger_tags = ["Task"]
+    permission_classes = (per.IsAdminOrProjectAdmin,)
+    serializer = serializers.TaskBulkSerializer
+    serializer_response = serializers.TaskBulkResponseSerializer
+
+    def post(self, request, *args, **kwargs):
+        ser = self.serializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        data = ser.validated_data
+
+        self.check_teams(data['operations'], data['tasks'], data['task_lists'], data['assignees'])
+
+        result = bulk.apply(request.user, data['operations'], data['tasks'], data['task_lists'], data['assignees'])
+        return Response(self.serializer_response(result).data, status=status.HTTP_200_OK)
+
+    def check_teams(self, operations, tasks, task_lists, assignees):
+        """
+            the user must be a member of every team of the batch and so must the assignees,
+            one check per team
+        """
+        team_users = {}
+        for task in tasks.values():
+            team_users.setdefault(task.task_list.board.team_id, set())
+        for task_list in task_lists.values():
+            team_users.setdefault(task_list.board.team_id, set())
+
+        for op in operations:
+            if not op.get('assignee'):
+                continue
+            if op['op'] == Operation.CREATE:
+                team_id = task_lists[op['task_list']].board.team_id
+            else:
+                team_id = tasks[op['id']].task_list.board.team_id
+            team_users[team_id].add(assignees[op['assignee']])
+
+        for team_id, users in team_users.items():
+            check_team_members([self.request.user, *users], team_id)
 
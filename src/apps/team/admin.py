@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
 from apps.core import text
+from apps.notification.utils import create_notify_team
 from . import models, enums
 
 STATUS_CHOICES = enums.JoinTeamStatusEnum
@@ -17,7 +18,18 @@ class TeamAdmin(admin.ModelAdmin):
     actions = ['lock_teams', 'unlock_teams']
 
     def lock_teams(self, request, queryset):
+        teams = list(queryset.filter(is_locked=False))
         queryset.update(is_locked=True)
+        for team in teams:
+            create_notify_team(
+                team.id,
+                title=_("Team Locked"),
+                description=_("Team '{team}' has been locked.").format(team=team.name),
+                kwargs={
+                    'team_name': team.name,
+                    'type': 'TEAM_LOCKED'
+                }
+            )
         self.message_user(request, text.teams_locked)
 
     def unlock_teams(self, request, queryset):
@@ -1,6 +1,8 @@
 from django.dispatch import receiver
 from django.db.models.signals import post_save, post_delete
 
+from apps.core.services.access_control import reset_user_team_ids
+
 from .service.role_manager import update_user_role
 from . import enums, models
 
@@ -22,6 +24,13 @@ def update_user_role_on_membership_change(sender, instance, **kwargs):
     update_user_role(instance.user)
 
 
+@receiver(post_save, sender=models.TeamMembership)
+@receiver(post_delete, sender=models.TeamMembership)
+def reset_team_ids_on_membership_change(sender, instance, **kwargs):
+    """ Drops the cached team ids of the member, see access_control.get_user_team_ids """
+    reset_user_team_ids(instance.user)
+
+
 @receiver(post_delete, sender=models.TeamModel)
 def update_user_role_on_team_delete(sender, instance, **kwargs):
     update_user_role(instance.created_by)
@@ -339,7 +339,7 @@ class RemoveTeamMemberView(ms.SwaggerViewMixin, mixins.DeleteViewMixin, APIView)
         if not team_membership:
             raise exceptions.NotFoundTeam()
 
-        is_team_member(self.request.user, team_membership.team)
+        is_team_member(self.request.user, team_membership.team_id)
         removed_user = team_membership.user
         team_name = team_membership.team.name
 
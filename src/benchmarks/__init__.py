@@ -0,0 +1,29 @@
+"""
+    standalone benchmarks, run from `src/`:
+        python -m benchmarks.<module> --help
+    they need the same services as the app (redis, database) and are not collected by pytest.
+"""
+import os
+import statistics
+
+
+def setup_django():
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+def report(title, samples_ms, elapsed):
+    print(f'{title}')
+    print(f'  ops: {len(samples_ms)}  throughput: {len(samples_ms) / elapsed:.0f} ops/s')
+    print(f'  p50: {percentile(samples_ms, 50):.3f} ms  p99: {percentile(samples_ms, 99):.3f} ms  '
+          f'mean: {statistics.fmean(samples_ms) if samples_ms else 0:.3f} ms')
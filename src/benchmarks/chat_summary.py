@@ -0,0 +1,60 @@
+"""
+    query count and response time of the chat room summary endpoint as the number of rooms grows.
+    rows are created inside a transaction that is rolled back at the end.
+
+        python -m benchmarks.chat_summary --rooms 10 50 200
+"""
+import argparse
+import time
+
+from benchmarks import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--messages', type=int, default=5, help='messages per room')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from apps.account.tests.factories import UserFactory
+    from apps.chat.models import ChatRoomModel, MessageModel
+    from apps.chat.services.room_state import rebuild_room_state
+
+    print(f'{"rooms":>6} {"queries":>8} {"ms":>8}')
+    with transaction.atomic():
+        user = UserFactory()
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse('apps.chat:chatroom-summary')
+
+        created = 0
+        for rooms in sorted(args.rooms):
+            for _ in range(rooms - created):
+                opponent = UserFactory()
+                room = ChatRoomModel.objects.create()
+                room.participants.set([user, opponent])
+                MessageModel.objects.bulk_create([
+                    MessageModel(room=room, sender=opponent, content=f'message {i}', is_read=bool(i % 2))
+                    for i in range(args.messages)
+                ])
+                rebuild_room_state(ChatRoomModel.objects.filter(pk=room.pk))
+            created = rooms
+
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = client.get(url, {'page': 1})
+                elapsed = (time.perf_counter() - start) * 1000
+            assert response.status_code == 200, response.data
+            print(f'{rooms:>6} {len(ctx.captured_queries):>8} {elapsed:>8.1f}')
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+    send-to-receive latency of chat messages with write-behind off and on.
+    every room has two websocket clients in this process, one sends and both receive;
+    latency is measured from send until the other participant gets the broadcast.
+    needs the database and redis (write-behind stream), rows are removed at the end.
+
+        python -m benchmarks.chat_write_behind --rooms 50 --messages 40 --mode both
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks import setup_django, report
+
+
+async def run(rooms, messages, write_behind):
+    from channels.db import database_sync_to_async
+    from channels.testing import WebsocketCommunicator
+    from django.conf import settings
+    from config.asgi import application
+    from apps.chat.services import write_behind as write_behind_service
+
+    settings.CHAT_CONFIG = {**settings.CHAT_CONFIG, 'WRITE_BEHIND': write_behind}
+    samples = []
+
+    async def room_load(room, sender, receiver):
+        clients = []
+        for user in (sender, receiver):
+            communicator = WebsocketCommunicator(application=application, path=f'/ws/chat/{room.id}/')
+            communicator.scope['user'] = user
+            connected, _ = await communicator.connect()
+            assert connected
+            clients.append(communicator)
+
+        for _ in range(messages):
+            await clients[0].send_json_to({'message': json.dumps({'sent': time.perf_counter()})})
+            event = await clients[1].receive_json_from(timeout=30)
+            samples.append((time.perf_counter() - json.loads(event['message'])['sent']) * 1000)
+            await clients[0].receive_json_from(timeout=30)
+
+        for communicator in clients:
+            await communicator.disconnect()
+
+    fixtures = await database_sync_to_async(create_rooms)(rooms)
+    start = time.perf_counter()
+    await asyncio.gather(*(room_load(*fixture) for fixture in fixtures))
+    elapsed = time.perf_counter() - start
+    if write_behind:
+        await write_behind_service.get_buffer().flush()
+
+    await database_sync_to_async(delete_rooms)(fixtures)
+    return samples, elapsed
+
+
+def create_rooms(rooms):
+    from apps.account.tests.factories import UserFactory
+    from apps.chat.models import ChatRoomModel
+
+    fixtures = []
+    for _ in range(rooms):
+        sender, receiver = UserFactory(), UserFactory()
+        room = ChatRoomModel.objects.create()
+        room.participants.set([sender, receiver])
+        fixtures.append((room, sender, receiver))
+    return fixtures
+
+
+def delete_rooms(fixtures):
+    from django.contrib.auth import get_user_model
+    from apps.chat.models import ChatRoomModel
+
+    ChatRoomModel.objects.filter(pk__in=[room.pk for room, _, _ in fixtures]).delete()
+    get_user_model().objects.filter(pk__in=[user.pk for _, *users in fixtures for user in users]).delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=50)
+    parser.add_argument('--messages', type=int, default=40, help='messages per room')
+    parser.add_argument('--mode', choices=['off', 'on', 'both'], default='both')
+    args = parser.parse_args()
+
+    setup_django()
+    modes = {'off': [False], 'on': [True], 'both': [False, True]}[args.mode]
+    for write_behind in modes:
+        samples, elapsed = asyncio.run(run(args.rooms, args.messages, write_behind))
+        report(f'write-behind {"on" if write_behind else "off"} ({args.rooms} rooms)', samples, elapsed)
+
+
+if __name__ == '__main__':
+    main()
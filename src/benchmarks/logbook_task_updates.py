@@ -0,0 +1,56 @@
+"""
+    cost of task saves with the logbook written inline vs through the redis stream pipeline.
+    each save runs in autocommit like a request does, so the async mode pays its publish after commit.
+    needs the database and redis, rows are removed at the end (the flush of the async run included).
+
+        python -m benchmarks.logbook_task_updates --tasks 200 --updates 5
+"""
+import argparse
+import time
+
+from benchmarks import setup_django, report
+
+
+def run(tasks, updates, async_mode):
+    from django.conf import settings
+    from apps.task.tests.factories import TaskFactory, TaskListFactory
+    from apps.logbook.services import pipeline
+
+    settings.LOGBOOK_CONFIG = {**settings.LOGBOOK_CONFIG, 'ASYNC': async_mode}
+    task_list = TaskListFactory()
+    rows = TaskFactory.create_batch(tasks, task_list=task_list)
+
+    samples = []
+    start = time.perf_counter()
+    for i in range(updates):
+        for task in rows:
+            task.title = f'{task.title[:50]} {i}'
+            save_start = time.perf_counter()
+            task.save()
+            samples.append((time.perf_counter() - save_start) * 1000)
+    elapsed = time.perf_counter() - start
+
+    flush_start = time.perf_counter()
+    flushed = pipeline.flush() if async_mode else 0
+    flush_ms = (time.perf_counter() - flush_start) * 1000
+
+    task_list.board.team.delete()
+    return samples, elapsed, flushed, flush_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--updates', type=int, default=5, help='saves per task')
+    args = parser.parse_args()
+
+    setup_django()
+    for async_mode in (False, True):
+        samples, elapsed, flushed, flush_ms = run(args.tasks, args.updates, async_mode)
+        report(f'task.save() with logbook {"pipeline" if async_mode else "inline"}', samples, elapsed)
+        if async_mode:
+            print(f'  worker flush: {flushed} events in {flush_ms:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
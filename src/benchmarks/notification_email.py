@@ -0,0 +1,86 @@
+"""
+    email throughput with one smtp connection per message (the old send_email path)
+    vs one connection per batch (tasks.send_queued_emails).
+    starts a local aiosmtpd sink unless --host is given (pip install aiosmtpd, not an app requirement),
+    the handshake is cheap on localhost so a real relay with --tls shows a bigger gap.
+
+        python -m benchmarks.notification_email --messages 500 --batch-size 50
+"""
+import argparse
+import time
+
+from benchmarks import setup_django, report
+
+
+def build_messages(count):
+    from apps.notification.services.senders import build_email_message
+
+    return [
+        build_email_message('Task updated', [f'user{i}@example.com'], {'task_title': f'task {i}', 'team_name': 'Core'})
+        for i in range(count)
+    ]
+
+
+def per_message(messages):
+    samples = []
+    start = time.perf_counter()
+    for message in messages:
+        send_start = time.perf_counter()
+        message.send(fail_silently=False)
+        samples.append((time.perf_counter() - send_start) * 1000)
+    return samples, time.perf_counter() - start
+
+
+def batched(messages, batch_size):
+    from django.core.mail import get_connection
+    from apps.notification.services.senders import send_email_batch
+
+    samples = []
+    start = time.perf_counter()
+    for i in range(0, len(messages), batch_size):
+        batch = messages[i:i + batch_size]
+        batch_start = time.perf_counter()
+        with get_connection() as connection:
+            errors = send_email_batch(batch, connection)
+        assert not errors, errors
+        # per message cost, so both runs report comparable latencies
+        samples.extend([(time.perf_counter() - batch_start) * 1000 / len(batch)] * len(batch))
+    return samples, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--host', help='smtp server to use instead of a local sink')
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--tls', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    controller = None
+    if not args.host:
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.handlers import Sink
+
+        controller = Controller(Sink(), hostname='127.0.0.1', port=args.port)
+        controller.start()
+
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST = args.host or '127.0.0.1'
+    settings.EMAIL_PORT = args.port
+    settings.EMAIL_USE_TLS = args.tls
+    settings.DEFAULT_FROM_EMAIL = settings.DEFAULT_FROM_EMAIL or 'bench@example.com'
+    try:
+        messages = build_messages(args.messages)
+        report('one connection per message', *per_message(messages))
+        report(f'one connection per {args.batch_size} messages', *batched(messages, args.batch_size))
+    finally:
+        if controller:
+            controller.stop()
+
+
+if __name__ == '__main__':
+    main()
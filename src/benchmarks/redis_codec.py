@@ -0,0 +1,70 @@
+"""
+    encode/decode time and payload size of the redis codecs for the value shapes this app stores.
+
+        python -m benchmarks.redis_codec --loops 20000
+"""
+import argparse
+import pickle
+import time
+import uuid
+
+from benchmarks import setup_django
+
+
+SHAPES = {
+    'otp code': '123456',
+    'team ids': [str(uuid.uuid4()) for _ in range(20)],
+    'board payload': {
+        'id': str(uuid.uuid4()),
+        'title': 'Sprint board',
+        'task_lists': [
+            {
+                'id': str(uuid.uuid4()),
+                'title': f'list {i}',
+                'tasks': [
+                    {'id': str(uuid.uuid4()), 'title': f'task {j}', 'is_done': bool(j % 2),
+                     'priority': 'medium', 'assignee': 'No Name'}
+                    for j in range(10)
+                ],
+            }
+            for i in range(5)
+        ],
+    },
+}
+
+
+def bench(encode, decode, value, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        data = encode(value)
+    encode_us = (time.perf_counter() - start) / loops * 1e6
+
+    start = time.perf_counter()
+    for _ in range(loops):
+        decode(data)
+    decode_us = (time.perf_counter() - start) / loops * 1e6
+    return encode_us, decode_us, len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loops', type=int, default=20000)
+    args = parser.parse_args()
+
+    setup_django()
+    from apps.core import redis_codecs
+
+    codecs = {'pickle': (pickle.dumps, pickle.loads)}
+    for name, codec in redis_codecs.CODECS.items():
+        codecs[name] = (lambda v, c=codec: redis_codecs.encode(v, c), redis_codecs.decode)
+
+    print(f'{"shape":<14} {"codec":<8} {"encode us":>10} {"decode us":>10} {"bytes":>7}')
+    for shape, value in SHAPES.items():
+        loops = args.loops if shape != 'board payload' else max(1, args.loops // 20)
+        for name, (encode, decode) in codecs.items():
+            encode_us, decode_us, size = bench(encode, decode, value, loops)
+            print(f'{shape:<14} {name:<8} {encode_us:>10.2f} {decode_us:>10.2f} {size:>7}')
+
+
+if __name__ == '__main__':
+    main()
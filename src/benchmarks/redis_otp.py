@@ -0,0 +1,72 @@
+"""
+    OTP "send code" flow: legacy GET + SET (two round trips, new client per worker)
+    vs pooled get_and_set_if_absent (one pipelined round trip).
+    every worker process mimics one gunicorn sync worker.
+
+        python -m benchmarks.redis_otp --workers 4 --requests 2000
+"""
+import argparse
+import multiprocessing
+import time
+import uuid
+
+from benchmarks import setup_django, report
+
+
+def _legacy_worker(requests, queue):
+    setup_django()
+    import pickle
+    import redis
+    from django.conf import settings
+
+    conn = redis.Redis(host=settings.REDIS_CONFIG['HOST'], port=settings.REDIS_CONFIG['PORT'])
+    samples = []
+    for _ in range(requests):
+        key = f'bench_otp_{uuid.uuid4().hex}'
+        start = time.perf_counter()
+        if not conn.get(key):
+            conn.set(key, pickle.dumps('123456'), ex=60)
+        samples.append((time.perf_counter() - start) * 1000)
+    queue.put(samples)
+
+
+def _pooled_worker(requests, queue):
+    setup_django()
+    from apps.core import redis_utils
+
+    samples = []
+    for _ in range(requests):
+        key = f'bench_otp_{uuid.uuid4().hex}'
+        start = time.perf_counter()
+        redis_utils.get_and_set_if_absent(key, '123456', 60)
+        samples.append((time.perf_counter() - start) * 1000)
+    queue.put(samples)
+
+
+def run(target, workers, requests):
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=target, args=(requests, queue)) for _ in range(workers)]
+    start = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    samples = []
+    for _ in procs:
+        samples.extend(queue.get())
+    for proc in procs:
+        proc.join()
+    return samples, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=2000, help='requests per worker')
+    args = parser.parse_args()
+
+    for title, target in (('legacy get + set', _legacy_worker), ('pooled pipeline', _pooled_worker)):
+        samples, elapsed = run(target, args.workers, args.requests)
+        report(f'{title} ({args.workers} workers)', samples, elapsed)
+
+
+if __name__ == '__main__':
+    main()
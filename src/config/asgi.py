@@ -5,7 +5,9 @@ from django.core.asgi import get_asgi_application
 from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
 
+import apps.board.routing
 import apps.chat.routing
+import apps.notification.routing
 
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -16,7 +18,9 @@ application = ProtocolTypeRouter({
 
     "websocket": AuthMiddlewareStack(
         URLRouter(
-            apps.chat.routing.websocket_urlpatterns
+            apps.chat.routing.websocket_urlpatterns +
+            apps.board.routing.websocket_urlpatterns +
+            apps.notification.routing.websocket_urlpatterns
         )
     ),
 })
@@ -211,7 +211,105 @@ REDIS_CONFIG = {
     'DB': int(os.getenv('REDIS_DB', 0)),
     'HOST': os.getenv('REDIS_HOST', 'localhost'),
     'PORT': os.getenv('REDIS_PORT', '6379'),
-    'CHANNEL_NAME': os.getenv('REDIS_CHANNEL_NAME', 'market_price')
+    'CHANNEL_NAME': os.getenv('REDIS_CHANNEL_NAME', 'market_price'),
+    'MAX_CONNECTIONS': int(os.getenv('REDIS_MAX_CONNECTIONS', 50)),  # per process
+    'POOL_TIMEOUT': int(os.getenv('REDIS_POOL_TIMEOUT', 5)),  # by sec, wait for a free connection
+    'SOCKET_TIMEOUT': int(os.getenv('REDIS_SOCKET_TIMEOUT', 5)),  # by sec
+    'HEALTH_CHECK_INTERVAL': int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30)),  # by sec
+    'CODEC': os.getenv('REDIS_CODEC', 'msgpack'),  # msgpack or json
+    # read keys written before codecs (pickle, can run code) while upgrading until those keys expired.
+    # when off such keys are treated as missing (an old otp code has to be requested again)
+    'ALLOW_PICKLE_READ': bool(int(os.getenv('REDIS_ALLOW_PICKLE_READ', 0))),
+}
+# ---------------------------------------------------------------
+
+
+# ---Chat--------------------------------------------------------
+CHAT_CONFIG = {
+    # broadcast first, persist in batches (messages wait in a redis stream until stored)
+    'WRITE_BEHIND': bool(int(os.getenv('CHAT_WRITE_BEHIND', 0))),
+    'FLUSH_INTERVAL': int(os.getenv('CHAT_FLUSH_INTERVAL', 200)) / 1000,  # env by ms
+    'FLUSH_BATCH_SIZE': int(os.getenv('CHAT_FLUSH_BATCH_SIZE', 100)),
+    'STREAM': 'chat_write_behind',  # redis key
+    'STREAM_MAXLEN': 100000,
+    'RECOVER_AFTER': 60,  # by sec, stream entries older than this are stored by the recovery task
+    'ACCESS_CACHE_TIMEOUT': 300,  # by sec, cached room membership
+    'ACCESS_RECHECK_INTERVAL': int(os.getenv('CHAT_ACCESS_RECHECK_INTERVAL', 30)),  # by sec, open sockets
+}
+# ---------------------------------------------------------------
+
+
+# ---Logbook-----------------------------------------------------
+LOGBOOK_CONFIG = {
+    # write log entries from a celery worker through a redis stream, 0 writes them inline
+    'ASYNC': bool(int(os.getenv('LOGBOOK_ASYNC', 1))),
+    'STREAM': 'logbook_events',  # redis key
+    'STREAM_MAXLEN': 1000000,
+    'FLUSH_DELAY': 1,  # by sec, events of this window are written together
+    'FLUSH_BATCH_SIZE': 500,
+    'FLUSH_LOCK_TIMEOUT': 60,  # by sec
+    # monthly partitions (postgresql, see `manage.py log_partitions`)
+    'PARTITION_MONTHS_AHEAD': 3,
+    'PARTITION_KEEP_MONTHS': int(os.getenv('LOGBOOK_PARTITION_KEEP_MONTHS', 0)),  # 0 never detaches
+}
+# ---------------------------------------------------------------
+
+
+# ---Notification------------------------------------------------
+NOTIFICATION_CONFIG = {
+    'DISPATCH_BATCH_SIZE': 100,  # sms notifications per celery job of create_notify_bulk
+    # queued emails are sent in batches, one smtp connection per batch
+    'EMAIL_BATCH_SIZE': 50,
+    'EMAIL_MAX_RETRIES': 3,
+    'EMAIL_RETRY_DELAY': 60,  # by sec
+    # utils.create_notify_digest merges repeats for this long, then one digest email goes out per user
+    'DIGEST_WINDOW': 600,  # by sec
+    'UNREAD_COUNT_TIMEOUT': 3600,  # by sec, redis unread counters are rebuilt from the database after this
+}
+# ---------------------------------------------------------------
+
+
+# ---Board-------------------------------------------------------
+BOARD_CACHE_CONFIG = {
+    # versioned board snapshots in redis, see board.services.cache
+    'ENABLED': bool(int(os.getenv('BOARD_CACHE_ENABLED', 1))),
+    'TIMEOUT': 3600,  # by sec, payloads of older versions expire
+}
+BOARD_REALTIME_CONFIG = {
+    # task and task list changes pushed to open boards, see board.services.realtime
+    'ENABLED': bool(int(os.getenv('BOARD_REALTIME_ENABLED', 1))),
+    'COALESCE_WINDOW': int(os.getenv('BOARD_COALESCE_WINDOW', 100)) / 1000,  # env by ms, per socket
+    'ACCESS_RECHECK_INTERVAL': int(os.getenv('BOARD_ACCESS_RECHECK_INTERVAL', 30)),  # by sec, open sockets
+}
+# ---------------------------------------------------------------
+
+
+# ---Task--------------------------------------------------------
+TASK_CONFIG = {
+    'BULK_MAX_OPERATIONS': int(os.getenv('TASK_BULK_MAX_OPERATIONS', 500)),  # per request of the bulk endpoint
+}
+# ---------------------------------------------------------------
+
+
+# ---Retention---------------------------------------------------
+RETENTION_CONFIG = {
+    # expired rows are moved to gzipped jsonl files, see apps.core.services.archive
+    'ARCHIVE_DIR': BASE_DIR / os.getenv('ARCHIVE_DIR', 'archive'),
+    'BATCH_SIZE': 1000,  # rows per archive file and per delete
+    'TIME_LIMIT': 120,  # by sec, a run stops after this and queues the rest as a new run
+    'POLICIES': {
+        # days to keep per field value, 'default' for the other values, None keeps forever
+        'logbook': {
+            'model': 'logbook.LogEntryModel',
+            'field': 'event',
+            'days': {'default': int(os.getenv('LOGBOOK_RETENTION_DAYS', 365)), 'user_login': 90, 'user_logout': 90},
+        },
+        'notification': {
+            'model': 'notification.Notification',
+            'field': 'status',
+            'days': {'default': int(os.getenv('NOTIFICATION_RETENTION_DAYS', 180)), 'PENDING': None, 'QUEUED': None},
+        },
+    },
 }
 # ---------------------------------------------------------------
 
@@ -224,6 +322,37 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    # delivery waits on smtp / the sms api, each has its own queue and worker (see docker-compose)
+    'apps.notification.tasks.send_email': {'queue': 'email'},
+    'apps.notification.tasks.send_queued_emails': {'queue': 'email'},
+    'apps.notification.tasks.send_sms': {'queue': 'sms'},
+    'apps.notification.tasks.send_sms_notifications': {'queue': 'sms'},
+}
+CELERY_BEAT_SCHEDULE = {
+    'recover-chat-messages': {
+        'task': 'apps.chat.tasks.recover_chat_messages',
+        'schedule': timedelta(minutes=1),
+    },
+    'flush-log-events': {
+        # catches events whose scheduled flush could not be queued
+        'task': 'apps.logbook.tasks.flush_log_events',
+        'schedule': timedelta(minutes=1),
+    },
+    'send-queued-emails': {
+        # emails waiting for a retry
+        'task': 'apps.notification.tasks.send_queued_emails',
+        'schedule': timedelta(minutes=1),
+    },
+    'send-notification-digests': {
+        'task': 'apps.notification.tasks.send_notification_digests',
+        'schedule': timedelta(minutes=1),
+    },
+    'archive-expired-rows': {
+        'task': 'apps.core.tasks.archive_expired_rows',
+        'schedule': timedelta(days=1),
+    },
+}
 # ----------------------------------------------------------------
 
 
@@ -312,7 +441,12 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 # ---SMS config---------------------------------------------------
 SMS_CONFIG = {
     'API_KEY': os.getenv('SMS_CONFIG_API_KEY'),
-    'ORIGINATOR': os.getenv('SMS_CONFIG_ORIGINATOR')
+    'ORIGINATOR': os.getenv('SMS_CONFIG_ORIGINATOR'),
+    # shared by every worker (redis token bucket), keep it under the provider limit
+    'RATE_LIMIT': float(os.getenv('SMS_RATE_LIMIT', 10)),  # sms per sec
+    'RATE_BURST': int(os.getenv('SMS_RATE_BURST', 20)),
+    'RATE_MAX_WAIT': 2,  # by sec, an sms waiting longer goes back to the queue
+    'OTP_COALESCE_WINDOW': 60,  # by sec, the same code to the same number is sent once
 }
 # ----------------------------------------------------------------
 
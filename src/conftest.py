@@ -0,0 +1,19 @@
+from unittest import mock
+
+import fakeredis
+import pytest
+
+from apps.core import redis_utils
+
+
+@pytest.fixture
+def fake_redis():
+    # one server for every connection, like workers sharing the real one
+    conn = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+    with mock.patch.object(redis_utils.redis_manager, "get_conn", return_value=conn):
+        yield conn
+
+
+@pytest.fixture
+def in_memory_layer(settings):
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}